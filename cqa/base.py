@@ -1,8 +1,12 @@
 import logging
-from typing import Any, Dict, List
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional
 
 from cqa.types import ReporterError
 
+if TYPE_CHECKING:
+    from cqa.utils.profile import Profiler
+    from cqa.utils.sources import SourceStore
+
 
 class _RunnerLoggerMeta(type):
     def __init__(cls, name, bases, annotations, *args, **kwargs):
@@ -18,11 +22,43 @@ class Runner(metaclass=_RunnerLoggerMeta):
 
     LOGGER: logging.Logger = None
 
+    # name of the distribution of the underlying tool, used for cache keys
+    TOOL: str = ""
+
+    # whether the diagnostics of the runner point at the offending line, and
+    # so can be narrowed down to the lines changed in a diff
+    LINE_ORIENTED: bool = False
+
+    # whether ``stream`` accepts a ``sources`` store to read the files from,
+    # instead of reading them itself
+    ACCEPTS_SOURCES: bool = False
+
+    # whether the runner rewrites the files it analyses, the other runners
+    # then only analyse a file once the runner is done with it
+    MODIFIES_FILES: bool = False
+
+    # raw options the runner has been configured with
+    _cfg: Dict[str, Any] = {}
+
+    # whether the results of a file depend on the modules it imports, the
+    # runner is then given all the files at once, and keeps track of the
+    # changes of the imported modules itself rather than through the per
+    # file result cache. it depends on the options of the runner, so it is
+    # set by the constructor of the runners which follow imports
+    follows_imports: bool = False
+
     def get_config(self, cfg: Dict[str, Any]):
         """
         Abstract method to fetch and parse config parse from pyproject.toml data
         """
 
+    def get_cache_token(self) -> Dict[str, Any]:
+        """
+        options which alter the output of the runner, the per file result
+        cache is invalidated whenever these change
+        """
+        return self._cfg
+
     def run(self, paths: List[str], rootdir: str) -> List[ReporterError]:
         """
         Abstract runner method to be overriden by sub-classes
@@ -30,3 +66,56 @@ class Runner(metaclass=_RunnerLoggerMeta):
         raise NotImplementedError(
             f"run method is not implemented in {self.__class__.__name__}"
         )
+
+    def stream(
+        self, paths: List[str], rootdir: str
+    ) -> Iterator[ReporterError]:
+        """
+        yield the results of the runner as they are found, runners which
+        analyse one file at a time override it to yield every file as soon
+        as it is analysed
+        """
+        yield from self.run(paths, rootdir)
+
+    @property
+    def name(self) -> str:
+        """
+        name of the runner in logs and profiles
+        """
+        return self.TOOL or self.__class__.__name__
+
+    def stream_sources(
+        self,
+        paths: List[str],
+        rootdir: str,
+        sources: Optional["SourceStore"] = None,
+        profiler: Optional["Profiler"] = None,
+    ) -> Iterator[ReporterError]:
+        """
+        same as ``stream``, the files are read from ``sources`` by the
+        runners which accept it
+
+        with a ``profiler``, the files are analysed one at a time so the
+        cost of every file is recorded, except by the runners following
+        imports which need all the files at once
+        """
+        if profiler is not None and not self.follows_imports:
+            return self._stream_profiled(paths, rootdir, sources, profiler)
+        if sources is not None and self.ACCEPTS_SOURCES:
+            return self.stream(paths, rootdir, sources=sources)
+        return self.stream(paths, rootdir)
+
+    def _stream_profiled(
+        self,
+        paths: List[str],
+        rootdir: str,
+        sources: Optional["SourceStore"],
+        profiler: "Profiler",
+    ) -> Iterator[ReporterError]:
+        for path in paths:
+            with profiler.span(path, "file", runner=self.name) as args:
+                errors = list(
+                    self.stream_sources([path], rootdir, sources=sources)
+                )
+                args["items"] = len(errors)
+            yield from errors
@@ -0,0 +1,8 @@
+"""
+benchmark of cqa on synthetic repositories, see ``cqa bench``
+"""
+
+from .generator import GeneratedRepo as GeneratedRepo
+from .generator import RepoShape as RepoShape
+from .generator import generate_repo as generate_repo
+from .runner import Benchmark as Benchmark
@@ -0,0 +1,155 @@
+"""
+generator of synthetic repositories to benchmark cqa on
+
+repositories are generated from a seed, so the same shape and seed always
+produce the same files. modules only import modules generated before them,
+so the import graph has no cycles, and a share of the modules is seeded with
+lint, type and security defects known to be reported by the tools.
+"""
+
+import os
+import random
+from typing import Dict, List, NamedTuple
+
+# defects seeded in the modules, by kind
+LINT_DEFECTS = (
+    "import os\n",
+    "value=1\n",
+    "LONG_NAME = {!r}\n".format("x" * 100),
+)
+TYPE_DEFECTS = (
+    'def count_{i}() -> int:\n    count: int = "zero"\n    return count\n',
+    'def add_{i}(value: int) -> int:\n    return value + "one"\n',
+)
+SECURITY_DEFECTS = (
+    "def evaluate_{i}(expression):\n    return eval(expression)\n",
+    "def call_{i}(command):\n    import subprocess\n\n"
+    "    return subprocess.call(command, shell=True)\n",
+    'password = "s3cr3t-{i}-Tk9xQ2vLp8"\n',
+)
+
+# pinned dependencies of the generated project, some of them vulnerable
+REQUIREMENTS = ("django==2.2.0\n", "requests==2.20.0\n", "toml==0.10.2\n")
+
+_FUNCTION = '''
+
+def func_{index}(value: int) -> int:
+    """
+    compute the value of step {index}
+    """
+    total = value
+    for step in range({steps}):
+        total += step * {factor}
+    if total > {limit}:
+        return total - {factor}
+    return total
+'''
+
+
+class RepoShape(NamedTuple):
+    # number of python modules
+    files: int = 200
+    # approximate number of lines of every module
+    loc: int = 200
+    # number of modules of the repository imported by every module
+    imports: int = 3
+    # number of modules of every package
+    package_size: int = 20
+    # share of the modules seeded with each kind of defect
+    defect_rate: float = 0.1
+
+
+class GeneratedRepo(NamedTuple):
+    # root directory of the repository
+    directory: str
+    # paths of the modules, relative to the root directory
+    files: List[str]
+    # number of defects seeded by kind
+    defects: Dict[str, int]
+    # total number of lines of the modules
+    loc: int
+
+
+def _module_name(index: int, shape: RepoShape) -> str:
+    return f"pkg_{index // shape.package_size}.mod_{index}"
+
+
+def _module_source(
+    index: int, shape: RepoShape, rng: random.Random, defects: Dict[str, int]
+) -> str:
+    lines = ['"""\ngenerated module {}\n"""\n'.format(index)]
+
+    imported = sorted(rng.sample(range(index), min(shape.imports, index)))
+    for other in imported:
+        lines.append(
+            "from {} import func_0 as func_{}_0\n".format(
+                _module_name(other, shape), other
+            )
+        )
+
+    for kind, choices in (
+        ("lint", LINT_DEFECTS),
+        ("type", TYPE_DEFECTS),
+        ("security", SECURITY_DEFECTS),
+    ):
+        if rng.random() < shape.defect_rate:
+            lines.append("\n\n" + rng.choice(choices).format(i=index))
+            defects[kind] += 1
+
+    # at least ``func_0`` is defined, as the other modules import it
+    function = 0
+    loc = sum(line.count("\n") for line in lines)
+    while function == 0 or loc < shape.loc:
+        source = _FUNCTION.format(
+            index=function,
+            steps=rng.randint(2, 9),
+            factor=rng.randint(1, 99),
+            limit=rng.randint(100, 10000),
+        )
+        lines.append(source)
+        loc += source.count("\n")
+        function += 1
+
+    if imported:
+        calls = " + ".join(f"func_{other}_0(value)" for other in imported)
+        lines.append(
+            f"\n\ndef combined(value: int) -> int:\n    return {calls}\n"
+        )
+    return "".join(lines)
+
+
+def generate_repo(
+    directory: str, shape: RepoShape = RepoShape(), seed: int = 0
+) -> GeneratedRepo:
+    """
+    write a synthetic repository of the given shape
+
+    :param directory: (str) root directory of the repository, created if
+                missing
+    :param shape: (RepoShape) size and shape of the repository
+    :param seed: (int) seed of the generated contents
+    :returns: the generated repository
+    """
+    rng = random.Random(seed)
+    defects = {"lint": 0, "type": 0, "security": 0}
+    files: List[str] = []
+    loc = 0
+
+    for index in range(shape.files):
+        path = _module_name(index, shape).replace(".", os.sep) + ".py"
+        package = os.path.join(directory, os.path.dirname(path))
+        if index % shape.package_size == 0:
+            os.makedirs(package, exist_ok=True)
+            with open(os.path.join(package, "__init__.py"), "w") as file:
+                file.write("")
+
+        source = _module_source(index, shape, rng, defects)
+        with open(os.path.join(directory, path), "w") as file:
+            file.write(source)
+        files.append(path)
+        loc += source.count("\n")
+
+    with open(os.path.join(directory, "requirements.txt"), "w") as file:
+        file.writelines(REQUIREMENTS)
+
+    return GeneratedRepo(directory, files, defects, loc)
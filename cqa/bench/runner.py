@@ -0,0 +1,215 @@
+"""
+timing of the tool groups and the runners of cqa on a synthetic repository
+
+every measurement runs in a fresh process on a fresh copy of the
+repository, so the imports of the tools, the peak memory and the files
+rewritten by the formatters of one measurement do not leak into the next.
+"""
+
+import argparse
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from cqa import registry
+from cqa.cache import tool_version
+
+from .generator import GeneratedRepo, RepoShape, generate_repo
+
+# ``ru_maxrss`` is in kilobytes on linux and in bytes on macos
+_RSS_UNIT = 1 if sys.platform == "darwin" else 1024
+
+
+def _peak_rss() -> Dict[str, int]:
+    return {
+        "self": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _RSS_UNIT,
+        "children": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+        * _RSS_UNIT,
+    }
+
+
+def _measure(
+    directory: str,
+    config: Dict,
+    tools: List[str],
+    jobs: Optional[int],
+    cache_dir: str,
+    offline: bool,
+) -> Dict[str, Any]:
+    """
+    run the given tools once on the repository, in the worker process
+    """
+    from cqa import main as cqa_main  # noqa
+
+    os.chdir(directory)
+    args = argparse.Namespace(
+        path=["."],
+        tools=tools,
+        jobs=jobs,
+        format=True,
+        check=False,
+        exclude=[],
+        changed_since=None,
+        staged=False,
+        changed_lines_only=False,
+        offline=offline,
+        cache_dir=cache_dir,
+    )
+
+    start = time.perf_counter()
+    items = 0
+    for _ in cqa_main.stream_tools(args, config):
+        items += 1
+    elapsed = time.perf_counter() - start
+
+    return {"seconds": elapsed, "items": items, "peak_rss": _peak_rss()}
+
+
+class Benchmark:
+    def __init__(
+        self,
+        shape: RepoShape = RepoShape(),
+        seed: int = 0,
+        config: Optional[Dict] = None,
+        tools: Optional[List[str]] = None,
+        jobs: Optional[int] = None,
+        repeat: int = 1,
+        cache_dir: Optional[str] = None,
+        offline: bool = False,
+    ):
+        """
+        :param shape: (RepoShape) shape of the synthetic repository
+        :param seed: (int) seed of the synthetic repository
+        :param config: (Dict) the ``[tool.cqa]`` config the tools run with
+        :param tools: (List[str]) tools to benchmark, all the registered
+                    tools when None
+        :param jobs: (int) number of worker processes of the tools
+        :param repeat: (int) number of measurements of every target
+        :param cache_dir: (str) cache directory of the runs, only used for
+                    the vulnerability database, as the result cache is
+                    never used by the benchmark
+        :param offline: (bool) never download the vulnerability database
+        """
+        self.shape = shape
+        self.seed = seed
+        self.config = config or {}
+        self.tools = tools
+        self.jobs = jobs
+        self.repeat = repeat
+        self.cache_dir = cache_dir
+        self.offline = offline
+
+    def _groups(self) -> Dict[str, List[str]]:
+        from cqa.main import REGISTRY_GROUPS  # noqa
+
+        groups = {}
+        for name, group in REGISTRY_GROUPS.items():
+            tools = sorted(registry.get_specs(group, self.tools))
+            if tools:
+                groups[name] = tools
+        return groups
+
+    def _run_target(
+        self, workdir: str, template: GeneratedRepo, tools: List[str]
+    ) -> Dict[str, Any]:
+        runs = []
+        for _ in range(self.repeat):
+            # formatters rewrite the files, every run gets a fresh copy
+            rundir = tempfile.mkdtemp(dir=workdir)
+            directory = os.path.join(rundir, "repo")
+            shutil.copytree(template.directory, directory)
+            try:
+                with ProcessPoolExecutor(
+                    max_workers=1,
+                    mp_context=multiprocessing.get_context("spawn"),
+                ) as executor:
+                    runs.append(
+                        executor.submit(
+                            _measure,
+                            directory,
+                            self.config,
+                            tools,
+                            self.jobs,
+                            self.cache_dir or os.path.join(workdir, "cache"),
+                            self.offline,
+                        ).result()
+                    )
+            finally:
+                shutil.rmtree(rundir, ignore_errors=True)
+
+        seconds = [run["seconds"] for run in runs]
+        return {
+            "tools": tools,
+            "items": runs[-1]["items"],
+            "seconds": seconds,
+            "median": statistics.median(seconds),
+            "min": min(seconds),
+            # peak resident memory of the cqa process and of the largest of
+            # the worker processes it started, in bytes
+            "peak_rss": max(run["peak_rss"]["self"] for run in runs),
+            "peak_rss_children": max(
+                run["peak_rss"]["children"] for run in runs
+            ),
+        }
+
+    def run(self, directory: Optional[str] = None) -> Dict[str, Any]:
+        """
+        generate the repository and measure every runner, every tool group
+        and all the tools together
+
+        :param directory: (str) directory the synthetic repository is
+                    generated in, a temporary directory when None
+        :returns: the report of the benchmark, serializable to json
+        """
+        with tempfile.TemporaryDirectory(prefix="cqa-bench-") as workdir:
+            if directory is None:
+                directory = os.path.join(workdir, "repo")
+            template = generate_repo(directory, self.shape, seed=self.seed)
+
+            groups = self._groups()
+            report = {
+                "cqa": tool_version("cqa"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpus": os.cpu_count(),
+                "jobs": self.jobs,
+                "repeat": self.repeat,
+                "seed": self.seed,
+                "shape": self.shape._asdict(),
+                "repo": {
+                    "files": len(template.files),
+                    "loc": template.loc,
+                    "defects": template.defects,
+                },
+                "runners": {},
+                "groups": {},
+                "total": None,
+            }
+            for group, tools in groups.items():
+                for tool in tools:
+                    report["runners"][tool] = {
+                        "group": group,
+                        **self._run_target(workdir, template, [tool]),
+                    }
+
+                if len(tools) == 1:
+                    # the group is its only runner, no need to measure twice
+                    found = dict(report["runners"][tools[0]])
+                    del found["group"]
+                else:
+                    found = self._run_target(workdir, template, tools)
+                report["groups"][group] = found
+            report["total"] = self._run_target(
+                workdir,
+                template,
+                sorted(tool for tools in groups.values() for tool in tools),
+            )
+        return report
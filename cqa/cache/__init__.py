@@ -0,0 +1,5 @@
+from .store import DEFAULT_CACHE_DIR as DEFAULT_CACHE_DIR
+from .store import ResultCache as ResultCache
+from .store import git_blob_id as git_blob_id
+from .store import tool_version as tool_version
+from .stubs import StubCache as StubCache
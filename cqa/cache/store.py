@@ -0,0 +1,385 @@
+"""
+persistent, content addressed store of per file runner results
+
+every entry is keyed by the git blob id of the file contents, the name
+and version of the tool, and the options the runner was configured with,
+so files with the same contents share their entry and the results are
+reported for the file looked up.
+entries are evicted in least recently used order once the store grows
+past its size cap.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from collections import defaultdict
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+from cqa.base import Runner
+from cqa.types import ReporterError
+
+if TYPE_CHECKING:
+    from cqa.utils.profile import Profiler
+    from cqa.utils.sources import SourceStore
+
+DEFAULT_CACHE_DIR = ".cqa_cache"
+DEFAULT_MAX_SIZE_MB = 256
+
+# version of the serialized results, entries written with the fields of an
+# older version are never read
+ENTRY_VERSION = 2
+
+_DB_NAME = "results.sqlite3"
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    tool TEXT NOT NULL,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    atime REAL NOT NULL
+)
+"""
+
+
+def git_blob_id(path: str) -> str:
+    """
+    hash the file in the same way git hashes its blobs, so the digest
+    matches ``git hash-object <path>`` for the same contents
+
+    :param path: (str) path of the file to hash
+    :returns: hex digest of the file contents
+    """
+    with open(path, "rb") as file:
+        content = file.read()
+    digest = hashlib.sha1(f"blob {len(content)}\0".encode())  # nosec
+    digest.update(content)
+    return digest.hexdigest()
+
+
+def tool_version(tool: str) -> str:
+    try:
+        from importlib import metadata
+    except ImportError:  # python < 3.8
+        import importlib_metadata as metadata
+
+    try:
+        return metadata.version(tool)
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+class ResultCache:
+    """
+    sqlite backed cache of the results produced by a runner for a file
+    """
+
+    LOGGER = logging.getLogger(__name__)
+
+    def __init__(
+        self,
+        directory: str = DEFAULT_CACHE_DIR,
+        max_size_mb: int = DEFAULT_MAX_SIZE_MB,
+    ):
+        self.directory = directory
+        self.max_size = int(max_size_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._touched: Dict[str, float] = {}
+        # tokens are kept along with the runners, the id of a runner which
+        # has been garbage collected can be reused by another one
+        self._tokens: "weakref.WeakKeyDictionary[Runner, str]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(
+            os.path.join(directory, _DB_NAME),
+            timeout=30,
+            check_same_thread=False,
+        )
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+
+    @classmethod
+    def from_config(cls, cfg: Dict[str, Any], rootdir: str) -> "ResultCache":
+        """
+        build the cache from the ``[tool.cqa.cache]`` section of the config
+
+        :param cfg: (Dict) cache section of the cqa config
+        :param rootdir: (str) root directory of the project
+        """
+        directory = cfg.get("directory", DEFAULT_CACHE_DIR)
+        return cls(
+            directory=os.path.join(rootdir, directory),
+            max_size_mb=cfg.get("max-size-mb", DEFAULT_MAX_SIZE_MB),
+        )
+
+    def _runner_token(self, runner: Runner) -> str:
+        token = self._tokens.get(runner)
+        if token is None:
+            tool = runner.name
+            payload = json.dumps(
+                [
+                    ENTRY_VERSION,
+                    tool,
+                    tool_version(tool),
+                    runner.get_cache_token(),
+                ],
+                sort_keys=True,
+                default=str,
+            )
+            token = hashlib.sha1(payload.encode()).hexdigest()  # nosec
+            self._tokens[runner] = token
+        return token
+
+    def key(
+        self,
+        runner: Runner,
+        path: str,
+        sources: Optional["SourceStore"] = None,
+    ) -> str:
+        """
+        build the cache key of the results of ``runner`` for ``path``, the
+        contents of the file are taken from ``sources`` when given
+        """
+        blob_id = (
+            git_blob_id(path) if sources is None else sources.blob_id(path)
+        )
+        return f"{self._runner_token(runner)}:{blob_id}"
+
+    def get(
+        self, key: str, path: Optional[str] = None
+    ) -> Optional[List[ReporterError]]:
+        """
+        cached results of a key, None on a miss
+
+        :param path: (str) path of the file the results are reported for,
+                    the entry of a file is shared by all the files with the
+                    same contents, which may have stored it
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._touched[key] = time.time()
+
+        items = json.loads(row[0])
+        if path is not None:
+            items = [{**item, "path": path} for item in items]
+        return [ReporterError.from_dict(item) for item in items]
+
+    def set(self, key: str, tool: str, errors: List[ReporterError]):
+        value = json.dumps([error.to_dict() for error in errors])
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                (key, tool, value, len(value), time.time()),
+            )
+
+    def run(
+        self,
+        runner: Runner,
+        paths: Iterable[str],
+        rootdir: str,
+        clean_only: bool = False,
+        sources: Optional["SourceStore"] = None,
+        profiler: Optional["Profiler"] = None,
+    ) -> List[ReporterError]:
+        """
+        run ``runner`` only for the paths missing from the cache, and store
+        the fresh results for each of those paths
+
+        :param runner: (Runner) the runner to run on the cache misses
+        :param paths: (Iterable[str]) paths of the files to analyse
+        :param rootdir: (str) root directory of the project
+        :param clean_only: (bool) only cache files without any results, used
+                    by runners that modify files in place
+        :param sources: (SourceStore) store the files are read from
+        :param profiler: (Profiler) records the cost of every analysed file
+        :returns: cached and fresh results of all the paths
+        """
+        return list(
+            self.stream(
+                runner,
+                paths,
+                rootdir,
+                clean_only=clean_only,
+                sources=sources,
+                profiler=profiler,
+            )
+        )
+
+    def stream(
+        self,
+        runner: Runner,
+        paths: Iterable[str],
+        rootdir: str,
+        clean_only: bool = False,
+        sources: Optional["SourceStore"] = None,
+        profiler: Optional["Profiler"] = None,
+    ) -> Iterator[ReporterError]:
+        """
+        same as ``run``, but the cached results are yielded right away and
+        the fresh ones as the runner finds them
+        """
+        hits, misses = self.lookup(runner, paths, sources=sources)
+        yield from hits
+        if not misses:
+            return
+
+        errors = []
+        for error in runner.stream_sources(
+            [path for path, _ in misses],
+            rootdir,
+            sources=sources,
+            profiler=profiler,
+        ):
+            errors.append(error)
+            yield error
+
+        self.store(runner, misses, errors, rootdir, clean_only=clean_only)
+
+    def lookup(
+        self,
+        runner: Runner,
+        paths: Iterable[str],
+        sources: Optional["SourceStore"] = None,
+    ) -> Tuple[List[ReporterError], List[Tuple[str, str]]]:
+        """
+        split the paths between the ones with cached results and the ones
+        the runner has to analyse
+
+        :returns: the cached results, and the path and the cache key of
+                    every path missing from the cache
+        """
+        hits: List[ReporterError] = []
+        misses: List[Tuple[str, str]] = []
+        if runner.follows_imports:
+            return hits, [(path, "") for path in paths]
+
+        for path in paths:
+            key = self.key(runner, path, sources=sources)
+            cached = self.get(key, path=path)
+            if cached is None:
+                misses.append((path, key))
+            else:
+                hits.extend(cached)
+        return hits, misses
+
+    def store(
+        self,
+        runner: Runner,
+        misses: List[Tuple[str, str]],
+        errors: Iterable[ReporterError],
+        rootdir: str,
+        clean_only: bool = False,
+    ):
+        """
+        cache the results of the runner for the paths returned as misses by
+        ``lookup``
+        """
+        if runner.follows_imports:
+            return
+
+        by_path = defaultdict(list)
+        for error in errors:
+            by_path[_normalize(error.path, rootdir)].append(error)
+
+        tool = runner.name
+        for path, key in misses:
+            found = by_path.get(_normalize(path, rootdir), [])
+            if clean_only and found:
+                continue
+            self.set(key, tool, found)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT tool, COUNT(*), SUM(size) FROM entries GROUP BY tool"
+            ).fetchall()
+
+        return {
+            "directory": self.directory,
+            "max_size": self.max_size,
+            "entries": sum(count for _, count, _ in rows),
+            "size": sum(size for _, _, size in rows),
+            "tools": {tool: count for tool, count, _ in rows},
+        }
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.commit()
+            self._conn.execute("VACUUM")
+
+    def evict(self):
+        """
+        drop the least recently used entries until the store fits in its cap
+        """
+        with self._lock:
+            (total,) = self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+            if total <= self.max_size:
+                return
+
+            cursor = self._conn.execute(
+                "SELECT key, size FROM entries ORDER BY atime ASC"
+            )
+            evicted = []
+            for key, size in cursor:
+                if total <= self.max_size:
+                    break
+                evicted.append((key,))
+                total -= size
+
+            self._conn.executemany(
+                "DELETE FROM entries WHERE key = ?", evicted
+            )
+            self.LOGGER.info("evicted %d entries from the cache", len(evicted))
+
+    def flush(self):
+        """
+        persist the pending writes and access times, and evict old entries
+        """
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE entries SET atime = ? WHERE key = ?",
+                [(atime, key) for key, atime in self._touched.items()],
+            )
+            self._touched.clear()
+            self._conn.commit()
+
+        self.evict()
+        with self._lock:
+            self._conn.commit()
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._conn.close()
+
+
+def _normalize(path: str, rootdir: Optional[str]) -> str:
+    return os.path.normpath(os.path.join(rootdir or "", path))
@@ -0,0 +1,194 @@
+"""
+persistent store of the type stubs inferred for the modules of a project
+
+the stub of a module is written as a ``.pyi`` file, laid out in packages so
+the directory can be put on the search path of a type checker. the results
+found while inferring a stub are kept in a manifest, along with the key of
+the stub: a digest of the contents of the module and of the stubs of the
+modules it imports. a module is only analysed again once its key changes,
+and since the key depends on the stubs of its imports rather than their
+sources, changes which leave the interface of a module untouched do not
+invalidate the modules importing it.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from typing import Dict, Iterable, List, Optional
+
+from cqa.types import ReporterError
+
+# version of the manifest, manifests of an older version are never read
+MANIFEST_VERSION = 1
+
+_MANIFEST_NAME = "manifest.json"
+
+
+class StubCache:
+
+    LOGGER = logging.getLogger(__name__)
+
+    def __init__(self, directory: str, token: str = ""):
+        """
+        :param directory: (str) directory of the stubs and the manifest
+        :param token: (str) options of the type checker which alter the
+                    stubs, every stub is inferred again when they change
+        """
+        self.directory = directory
+        self.token = token
+        self.hits = 0
+        self.misses = 0
+
+        self._entries: Dict[str, Dict] = {}
+        self._digests: Dict[str, str] = {}
+        self._dirty = False
+        self._load()
+
+    @property
+    def _manifest_path(self) -> str:
+        return os.path.join(self.directory, _MANIFEST_NAME)
+
+    def _load(self):
+        try:
+            with open(self._manifest_path, encoding="utf-8") as file:
+                manifest = json.load(file)
+        except (OSError, ValueError):
+            return
+        if manifest.get("version") == MANIFEST_VERSION and (
+            manifest.get("token") == self.token
+        ):
+            self._entries = manifest.get("modules", {})
+
+    def save(self):
+        """
+        write the manifest, if any stub changed
+        """
+        if not self._dirty:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        # written aside and renamed, so an interrupted run never leaves a
+        # truncated manifest behind
+        temporary = f"{self._manifest_path}.{os.getpid()}"
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump(
+                {
+                    "version": MANIFEST_VERSION,
+                    "token": self.token,
+                    "modules": self._entries,
+                },
+                file,
+            )
+        os.replace(temporary, self._manifest_path)
+        self._dirty = False
+
+    def stub_path(self, module: str, package: bool = False) -> str:
+        """
+        path of the stub of a module, ``__init__.pyi`` in the directory of
+        the package for packages
+        """
+        parts = module.split(".")
+        if package:
+            parts.append("__init__")
+        return os.path.join(self.directory, *parts) + ".pyi"
+
+    def digest(self, module: str) -> str:
+        """
+        digest of the stub of a module, empty when it has no stub
+        """
+        digest = self._digests.get(module)
+        if digest is None:
+            entry = self._entries.get(module, {})
+            path = self.stub_path(module, entry.get("package", False))
+            try:
+                with open(path, "rb") as file:
+                    digest = hashlib.sha1(file.read()).hexdigest()  # nosec
+            except OSError:
+                digest = ""
+            self._digests[module] = digest
+        return digest
+
+    def key(
+        self, module: str, blob_id: str, dependencies: Iterable[str]
+    ) -> str:
+        """
+        key of the stub of a module
+
+        :param blob_id: (str) digest of the contents of the module
+        :param dependencies: (Iterable[str]) modules imported by the module
+        """
+        payload = json.dumps(
+            [
+                module,
+                blob_id,
+                [[name, self.digest(name)] for name in sorted(dependencies)],
+            ]
+        )
+        return hashlib.sha1(payload.encode()).hexdigest()  # nosec
+
+    def get(
+        self, module: str, key: str, path: str
+    ) -> Optional[List[ReporterError]]:
+        """
+        results found when the stub of the module was inferred, None when
+        the stub is missing or out of date
+
+        :param path: (str) path of the module the results are reported for
+        """
+        entry = self._entries.get(module)
+        if (
+            entry is None
+            or entry["key"] != key
+            or not os.path.exists(self.stub_path(module, entry["package"]))
+        ):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return [
+            ReporterError.from_dict({**error, "path": path})
+            for error in entry["errors"]
+        ]
+
+    def set(
+        self,
+        module: str,
+        key: str,
+        stub: str,
+        errors: List[ReporterError],
+        package: bool = False,
+    ):
+        """
+        store the stub of a module and the results found while inferring it,
+        the stub is only written when its contents changed
+        """
+        path = self.stub_path(module, package)
+        data = stub.encode()
+        digest = hashlib.sha1(data).hexdigest()  # nosec
+        if digest != self.digest(module) or not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as file:
+                file.write(data)
+        self._digests[module] = digest
+
+        self._entries[module] = {
+            "key": key,
+            "package": package,
+            "errors": [error.to_dict() for error in errors],
+        }
+        self._dirty = True
+
+    def discard(self, module: str):
+        """
+        remove the stub of a module which could not be inferred, so the
+        modules importing it do not rely on an out of date stub
+        """
+        entry = self._entries.pop(module, None)
+        if entry is None:
+            return
+        try:
+            os.remove(self.stub_path(module, entry["package"]))
+        except OSError:
+            pass
+        self._digests[module] = ""
+        self._dirty = True
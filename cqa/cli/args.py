@@ -34,16 +34,25 @@ def get_args():
         "run",
         help="run the given static code analysis tools on the given paths",
     )
-    runparser.add_argument(
+    formatgroup = runparser.add_mutually_exclusive_group()
+    formatgroup.add_argument(
         "--format",
         action="store_true",
         default=False,
-        help="flag to format the given files as well or not",
+        help="format the given files with isort and black, the files are "
+        "not formatted otherwise",
+    )
+    formatgroup.add_argument(
+        "--check",
+        action="store_true",
+        default=False,
+        help="report the files isort and black would change, without "
+        "writing them",
     )
     runparser.add_argument(
         "--path",
         nargs="+",
-        default=".",
+        default=["."],
         action=Once,
         help="path of the files that are to be analysed",
     )
@@ -58,5 +67,347 @@ def get_args():
         default=os.path.join(os.getcwd(), "pyproject.toml"),
         help="path of the toml configuration file (default = ./pyproject.toml)",
     )
+    runparser.add_argument(
+        "--tools",
+        nargs="+",
+        default=None,
+        help="only run the given tools, e.g. pylama bandit "
+        "(default = all the registered tools)",
+    )
+    runparser.add_argument(
+        "--exclude",
+        nargs="+",
+        default=[],
+        metavar="PATTERN",
+        help="gitignore style patterns of the paths to skip, "
+        "in addition to the ``exclude`` patterns of the config file",
+    )
+    runparser.add_argument(
+        "--changed-since",
+        default=None,
+        metavar="REF",
+        dest="changed_since",
+        help="only analyse the python files changed since the given git ref",
+    )
+    runparser.add_argument(
+        "--staged",
+        action="store_true",
+        default=False,
+        help="only analyse the python files staged for commit, as they are "
+        "in the working tree",
+    )
+    runparser.add_argument(
+        "--changed-lines-only",
+        action="store_true",
+        default=False,
+        dest="changed_lines_only",
+        help="with --changed-since or --staged, only report the diagnostics "
+        "of pylama, bandit and detect-secrets found on changed lines",
+    )
+    runparser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="number of worker processes used by the tools that support it, "
+        "0 uses one worker per core (default = tool configuration or 1)",
+    )
+    _add_cache_arguments(runparser)
+    runparser.add_argument(
+        "--no-cache",
+        action="store_false",
+        default=True,
+        dest="use_cache",
+        help="analyse every file again, ignoring the per file result cache",
+    )
+    runparser.add_argument(
+        "--offline",
+        action="store_true",
+        default=False,
+        help="never download the vulnerability database, use the local copy "
+        "whatever its age",
+    )
+    runparser.add_argument(
+        "--report",
+        choices=["console", "json", "jsonl", "sarif", "junit"],
+        default="console",
+        help="format of the report, written as the results are found "
+        "(default = console)",
+    )
+    runparser.add_argument(
+        "--output",
+        default=None,
+        metavar="FILE",
+        help="write the report to the given file (default = stdout)",
+    )
+    runparser.add_argument(
+        "--baseline",
+        nargs="?",
+        const=".cqa-baseline",
+        default=None,
+        metavar="FILE",
+        help="only report the findings missing from the baseline written by "
+        "`cqa baseline create` (default = ./.cqa-baseline)",
+    )
+    runparser.add_argument(
+        "--profile",
+        nargs="?",
+        const="cqa-profile.json",
+        default=None,
+        metavar="FILE",
+        help="record the time spent by every runner on every file and write "
+        "it as a chrome trace (default = ./cqa-profile.json)",
+    )
+    runparser.add_argument(
+        "--profile-top",
+        type=int,
+        default=10,
+        metavar="N",
+        dest="profile_top",
+        help="with --profile, number of slowest files to print (default = 10)",
+    )
+    runparser.add_argument(
+        "--daemon",
+        action="store_true",
+        default=False,
+        help="send the analysis to a running `cqa daemon`, falls back to "
+        "running locally if no daemon is listening",
+    )
+    _add_socket_argument(runparser)
+
+    daemonparser = subparser.add_parser(
+        "daemon",
+        help="keep the tools loaded in a background process serving `cqa run "
+        "--daemon` over a unix socket",
+    )
+    daemonparser.add_argument(
+        "--stop",
+        action="store_true",
+        default=False,
+        help="stop the daemon serving the current directory",
+    )
+    daemonparser.add_argument(
+        "--config",
+        default=os.path.join(os.getcwd(), "pyproject.toml"),
+        help="path of the toml configuration file (default = ./pyproject.toml)",
+    )
+    daemonparser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="number of worker processes used by the tools that support it",
+    )
+    daemonparser.add_argument(
+        "--tools",
+        nargs="+",
+        default=None,
+        help="only build the given tools, e.g. pylama bandit, requests for "
+        "other tools run locally (default = all the registered tools)",
+    )
+    _add_cache_arguments(daemonparser)
+    _add_socket_argument(daemonparser)
+
+    cacheparser = subparser.add_parser(
+        "cache",
+        help="inspect or clear the per file result cache",
+    )
+    cacheparser.add_argument(
+        "cache_action",
+        choices=["clear", "stats"],
+        help="clear the cache or show statistics about it",
+    )
+    cacheparser.add_argument(
+        "--config",
+        default=os.path.join(os.getcwd(), "pyproject.toml"),
+        help="path of the toml configuration file (default = ./pyproject.toml)",
+    )
+    _add_cache_arguments(cacheparser)
+
+    baselineparser = subparser.add_parser(
+        "baseline",
+        help="record the current findings, so `cqa run --baseline` only "
+        "reports new ones",
+    )
+    baselineparser.add_argument(
+        "baseline_action",
+        choices=["create"],
+        help="analyse the given paths and write their findings to the "
+        "baseline",
+    )
+    baselineparser.add_argument(
+        "--path",
+        nargs="+",
+        default=["."],
+        action=Once,
+        help="path of the files that are to be analysed",
+    )
+    baselineparser.add_argument(
+        "--output",
+        default=".cqa-baseline",
+        metavar="FILE",
+        help="file the baseline is written to (default = ./.cqa-baseline)",
+    )
+    baselineparser.add_argument(
+        "--check",
+        action="store_true",
+        default=False,
+        help="include the files isort and black would change",
+    )
+    baselineparser.add_argument(
+        "--config",
+        default=os.path.join(os.getcwd(), "pyproject.toml"),
+        help="path of the toml configuration file (default = ./pyproject.toml)",
+    )
+    baselineparser.add_argument(
+        "--tools",
+        nargs="+",
+        default=None,
+        help="only run the given tools (default = all the registered tools)",
+    )
+    baselineparser.add_argument(
+        "--exclude",
+        nargs="+",
+        default=[],
+        metavar="PATTERN",
+        help="gitignore style patterns of the paths to skip",
+    )
+    baselineparser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="number of worker processes used by the tools that support it",
+    )
+    _add_cache_arguments(baselineparser)
+    baselineparser.add_argument(
+        "--no-cache",
+        action="store_false",
+        default=True,
+        dest="use_cache",
+        help="analyse every file again, ignoring the per file result cache",
+    )
+    baselineparser.add_argument(
+        "--offline",
+        action="store_true",
+        default=False,
+        help="never download the vulnerability database",
+    )
+    # the whole tree is analysed and nothing is ever formatted
+    baselineparser.set_defaults(
+        format=False,
+        changed_since=None,
+        staged=False,
+        changed_lines_only=False,
+    )
+
+    benchparser = subparser.add_parser(
+        "bench",
+        help="time the tools on a generated repository and report the "
+        "timings as json",
+    )
+    benchparser.add_argument(
+        "--files",
+        type=int,
+        default=200,
+        help="number of modules of the generated repository (default = 200)",
+    )
+    benchparser.add_argument(
+        "--loc",
+        type=int,
+        default=200,
+        help="approximate number of lines of every module (default = 200)",
+    )
+    benchparser.add_argument(
+        "--imports",
+        type=int,
+        default=3,
+        help="number of generated modules imported by every module "
+        "(default = 3)",
+    )
+    benchparser.add_argument(
+        "--package-size",
+        type=int,
+        default=20,
+        dest="package_size",
+        help="number of modules of every package (default = 20)",
+    )
+    benchparser.add_argument(
+        "--defect-rate",
+        type=float,
+        default=0.1,
+        dest="defect_rate",
+        help="share of the modules seeded with each of the lint, type and "
+        "security defects (default = 0.1)",
+    )
+    benchparser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="seed of the generated repository (default = 0)",
+    )
+    benchparser.add_argument(
+        "--repeat",
+        type=int,
+        default=1,
+        help="number of measurements of every runner and tool group "
+        "(default = 1)",
+    )
+    benchparser.add_argument(
+        "--tools",
+        nargs="+",
+        default=None,
+        help="only benchmark the given tools (default = all the registered "
+        "tools)",
+    )
+    benchparser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="number of worker processes used by the tools that support it",
+    )
+    benchparser.add_argument(
+        "--config",
+        default=os.path.join(os.getcwd(), "pyproject.toml"),
+        help="path of the toml configuration file (default = ./pyproject.toml)",
+    )
+    benchparser.add_argument(
+        "--output",
+        default=None,
+        metavar="FILE",
+        help="write the json report to the given file (default = stdout)",
+    )
+    benchparser.add_argument(
+        "--keep",
+        default=None,
+        metavar="DIR",
+        help="generate the repository in the given directory and keep it",
+    )
+    benchparser.add_argument(
+        "--offline",
+        action="store_true",
+        default=False,
+        help="never download the vulnerability database",
+    )
+    _add_cache_arguments(benchparser)
 
     return parser.parse_args()
+
+
+def _add_socket_argument(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--socket",
+        default=None,
+        help="path of the unix socket of the cqa daemon "
+        "(default = derived from the current directory)",
+    )
+
+
+def _add_cache_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--cache-dir",
+        default=None,
+        dest="cache_dir",
+        help="directory of the per file result cache (default = ./.cqa_cache)",
+    )
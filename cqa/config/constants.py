@@ -9,3 +9,4 @@ Versions affected: {affected_versions}
 Get more info: {more_info_url}
 """
 FILE_FORMATTED_ERROR = "File {path} does not satisfy the given configuration, modifying using {linter}.."  # noqa
+FILE_UNFORMATTED_ERROR = "File {path} does not satisfy the given configuration, {linter} would modify it"  # noqa
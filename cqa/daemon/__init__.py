@@ -0,0 +1,4 @@
+"""
+persistent cqa process keeping the runners constructed, so `cqa run --daemon`
+does not pay the cost of importing and configuring every tool on each run
+"""
@@ -0,0 +1,107 @@
+import logging
+import os
+import socket
+from typing import Callable, Iterator, Optional, Tuple, Union
+
+from cqa.types import PackageVulnerability, ReporterError
+
+from . import protocol
+
+LOGGER = logging.getLogger(__name__)
+
+Item = Union[ReporterError, PackageVulnerability]
+
+
+def _connect(socket_path: Optional[str]) -> Optional[socket.socket]:
+    try:
+        path = protocol.get_socket_path(os.getcwd(), socket_path)
+    except PermissionError as exc:
+        LOGGER.warning("not connecting to the cqa daemon: %s", exc)
+        return None
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+    except (FileNotFoundError, ConnectionRefusedError):
+        sock.close()
+        return None
+
+    # the results of a daemon run by another user can not be trusted
+    uid = protocol.peer_uid(sock)
+    if uid is not None and uid != os.getuid():
+        LOGGER.warning(
+            "not connecting to %s, it is served by the user %d", path, uid
+        )
+        sock.close()
+        return None
+    return sock
+
+
+def request(
+    args, on_task_done: Optional[Callable[[], None]] = None
+) -> Optional[Iterator[Tuple[str, Item]]]:
+    """
+    run the analysis described by the ``run`` arguments in the daemon
+
+    :param args: parsed arguments of the ``run`` command
+    :param on_task_done: (Callable) called once all the items of a runner
+                on a shard of the files were yielded
+    :returns: iterator of the name of the tool group and the item found,
+            or None if no daemon is serving the current directory
+    """
+    sock = _connect(getattr(args, "socket", None))
+    if sock is None:
+        return None
+
+    payload = {k: v for k, v in vars(args).items() if k != "daemon"}
+    sock.sendall(
+        protocol.dumps({"action": "run", "cwd": os.getcwd(), "args": payload})
+    )
+
+    stream = sock.makefile("rb")
+    line = stream.readline()
+    message = protocol.loads(line) if line else {"error": "connection closed"}
+    if not message.get("started"):
+        LOGGER.error("cqa daemon failed: %s", message.get("error"))
+        stream.close()
+        sock.close()
+        return None
+
+    return _receive(sock, stream, on_task_done)
+
+
+def _receive(
+    sock: socket.socket,
+    stream,
+    on_task_done: Optional[Callable[[], None]] = None,
+) -> Iterator[Tuple[str, Item]]:
+    with sock, stream:
+        for line in stream:
+            message = protocol.loads(line)
+            if "group" in message:
+                yield message["group"], protocol.decode_item(message["item"])
+            elif message.get("flush"):
+                if on_task_done is not None:
+                    on_task_done()
+            elif "error" in message:
+                raise RuntimeError(f"cqa daemon failed: {message['error']}")
+            elif message.get("done"):
+                return
+
+    raise RuntimeError("cqa daemon closed the connection before completing")
+
+
+def stop(socket_path: Optional[str] = None) -> bool:
+    """
+    ask the daemon serving the current directory to shut down
+
+    :returns: True if a daemon was running
+    """
+    sock = _connect(socket_path)
+    if sock is None:
+        return False
+
+    with sock:
+        sock.sendall(protocol.dumps({"action": "stop"}))
+        sock.recv(1)  # wait until the daemon acknowledges
+    return True
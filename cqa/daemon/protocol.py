@@ -0,0 +1,114 @@
+"""
+messages exchanged between the cqa daemon and its clients
+
+every message is a single line of json. the client sends one request, the
+daemon acknowledges it with a ``started`` or an ``error`` message, then
+sends one message per item as soon as a tool group finds it, and a
+``flush`` message once a runner sent all the items of a shard of the files,
+followed by a final ``done`` or ``error`` message.
+"""
+
+import hashlib
+import json
+import os
+import socket
+import stat
+import struct
+import tempfile
+from typing import Any, Dict, Optional, Union
+
+from cqa.types import PackageVulnerability, ReporterError
+
+ENCODING = "utf-8"
+
+
+def get_socket_dir() -> str:
+    """
+    private directory of the sockets of the daemons of the current user,
+    in ``$XDG_RUNTIME_DIR`` when set and in the temporary directory
+    otherwise, created if needed
+
+    :raises PermissionError: when the directory is not a directory owned by
+                the current user and only accessible to them, as another
+                user could then serve the socket of the daemon
+    """
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        directory = os.path.join(runtime_dir, "cqa")
+    else:
+        directory = os.path.join(tempfile.gettempdir(), f"cqa-{os.getuid()}")
+
+    try:
+        os.mkdir(directory, 0o700)
+    except FileExistsError:
+        pass
+
+    info = os.lstat(directory)
+    if (
+        not stat.S_ISDIR(info.st_mode)
+        or info.st_uid != os.getuid()
+        or stat.S_IMODE(info.st_mode) & 0o077
+    ):
+        raise PermissionError(
+            f"{directory} must be a directory owned by the current user "
+            "and only accessible to them"
+        )
+    return directory
+
+
+def get_socket_path(rootdir: str, socket_path: Optional[str] = None) -> str:
+    """
+    path of the socket of the daemon serving the project at ``rootdir``
+
+    :param rootdir: (str) root directory of the project
+    :param socket_path: (str) explicitly configured socket path, if any
+    :raises PermissionError: see ``get_socket_dir``
+    """
+    if socket_path:
+        return socket_path
+
+    digest = hashlib.sha1(
+        os.path.abspath(rootdir).encode()
+    ).hexdigest()  # nosec
+    return os.path.join(get_socket_dir(), f"{digest[:12]}.sock")
+
+
+def peer_uid(sock: socket.socket) -> Optional[int]:
+    """
+    id of the user of the process at the other end of a unix socket, None
+    on platforms which do not report it
+    """
+    if not hasattr(socket, "SO_PEERCRED"):
+        return None
+    credentials = sock.getsockopt(
+        socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i")
+    )
+    _, uid, _ = struct.unpack("3i", credentials)
+    return uid
+
+
+def dumps(message: Dict[str, Any]) -> bytes:
+    return json.dumps(message).encode(ENCODING) + b"\n"
+
+
+def loads(line: bytes) -> Dict[str, Any]:
+    return json.loads(line.decode(ENCODING))
+
+
+def encode_item(
+    item: Union[ReporterError, PackageVulnerability]
+) -> Dict[str, Any]:
+    return {
+        "kind": "vulnerability"
+        if isinstance(item, PackageVulnerability)
+        else "error",
+        "item": item.to_dict(),
+    }
+
+
+def decode_item(
+    item: Dict[str, Any]
+) -> Union[ReporterError, PackageVulnerability]:
+    if item["kind"] == "vulnerability":
+        return PackageVulnerability.from_dict(item["item"])
+    return ReporterError.from_dict(item["item"])
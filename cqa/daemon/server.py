@@ -0,0 +1,222 @@
+import argparse
+import logging
+import os
+import socket
+import socketserver
+import threading
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from cqa import main as cqa_main
+from cqa.cache import ResultCache
+from cqa.scheduler import ScheduledRunner, Scheduler
+
+from . import protocol
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    server: "DaemonServer"
+
+    def handle(self):
+        message = protocol.loads(self.rfile.readline())
+        if message.get("action") == "stop":
+            self.wfile.write(protocol.dumps({"done": True}))
+            # ``shutdown`` blocks until ``serve_forever`` returns, so it can
+            # not be called from the thread serving the request
+            threading.Thread(target=self.server.shutdown).start()
+            return
+
+        if os.path.abspath(message.get("cwd", "")) != self.server.rootdir:
+            self.wfile.write(
+                protocol.dumps(
+                    {"error": f"daemon is serving {self.server.rootdir}"}
+                )
+            )
+            return
+
+        args = argparse.Namespace(**message["args"])
+        error = self.server.check(args)
+        if error is not None:
+            self.wfile.write(protocol.dumps({"error": error}))
+            return
+
+        self.wfile.write(protocol.dumps({"started": True}))
+        self.wfile.flush()
+        try:
+            for name, item in self.server.run(
+                args, on_task_done=self._send_flush
+            ):
+                self.wfile.write(
+                    protocol.dumps(
+                        {"group": name, "item": protocol.encode_item(item)}
+                    )
+                )
+                self.wfile.flush()
+        except Exception as exc:  # pylint: disable=broad-except
+            self.server.LOGGER.exception("failed to run the analysis")
+            self.wfile.write(protocol.dumps({"error": repr(exc)}))
+            return
+
+        self.wfile.write(protocol.dumps({"done": True}))
+
+    def _send_flush(self):
+        # the client renders the items it holds back
+        self.wfile.write(protocol.dumps({"flush": True}))
+        self.wfile.flush()
+
+
+class DaemonServer(socketserver.UnixStreamServer):
+    """
+    serves one analysis at a time with runners that are constructed once,
+    and constructed again whenever the config file changes
+    """
+
+    LOGGER = logging.getLogger(__name__)
+
+    def __init__(self, socket_path: str, args):
+        self.rootdir = os.getcwd()
+        self._args = args
+        self._config_mtime: Optional[float] = None
+        self._config: Dict = {}
+        self._runners: List[ScheduledRunner] = []
+        # worker processes are kept across runs along with the runners
+        # they built
+        self._scheduler: Optional[Scheduler] = None
+        self._cache: Optional[ResultCache] = None
+
+        self.reload()
+        super().__init__(socket_path, _RequestHandler)
+        os.chmod(socket_path, 0o600)
+
+    def verify_request(self, request, client_address) -> bool:
+        # only the user running the daemon may use it
+        uid = protocol.peer_uid(request)
+        if uid is not None and uid != os.getuid():
+            self.LOGGER.warning("refused a request of the user %d", uid)
+            return False
+        return True
+
+    def _get_config_mtime(self) -> Optional[float]:
+        try:
+            return os.stat(self._args.config).st_mtime
+        except FileNotFoundError:
+            return None
+
+    def reload(self):
+        """
+        load the config and construct the runners again
+        """
+        self.LOGGER.info("loading config from %s", self._args.config)
+        self._config_mtime = self._get_config_mtime()
+        self._config = cqa_main.get_cqa_config(self._args.config)
+        self._runners = cqa_main.create_runners(self._args, self._config)
+
+        if self._scheduler is not None:
+            self._scheduler.close()
+        self._scheduler = Scheduler(
+            jobs=cqa_main.get_jobs(self._args, self._config)
+        )
+
+        if self._cache is not None:
+            self._cache.close()
+        self._cache = cqa_main.get_cache(
+            self._args, self._config.get("cache", {})
+        )
+
+    def check(self, args) -> Optional[str]:
+        """
+        find the options of a request the daemon can not honour, as its
+        runners, workers and cache were built for its own options
+
+        :returns: (str) reason the request is rejected, None if it can run
+        """
+        unsupported = []
+        if os.path.abspath(getattr(args, "config", "")) != os.path.abspath(
+            self._args.config
+        ):
+            unsupported.append("--config")
+        cache_dir = getattr(args, "cache_dir", None)
+        if cache_dir is not None:
+            if os.path.abspath(cache_dir) != os.path.abspath(
+                self._cache.directory
+            ):
+                unsupported.append("--cache-dir")
+        if getattr(args, "jobs", None) is not None and (
+            cqa_main.get_jobs(args, self._config) != self._scheduler.jobs
+        ):
+            unsupported.append("--jobs")
+        tools = getattr(args, "tools", None)
+        if self._args.tools is not None and (
+            tools is None or not set(tools) <= set(self._args.tools)
+        ):
+            unsupported.append("--tools")
+
+        if not unsupported:
+            return None
+        return (
+            f"the options {', '.join(unsupported)} differ from the ones the "
+            "daemon was started with"
+        )
+
+    def run(
+        self, args, on_task_done: Optional[Callable[[], None]] = None
+    ) -> Iterator[Tuple[str, cqa_main.Item]]:
+        if self._get_config_mtime() != self._config_mtime:
+            self.reload()
+
+        cache = self._cache if getattr(args, "use_cache", True) else None
+        try:
+            yield from cqa_main.stream_tools(
+                args,
+                self._config,
+                runners=self._runners,
+                cache=cache,
+                scheduler=self._scheduler,
+                on_task_done=on_task_done,
+            )
+        finally:
+            self._cache.flush()
+
+    def server_close(self):
+        super().server_close()
+        if self._scheduler is not None:
+            self._scheduler.close()
+        if self._cache is not None:
+            self._cache.close()
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+
+
+def _remove_stale_socket(socket_path: str):
+    """
+    remove the socket left behind by a daemon which did not shut down cleanly
+    """
+    if not os.path.exists(socket_path):
+        return
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+    except ConnectionRefusedError:
+        os.unlink(socket_path)
+        return
+    finally:
+        sock.close()
+
+    raise RuntimeError(f"cqa daemon is already listening on {socket_path}")
+
+
+def serve(args):
+    """
+    run the daemon for the current directory until it is stopped
+
+    :param args: parsed arguments of the ``daemon`` command
+    """
+    socket_path = protocol.get_socket_path(os.getcwd(), args.socket)
+    _remove_stale_socket(socket_path)
+
+    with DaemonServer(socket_path, args) as server:
+        server.LOGGER.warning("cqa daemon listening on %s", socket_path)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
@@ -1,15 +1,60 @@
+"""
+entrypoint of the cqa command
+
+the tools, the reporters and their dependencies are only imported once a
+command needs them, so that ``cqa -h``, ``cqa hook`` and small runs start
+quickly
+"""
+
+import contextlib
 import logging
 import os
 import sys
-from concurrent.futures import ALL_COMPLETED, ThreadPoolExecutor, wait
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
-import toml
-
-from cqa import utils
+from cqa import registry, utils
 from cqa.cli.args import get_args
-from cqa.reporters.console import ConsoleReporter
-from cqa.securitytools.base import SecurityTools, VulnerabilityRunner
-from cqa.statictools.base import Formatter, Linter
+from cqa.types import PackageVulnerability, ReporterError, Severity
+from cqa.utils import vcs
+from cqa.utils.sources import SourceStore
+
+if TYPE_CHECKING:
+    from cqa.cache import ResultCache
+    from cqa.reporters import Reporter
+    from cqa.scheduler import ScheduledRunner, Scheduler
+
+Item = Union[ReporterError, PackageVulnerability]
+
+DEFAULT_CONFIG = os.path.join(os.getcwd(), "pyproject.toml")
+
+# name of each tool group in the registry
+REGISTRY_GROUPS = {
+    "linter": "linter",
+    "formatter": "formatter",
+    "security": "sec",
+    "vulnerability": "vuln",
+}
+
+# tool groups whose runners analyse the discovered files
+FILE_GROUPS = ("linter", "formatter", "security")
+
+# tool groups which are reported, along with their headers
+REPORT_HEADERS = {
+    "linter": "Formatting Issues",
+    "formatter": "Unformatted Files",
+    "security": "Security Issues",
+    "vulnerability": "Vulnerability Issues",
+}
 
 
 def get_cqa_config(path: str):
@@ -17,13 +62,15 @@ def get_cqa_config(path: str):
         logging.error("config file not found, using baseline config")
         return {}
 
+    import toml  # noqa
+
     config = toml.load(path)
     return config.get("tool", {}).get("cqa", {})
 
 
 def main():
     args = get_args()
-    config = get_cqa_config(args.config)
+    config = get_cqa_config(getattr(args, "config", DEFAULT_CONFIG))
     logging.basicConfig(level=logging.ERROR)
 
     if getattr(args, "action") != "run":
@@ -31,44 +78,367 @@ def main():
             utils.install_git_hook()
             return
 
-    with ThreadPoolExecutor(max_workers=4) as _executor:
-        _linter_fut = _executor.submit(
-            _get_linter_result, args, config.get("linter", {})
-        )
-        _formatter_fut = _executor.submit(
-            _get_formatter_result, args, config.get("formatter", {})
-        )
-        _security_fut = _executor.submit(
-            _get_secuirty_result, args, config.get("sec", {})
+        if getattr(args, "action") == "cache":
+            _run_cache_action(args, config.get("cache", {}))
+            return
+
+        if getattr(args, "action") == "daemon":
+            _run_daemon_action(args)
+            return
+
+        if getattr(args, "action") == "bench":
+            _run_bench_action(args, config)
+            return
+
+        if getattr(args, "action") == "baseline":
+            _run_baseline_action(args, config)
+            return
+
+    profiler = None
+    if getattr(args, "profile", None) is not None:
+        profiler = utils.Profiler()
+
+    report = getattr(args, "report", "console")
+    # files are read once for the tools and the reporter
+    sources = SourceStore()
+    cache = None
+    try:
+        with open_reporter(
+            sources=sources,
+            report=report,
+            output=getattr(args, "output", None),
+        ) as reporter:
+            items = None
+            if getattr(args, "daemon", False) and profiler is not None:
+                logging.warning("profiling runs locally, ignoring --daemon")
+            elif getattr(args, "daemon", False):
+                from cqa.daemon import client  # noqa
+
+                items = client.request(args, on_task_done=reporter.flush)
+                if items is None:
+                    logging.warning(
+                        "cqa daemon is not running, running locally"
+                    )
+
+            if items is None:
+                if getattr(args, "use_cache", True):
+                    cache = get_cache(args, config.get("cache", {}))
+                items = stream_tools(
+                    args,
+                    config,
+                    cache=cache,
+                    sources=sources,
+                    profiler=profiler,
+                    on_task_done=reporter.flush,
+                )
+            errors = _add_items(reporter, items, report)
+    finally:
+        sources.close()
+        if profiler is not None:
+            _report_profile(profiler, args.profile, args.profile_top)
+        if cache is not None:
+            logging.info(
+                "cache hits: %d, misses: %d", cache.hits, cache.misses
+            )
+            cache.close()
+
+    _exit_on_errors(errors, getattr(args, "fail", False))
+
+
+def stream_tools(
+    args,
+    config: Dict,
+    runners: Optional[List["ScheduledRunner"]] = None,
+    cache: Optional["ResultCache"] = None,
+    sources: Optional[SourceStore] = None,
+    profiler: Optional[utils.Profiler] = None,
+    scheduler: Optional["Scheduler"] = None,
+    baseline: Optional[utils.Baseline] = None,
+    on_task_done: Optional[Callable[[], None]] = None,
+) -> Iterator[Tuple[str, Item]]:
+    """
+    run all the tool groups for the paths given on the command line, and
+    yield their results as soon as they are found
+
+    :param args: parsed arguments of the ``run`` command
+    :param config: (Dict) the ``[tool.cqa]`` section of the config file
+    :param runners: (List) already constructed runners of the linter,
+                formatter and security groups, built from ``config`` when
+                not given
+    :param cache: (ResultCache) per file result cache, if any
+    :param sources: (SourceStore) store the files are read from, a store
+                is created for the run when not given
+    :param profiler: (Profiler) records the cost of every runner and file
+    :param scheduler: (Scheduler) runs the tasks of the runners, a
+                scheduler with ``--jobs`` workers is created for the run
+                when not given
+    :param baseline: (Baseline) findings which are not reported, read
+                from ``--baseline`` when not given
+    :param on_task_done: (Callable) called once all the items of a runner
+                on a shard of the files were yielded, e.g. ``flush`` of the
+                reporter
+    :returns: iterator of the name of the tool group and the item found
+    """
+    from cqa.scheduler import COSTS_NAME, CostModel, Scheduler  # noqa
+
+    line_filter = None
+    if args.changed_since or args.staged:
+        args.path = _get_changed_paths(args)
+        if not args.path:
+            logging.warning("no python files changed, nothing to analyse")
+            return
+
+        if args.staged:
+            unstaged = vcs.get_unstaged_files(args.path)
+            if unstaged:
+                logging.warning(
+                    "analysing the working tree of the files with unstaged "
+                    "changes, rather than their staged version: %s",
+                    ", ".join(unstaged),
+                )
+
+        if args.changed_lines_only:
+            line_filter = vcs.ChangedLines(
+                vcs.get_changed_lines(
+                    args.changed_since, args.staged, paths=args.path
+                ),
+                rootdir=os.getcwd(),
+            )
+
+    # files are discovered once and shared by all the tool groups
+    discovery = (
+        contextlib.nullcontext({})
+        if profiler is None
+        else profiler.span("discover files", "cqa")
+    )
+    with discovery as span:
+        files = utils.discover_files(
+            args.path,
+            rootdir=os.getcwd(),
+            exclude=config.get("exclude", []) + getattr(args, "exclude", []),
         )
-        _vuln_fut = _executor.submit(
-            _get_vulnerability_result, config.get("vuln", {})
+        span["files"] = len(files)
+
+    if baseline is None and getattr(args, "baseline", None) is not None:
+        baseline = _get_baseline(args.baseline)
+
+    if runners is None:
+        runners = create_runners(args, config)
+    elif getattr(args, "tools", None) is not None:
+        # runners built beforehand, e.g. by the daemon, may include tools
+        # which were not requested
+        runners = [
+            runner for runner in runners if runner.ref.tool in args.tools
+        ]
+    # the formatters and the vulnerability runners depend on the arguments
+    # of every run
+    runners = _with_formatters(
+        args, config, runners
+    ) + _create_vulnerability_runners(args, config)
+
+    owns_sources = sources is None
+    if owns_sources:
+        sources = SourceStore()
+    owns_scheduler = scheduler is None
+    if owns_scheduler:
+        scheduler = Scheduler(jobs=get_jobs(args, config))
+
+    # the cost model is kept along with the result cache, and only in
+    # memory when the cache is disabled
+    costs = CostModel(
+        os.path.join(_get_cache_dir(args, config.get("cache", {})), COSTS_NAME)
+        if getattr(args, "use_cache", True)
+        else None
+    )
+    try:
+        items = scheduler.run(
+            runners,
+            files,
+            rootdir=os.getcwd(),
+            cache=cache,
+            costs=costs,
+            sources=sources,
+            line_filter=line_filter,
+            profiler=profiler,
+            on_task_done=on_task_done,
         )
+        # the same problem found by several tools is only reported once
+        if config.get("deduplicate", True):
+            items = utils.deduplicate(items)
+        # the known findings are dropped before they are collected or
+        # reported, which skips rendering them altogether
+        if baseline is not None:
+            items = baseline.filter(items, sources=sources)
+        yield from items
+    finally:
+        costs.save()
+        if owns_scheduler:
+            scheduler.close()
+        if owns_sources:
+            sources.close()
 
-        _futures = [_linter_fut, _security_fut, _vuln_fut]
-        if getattr(args, "format", False):  # If `format` is specified
-            _futures.append(_formatter_fut)
-
-        # Wait until all the coroutines are completed
-        wait(_futures, return_when=ALL_COMPLETED)
-
-        linter_result = _linter_fut.result()
-        formatter_result = _formatter_fut.result()
-        security_result = _security_fut.result()
-        vuln_result = _vuln_fut.result()
-
-    reporter = ConsoleReporter()
-    reporter.report(linter_result, header="Formatting Issues")
-    reporter.report(security_result, header="Security Issues")
-    reporter.report(vuln_result, header="Vulnerability Issues")
-
-    if getattr(args, "fail", False):
-        if (
-            linter_result.errors
-            or formatter_result.errors
-            or security_result.errors
-            or vuln_result.errors
-        ):
+
+def create_runners(args, config: Dict) -> List["ScheduledRunner"]:
+    """
+    construct the runners of the linter, formatter and security groups
+    once, so they can be reused across several calls of ``stream_tools``,
+    the formatters are only constructed with ``--format`` or ``--check``
+    """
+    options = {
+        name: config.get(REGISTRY_GROUPS[name], {})
+        for name in FILE_GROUPS
+        if name != "formatter"
+    }
+    # the stubs inferred by pytype are kept along with the result cache
+    linter = options["linter"]
+    options["linter"] = {
+        **linter,
+        "pytype": {
+            "cache-dir": os.path.join(
+                _get_cache_dir(args, config.get("cache", {})), "pytype"
+            ),
+            **linter.get("pytype", {}),
+        },
+    }
+    return _with_formatters(args, config, _create_runners(args, options))
+
+
+def _with_formatters(
+    args, config: Dict, runners: List["ScheduledRunner"]
+) -> List["ScheduledRunner"]:
+    # files are only formatted with ``--format``, and only checked without
+    # being written with ``--check``
+    check = getattr(args, "check", False)
+    others = [runner for runner in runners if runner.name != "formatter"]
+    if not (check or getattr(args, "format", False)):
+        return others
+
+    formatters = [
+        runner
+        for runner in runners
+        if runner.name == "formatter"
+        and runner.ref.options.get("check", False) == check
+    ]
+    if not formatters:
+        options = config.get(REGISTRY_GROUPS["formatter"], {})
+        if check:
+            options = {**options, "check": True}
+        formatters = _create_runners(args, {"formatter": options})
+    return formatters + others
+
+
+def _create_vulnerability_runners(
+    args, config: Dict
+) -> List["ScheduledRunner"]:
+    # the vulnerability database is kept along with the result cache
+    options = {
+        "cache-dir": os.path.join(
+            _get_cache_dir(args, config.get("cache", {})), "safety"
+        ),
+        **config.get("vuln", {}),
+    }
+    if getattr(args, "offline", False):
+        options["offline"] = True
+    return _create_runners(args, {"vulnerability": options})
+
+
+def _create_runners(args, options: Dict[str, Dict]) -> List["ScheduledRunner"]:
+    from cqa.scheduler import RunnerRef, ScheduledRunner  # noqa
+
+    runners = []
+    for name, group_options in options.items():
+        group = REGISTRY_GROUPS[name]
+        for tool in registry.get_specs(group, getattr(args, "tools", None)):
+            ref = RunnerRef(group, tool, group_options)
+            runners.append(ScheduledRunner(name, ref, ref.create()))
+    return runners
+
+
+def get_jobs(args, config: Dict) -> int:
+    """
+    number of worker processes of the run, from ``--jobs`` or the ``jobs``
+    option of the config
+    """
+    return utils.resolve_jobs(
+        getattr(args, "jobs", None), default=config.get("jobs", 1)
+    )
+
+
+def report_results(
+    items: Iterable[Tuple[str, Item]],
+    fail: bool = False,
+    sources: Optional[SourceStore] = None,
+    report: str = "console",
+    output: Optional[str] = None,
+):
+    """
+    render the items as they arrive, then exit with a non-zero code when
+    ``fail`` is set and errors were found
+
+    :param report: (str) format of the report, one of ``REPORTERS``
+    :param output: (str) file the report is written to, the standard
+                output when None
+    """
+    reporting = open_reporter(sources=sources, report=report, output=output)
+    with reporting as reporter:
+        errors = _add_items(reporter, items, report)
+    _exit_on_errors(errors, fail)
+
+
+@contextlib.contextmanager
+def open_reporter(
+    sources: Optional[SourceStore] = None,
+    report: str = "console",
+    output: Optional[str] = None,
+) -> Iterator["Reporter"]:
+    """
+    create and start a reporter, it is finished at the end of the ``with``
+    statement
+
+    :param report: (str) format of the report, one of ``REPORTERS``
+    :param output: (str) file the report is written to, the standard
+                output when None
+    """
+    from cqa.reporters import create_reporter  # noqa
+
+    with contextlib.ExitStack() as stack:
+        file = None
+        if output is not None:
+            file = stack.enter_context(open(output, "w", encoding="utf-8"))
+        reporter = create_reporter(report, file=file, sources=sources)
+        reporter.start()
+        yield reporter
+        reporter.finish()
+
+
+def _add_items(
+    reporter: "Reporter", items: Iterable[Tuple[str, Item]], report: str
+) -> int:
+    """
+    add the items to the reporter as they arrive
+
+    :returns: (int) number of errors among the items
+    """
+    # the console shows a header per tool group, the other formats name the
+    # tool group of every item
+    headers = (
+        REPORT_HEADERS
+        if report == "console"
+        else {name: name for name in REPORT_HEADERS}
+    )
+
+    errors = 0
+    for name, item in items:
+        if item.severity == Severity.ERROR:
+            errors += 1
+        if name in headers:
+            reporter.add(item, header=headers[name])
+    return errors
+
+
+def _exit_on_errors(errors: int, fail: bool):
+    if fail:
+        if errors:
             logging.critical(
                 "Could not create a commit as there \
                     are errors in your committed code"
@@ -76,33 +446,155 @@ def main():
             sys.exit(1)
 
 
-def _get_linter_result(args, config):
-    linter = Linter(
-        args.path,
-        rootdir=os.getcwd(),
-        options=config,
-    )
-    return linter.run()
+def _get_changed_paths(args) -> List[str]:
+    """
+    changed python files which are located under one of the given paths
+    """
+    roots = [os.path.abspath(path) for path in args.path]
+    return [
+        path
+        for path in vcs.get_changed_files(args.changed_since, args.staged)
+        if any(
+            os.path.commonpath([root, os.path.abspath(path)]) == root
+            for root in roots
+        )
+    ]
 
 
-def _get_formatter_result(args, config):
-    formatter = Formatter(
-        args.path,
-        rootdir=os.getcwd(),
-        options=config,
-    )
-    return formatter.run()
+def _get_baseline(path: str) -> Optional[utils.Baseline]:
+    try:
+        return utils.Baseline.load(path, rootdir=os.getcwd())
+    except FileNotFoundError:
+        logging.error("baseline %s not found, reporting all findings", path)
+    except ValueError as error:
+        logging.error("%s, reporting all findings", error)
+    return None
 
 
-def _get_secuirty_result(args, config):
-    securitytools = SecurityTools(
-        args.path,
-        rootdir=os.getcwd(),
-        options=config,
-    )
-    return securitytools.run()
+def get_cache(args, config) -> "ResultCache":
+    from cqa.cache import ResultCache  # noqa
+
+    if getattr(args, "cache_dir", None) is not None:
+        config = {**config, "directory": args.cache_dir}
+    return ResultCache.from_config(config, rootdir=os.getcwd())
+
+
+def _get_cache_dir(args, config) -> str:
+    from cqa.cache import DEFAULT_CACHE_DIR  # noqa
+
+    directory = getattr(args, "cache_dir", None)
+    if directory is None:
+        directory = config.get("directory", DEFAULT_CACHE_DIR)
+    return os.path.join(os.getcwd(), directory)
 
 
-def _get_vulnerability_result(config):
-    vulnerabilitytool = VulnerabilityRunner(config)
-    return vulnerabilitytool.run()
+def _report_profile(profiler: utils.Profiler, path: str, top: int):
+    """
+    write the trace of the run and print the slowest files, on the standard
+    error so they never mix with a report written to the standard output
+    """
+    import rich  # noqa
+    from rich.table import Table  # noqa
+
+    profiler.write(path)
+
+    costs = profiler.slowest(top)
+    if costs:
+        table = Table(title=f"{len(costs)} slowest files")
+        table.add_column("file")
+        table.add_column("seconds", justify="right")
+        table.add_column("slowest runner")
+        for cost in costs:
+            runner, seconds = max(
+                cost.runners.items(), key=lambda item: item[1]
+            )
+            table.add_row(
+                cost.path, f"{cost.seconds:.3f}", f"{runner} ({seconds:.3f})"
+            )
+        rich.print(table, file=sys.stderr)
+    rich.print(f"profile written to {path}", file=sys.stderr)
+
+
+def _run_cache_action(args, config):
+    import rich  # noqa
+
+    cache = get_cache(args, config)
+    if args.cache_action == "clear":
+        cache.clear()
+        rich.print(f"cleared the cache at {cache.directory}")
+    else:
+        stats = cache.stats()
+        rich.print(f"directory: {stats['directory']}")
+        rich.print(f"entries:   {stats['entries']}")
+        rich.print(
+            f"size:      {stats['size'] / 1024 / 1024:.2f} MB"
+            f" / {stats['max_size'] / 1024 / 1024:.2f} MB"
+        )
+        for tool, count in sorted(stats["tools"].items()):
+            rich.print(f"  {tool}: {count} entries")
+    cache.close()
+
+
+def _run_baseline_action(args, config):
+    import rich  # noqa
+
+    cache = None
+    if args.use_cache:
+        cache = get_cache(args, config.get("cache", {}))
+
+    sources = SourceStore()
+    baseline = utils.Baseline(rootdir=os.getcwd())
+    try:
+        for _, item in stream_tools(
+            args, config, cache=cache, sources=sources
+        ):
+            baseline.add(item, sources=sources)
+    finally:
+        sources.close()
+        if cache is not None:
+            cache.close()
+
+    baseline.save(args.output)
+    rich.print(f"{len(baseline)} findings written to {args.output}")
+
+
+def _run_daemon_action(args):
+    from cqa.daemon import client, server  # noqa
+
+    if args.stop:
+        if not client.stop(args.socket):
+            logging.warning("cqa daemon is not running")
+        return
+
+    server.serve(args)
+
+
+def _run_bench_action(args, config):
+    import json  # noqa
+
+    from cqa.bench import Benchmark, RepoShape  # noqa
+
+    benchmark = Benchmark(
+        shape=RepoShape(
+            files=args.files,
+            loc=args.loc,
+            imports=args.imports,
+            package_size=args.package_size,
+            defect_rate=args.defect_rate,
+        ),
+        seed=args.seed,
+        config=config,
+        tools=args.tools,
+        jobs=args.jobs,
+        repeat=args.repeat,
+        cache_dir=_get_cache_dir(args, config.get("cache", {})),
+        offline=args.offline,
+    )
+    report = benchmark.run(directory=args.keep)
+
+    if args.output is None:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
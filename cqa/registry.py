@@ -0,0 +1,141 @@
+"""
+registry of the runners known to cqa
+
+runners are referenced by their import path and only imported once a tool
+group actually runs them, so commands which do not run any tool do not pay
+for importing pytype, bandit, safety and friends. third party runners can be
+registered through the ``cqa.runners`` entry point group, the name of the
+entry point being ``<group>.<tool>``, e.g. ``linter.mypy = mypkg:MypyRunner``.
+"""
+
+import functools
+import importlib
+import logging
+from typing import Dict, Iterable, List, NamedTuple, Optional, Type
+
+from cqa.base import Runner
+
+LOGGER = logging.getLogger(__name__)
+
+ENTRY_POINT_GROUP = "cqa.runners"
+
+
+class RunnerSpec(NamedTuple):
+    # tool group running the runner, i.e. linter, formatter, sec or vuln
+    group: str
+    # import path of the runner class, as ``module:attribute``
+    target: str
+    # key of the options of the runner inside the config of its group, the
+    # whole config of the group is passed to the runner when None
+    section: Optional[str]
+
+
+BUILTIN_RUNNERS: Dict[str, RunnerSpec] = {
+    "pylama": RunnerSpec(
+        "linter", "cqa.statictools.pylama:PylamaRunner", "pylama"
+    ),
+    "pytype": RunnerSpec(
+        "linter", "cqa.statictools.pytype:PytypeRunner", "pytype"
+    ),
+    "format": RunnerSpec(
+        "formatter", "cqa.statictools.pipeline:FormatPipelineRunner", None
+    ),
+    "bandit": RunnerSpec(
+        "sec", "cqa.securitytools.bandit:BanditRunner", "bandit"
+    ),
+    "detect-secrets": RunnerSpec(
+        "sec",
+        "cqa.securitytools.detect_secrets:DetectSecretsRunner",
+        "detect-secrets",
+    ),
+    "safety": RunnerSpec(
+        "vuln", "cqa.securitytools.safety:SafetyRunner", None
+    ),
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _plugin_runners() -> Dict[str, RunnerSpec]:
+    # looking up the entry points reads the metadata of every installed
+    # distribution, so it is only done once runners are needed and then kept
+    # for the life of the process, callers must not modify the mapping
+    try:
+        from importlib import metadata
+    except ImportError:  # python < 3.8
+        import importlib_metadata as metadata
+
+    plugins = {}
+    try:
+        entry_points = metadata.entry_points(group=ENTRY_POINT_GROUP)
+    except TypeError:  # python < 3.10
+        entry_points = metadata.entry_points().get(ENTRY_POINT_GROUP, [])
+
+    for entry_point in entry_points:
+        group, _, tool = entry_point.name.partition(".")
+        if not tool:
+            LOGGER.warning(
+                "ignoring runner %s, expected a name like <group>.<tool>",
+                entry_point.name,
+            )
+            continue
+        plugins[tool] = RunnerSpec(group, entry_point.value, tool)
+    return plugins
+
+
+def get_specs(
+    group: str, tools: Optional[Iterable[str]] = None
+) -> Dict[str, RunnerSpec]:
+    """
+    find the runners of a tool group
+
+    :param group: (str) name of the tool group
+    :param tools: (Iterable[str]) names of the selected tools, all the tools
+                of the group are selected when None
+    :returns: mapping of tool name to the spec of its runner
+    """
+    specs = {
+        name: spec
+        for name, spec in {**BUILTIN_RUNNERS, **_plugin_runners()}.items()
+        if spec.group == group
+    }
+    if tools is not None:
+        tools = set(tools)
+        specs = {name: spec for name, spec in specs.items() if name in tools}
+    return specs
+
+
+def load(spec: RunnerSpec) -> Type[Runner]:
+    """
+    import the runner class described by ``spec``
+    """
+    module, _, attribute = spec.target.partition(":")
+    return getattr(importlib.import_module(module), attribute)
+
+
+def get_options(spec: RunnerSpec, options: Dict) -> Dict:
+    """
+    options of the runner described by ``spec`` in the config of its group
+    """
+    if spec.section is None:
+        return options
+    return options.get(spec.section, {})
+
+
+def create_runners(
+    group: str,
+    options: Dict,
+    jobs: Optional[int] = None,
+    tools: Optional[Iterable[str]] = None,
+) -> List[Runner]:
+    """
+    import and construct the selected runners of a tool group
+
+    :param group: (str) name of the tool group
+    :param options: (Dict) config of the tool group
+    :param jobs: (int) number of worker processes the runners may use
+    :param tools: (Iterable[str]) names of the selected tools
+    """
+    runners = []
+    for spec in get_specs(group, tools).values():
+        runners.append(load(spec)(get_options(spec, options), jobs=jobs))
+    return runners
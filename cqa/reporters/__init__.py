@@ -0,0 +1,53 @@
+"""
+reporters of the results of a run, by the name given to ``--report``
+
+reporters are only imported once used, as the console reporter depends on
+rich
+"""
+
+import importlib
+import sys
+from typing import TYPE_CHECKING, Dict, Optional, TextIO
+
+from .base import Reporter as Reporter
+
+if TYPE_CHECKING:
+    from cqa.utils.sources import SourceStore
+
+REPORTERS: Dict[str, str] = {
+    "console": "cqa.reporters.console:ConsoleReporter",
+    "json": "cqa.reporters.jsonl:JsonReporter",
+    "jsonl": "cqa.reporters.jsonl:JsonLinesReporter",
+    "sarif": "cqa.reporters.sarif:SarifReporter",
+    "junit": "cqa.reporters.junit:JUnitReporter",
+}
+
+
+def create_reporter(
+    name: str,
+    file: Optional[TextIO] = None,
+    sources: Optional["SourceStore"] = None,
+) -> Reporter:
+    """
+    construct the reporter of the given format
+
+    :param name: (str) format of the report, one of ``REPORTERS``
+    :param file: (TextIO) file the report is written to, the standard
+                output when None
+    :param sources: (SourceStore) store the console reporter reads the
+                snippets from
+    """
+    module, _, attribute = REPORTERS[name].partition(":")
+    reporter_class = getattr(importlib.import_module(module), attribute)
+
+    if name == "console":
+        console = None
+        if file is not None:
+            from rich.console import Console  # noqa
+
+            console = Console(file=file, theme=reporter_class.custom_theme)
+        return reporter_class(sources=sources, console=console)
+
+    if file is None:
+        file = sys.stdout
+    return reporter_class(file)
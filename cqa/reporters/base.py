@@ -1,9 +1,94 @@
+import itertools
+from typing import Any, Dict, Optional, TextIO, Union
+
+from cqa.types import PackageVulnerability, ReporterError, Result
+
+
 class Reporter:
     """
     abstract base class for all the reporters
+
+    results are either reported all at once with ``report``, or streamed:
+    ``start`` is called before the first item, ``add`` for every item as
+    soon as it is found, ``flush`` once a runner added all the items of a
+    shard of the files, and ``finish`` once all the tools completed
     """
 
     def report(self, *_):
         raise NotImplementedError(
             f"method report not implemented for {self.__class__.__name__}"
         )
+
+    def start(self):
+        """
+        called before the first item is added
+        """
+
+    def add(self, *_):
+        raise NotImplementedError(
+            f"method add not implemented for {self.__class__.__name__}"
+        )
+
+    def flush(self):
+        """
+        called once a runner added all the items of a shard of the files,
+        the items held back until then can be rendered
+        """
+
+    def finish(self):
+        """
+        called once all the items have been added
+        """
+
+
+class FileReporter(Reporter):
+    """
+    base class for the machine readable reporters, every item is written
+    to ``file`` as soon as it is added and never kept in memory
+
+    ``header`` is the name of the tool group which found the item
+    """
+
+    def __init__(self, file: TextIO):
+        """
+        :param file: (TextIO) file the report is written to
+        """
+        self._file = file
+
+    def report(self, result: Result, header=None):
+        """
+        add all the items of ``result``, between ``start`` and ``finish``
+        """
+        for item in itertools.chain(
+            result.errors, result.warnings, result.info
+        ):
+            self.add(item, header=header)
+
+
+def to_record(
+    item: Union[ReporterError, PackageVulnerability], group: Optional[str]
+) -> Dict[str, Any]:
+    """
+    json compatible record of an item found by the tool group ``group``
+    """
+    return {
+        "group": group,
+        "kind": "vulnerability"
+        if isinstance(item, PackageVulnerability)
+        else "error",
+        **item.to_dict(),
+        "severity": item.severity.value,
+        "message": item.message,
+    }
+
+
+def get_rule_id(
+    item: Union[ReporterError, PackageVulnerability], group: Optional[str]
+) -> str:
+    """
+    identifier of the check which reported an item, e.g. the pylama error
+    code, or the tool, or the tool group, when the tool does not give one
+    """
+    if isinstance(item, PackageVulnerability):
+        return item.vulnerability_id
+    return item.code or item.tool or str(group)
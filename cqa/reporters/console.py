@@ -1,14 +1,23 @@
 import itertools
-from typing import List, Union
+import os
+from collections import Counter
+from typing import Dict, List, Optional, Union
 
-import rich
 from rich.console import Console
 from rich.panel import Panel
 from rich.syntax import Syntax
 from rich.theme import Theme
 
 from cqa.reporters.base import Reporter
-from cqa.types import PackageVulnerability, ReporterError, Result
+from cqa.types import PackageVulnerability, ReporterError, Result, Severity
+from cqa.utils.sources import SourceStore
+
+# snippets of source printed per file, only the messages of the other items
+# of the file are printed
+DEFAULT_MAX_SNIPPETS = 10
+
+# lines printed before and after the line of an item
+CONTEXT_LINES = 1
 
 
 class ConsoleReporter(Reporter):
@@ -17,69 +26,231 @@ class ConsoleReporter(Reporter):
         {"info": "dim cyan", "warning": "yellow", "error": "bold red"},
     )
 
-    def report(self, result: Result, header=None):
-        console = Console(theme=self.custom_theme)
+    def __init__(
+        self,
+        sources: Optional[SourceStore] = None,
+        max_snippets: Optional[int] = DEFAULT_MAX_SNIPPETS,
+        plain: Optional[bool] = None,
+        console: Optional[Console] = None,
+    ):
+        """
+        :param sources: (SourceStore) store the snippets are read from, so
+                    the files already read by the tools are not read again
+        :param max_snippets: (int) snippets of source printed per file, no
+                    limit when None
+        :param plain: (bool) print plain text without any highlighting,
+                    the default when the output is not a terminal or runs
+                    in CI
+        :param console: (Console) console the report is printed to
+        """
+        if sources is None:
+            sources = SourceStore()
+        self._sources = sources
+        self._console = console or Console(theme=self.custom_theme)
+        if plain is None:
+            plain = not self._console.is_terminal or "CI" in os.environ
+        self.plain = plain
+        self.max_snippets = max_snippets
 
-        rich.print(Panel(header, title_align="center"))
+        # lexer of every file a snippet was printed from
+        self._lexers: Dict[str, str] = {}
+        self._snippets: Counter = Counter()
 
-        self._report_helper(
-            console,
-            result.errors,
-            header="Errors",
-        )
+        self._header: Optional[str] = None
+        self._path: Optional[str] = None
+        self._lnum: Optional[int] = None
+        self._counts: Dict[str, Counter] = {}
+        # items added since the last flush, indexed by path
+        self._pending = Result()
 
-        self._report_helper(
-            console,
-            result.warnings,
-            header="Warnings",
-        )
+    def start(self):
+        self._header = None
+        self._path = None
+        self._lnum = None
+        self._counts = {}
+        self._pending = Result()
+        self._snippets.clear()
+
+    def add(
+        self, item: Union[ReporterError, PackageVulnerability], header=None
+    ):
+        """
+        hold the item back until ``flush``, so the items a runner found in
+        a file are rendered together and by line, whatever the order they
+        were found in. vulnerabilities are not found in files and are
+        rendered right away
+        """
+        counts = self._counts.setdefault(header, Counter())
+        counts[item.severity] += 1
+        if item.severity not in (Severity.ERROR, Severity.WARNING):
+            return
+
+        if header != self._header:
+            self.flush()
+            self._print_header(header)
+            self._header = header
+            self._path = None
+
+        if isinstance(item, PackageVulnerability):
+            self._print_item(item)
+            return
+
+        self._pending.add(item)
+
+    def flush(self):
+        """
+        render the items held back by ``add``, file by file, the path and
+        the snippet are only printed when they differ from the previous
+        ones
+        """
+        pending, self._pending = self._pending, Result()
+        paths = sorted(pending.paths)
+        # the paths of the result leave out the items without a path
+        if pending.by_path(""):
+            paths.insert(0, "")
+
+        for path in paths:
+            if path != self._path:
+                self._print_rule(path)
+                self._path = path
+                self._lnum = None
+
+            items = sorted(pending.by_path(path), key=lambda item: item.lnum)
+            for lnum, group in itertools.groupby(items, lambda e: e.lnum):
+                for item in group:
+                    self._print_item(item)
+                if lnum != self._lnum:
+                    self._print_source(path, lnum)
+                    self._lnum = lnum
+
+    def finish(self):
+        self.flush()
+        self._console.print("\n")
+        self._console.rule("Summary", style="bold rule.line")
+        if not self._counts:
+            self._console.print("no issues found")
+
+        for header, counts in self._counts.items():
+            self._console.print(
+                f"{header}: {counts[Severity.ERROR]} errors, "
+                f"{counts[Severity.WARNING]} warnings"
+            )
+
+    def report(self, result: Result, header=None):
+        self._print_header(header)
+
+        self._report_helper(result.errors, header="Errors")
+        self._report_helper(result.warnings, header="Warnings")
 
-        console.print("\n")
+        self._console.print("\n")
 
     def _report_helper(
         self,
-        console: Console,
         items: List[Union[ReporterError, PackageVulnerability]],
         header=None,
     ):
 
         if items:
             if isinstance(items[0], PackageVulnerability):
-                self._report_vulns(console, items, header)
+                self._report_vulns(items, header)
             else:
-                self._report_reporter_error(console, items, header)
+                self._report_reporter_error(items, header)
 
-    def _report_reporter_error(
-        self, console: Console, items: List[ReporterError], header=None
-    ):
+    def _report_reporter_error(self, items: List[ReporterError], header=None):
+        # the items of a file are grouped together whatever the order they
+        # were found in
+        items = sorted(items, key=lambda item: (item.path, item.lnum))
         filegroups = itertools.groupby(items, key=lambda key: key.path)
 
         if header is not None and items:
-            console.rule(header, style="bold rule.line")
+            self._print_rule(header, style="bold rule.line")
 
         for path, group in filegroups:
             linegroups = itertools.groupby(group, key=lambda key: key.lnum)
-            console.rule(path)
+            self._print_rule(path)
             for lnum, group in linegroups:
                 for err in group:
-                    console.print(
-                        f"{err.lnum}:{err.col} {err.message}",
-                        style=err.severity.value,
-                    )
-                console.print(
-                    Syntax.from_path(
-                        path,
-                        line_numbers=True,
-                        line_range=(lnum - 1, lnum + 1),
-                        highlight_lines=[lnum],
-                    ),
-                )
+                    self._print_item(err)
+                self._print_source(path, lnum)
 
-    def _report_vulns(
-        self, console: Console, items: List[PackageVulnerability], header=None
-    ):
+    def _report_vulns(self, items: List[PackageVulnerability], header=None):
         if header is not None and items:
-            console.rule(header, style="bold rule.line")
+            self._print_rule(header, style="bold rule.line")
 
         for item in items:
-            console.print(item, style=item.severity.value)
+            self._print_item(item)
+
+    def _write(self, text: str):
+        # plain output skips the rendering of rich altogether
+        self._console.file.write(text + "\n")
+
+    def _print_header(self, header: Optional[str]):
+        if self.plain:
+            self._write(f"=== {header} ===")
+        else:
+            self._console.print(Panel(header, title_align="center"))
+
+    def _print_rule(self, title: str, style: str = "rule.line"):
+        if self.plain:
+            self._write(f"--- {title}")
+        else:
+            self._console.rule(title, style=style)
+
+    def _print_item(self, item: Union[ReporterError, PackageVulnerability]):
+        if isinstance(item, PackageVulnerability):
+            text = str(item)
+        else:
+            text = f"{item.lnum}:{item.col} {item.message}"
+
+        if self.plain:
+            self._write(text)
+        else:
+            self._console.print(text, style=item.severity.value)
+
+    def _print_source(self, path: str, lnum: int):
+        # the items about a whole file have no line to show
+        if lnum < 1:
+            return
+
+        if self.max_snippets is not None:
+            if self._snippets[path] >= self.max_snippets:
+                return
+            self._snippets[path] += 1
+
+        # files which can not be read or decoded are reported without
+        # their source
+        try:
+            lines = self._sources.lines(path)
+        except (OSError, SyntaxError, UnicodeDecodeError):
+            return
+
+        # only the lines of the snippet are highlighted, rather than the
+        # whole file up to the snippet
+        start = max(lnum - CONTEXT_LINES, 1)
+        snippet = lines[start - 1 : lnum + CONTEXT_LINES]
+        if not snippet:
+            return
+
+        if self.plain:
+            self._write(
+                "\n".join(
+                    f"{'>' if number == lnum else ' '}{number:>5} | {line}"
+                    for number, line in enumerate(snippet, start)
+                )
+            )
+            return
+
+        lexer = self._lexers.get(path)
+        if lexer is None:
+            lexer = self._lexers[path] = Syntax.guess_lexer(
+                path, self._sources.text(path)
+            )
+        self._console.print(
+            Syntax(
+                "\n".join(snippet),
+                lexer,
+                line_numbers=True,
+                start_line=start,
+                highlight_lines={lnum},
+            ),
+        )
@@ -0,0 +1,44 @@
+import json
+from typing import Optional, TextIO, Union
+
+from cqa.reporters.base import FileReporter, to_record
+from cqa.types import PackageVulnerability, ReporterError
+
+
+class JsonLinesReporter(FileReporter):
+    """
+    writes every item as a json object on a line of its own
+    """
+
+    def add(
+        self,
+        item: Union[ReporterError, PackageVulnerability],
+        header: Optional[str] = None,
+    ):
+        self._file.write(json.dumps(to_record(item, header)) + "\n")
+
+
+class JsonReporter(FileReporter):
+    """
+    writes the items as a json array, which is written one item at a time
+    """
+
+    def __init__(self, file: TextIO):
+        super().__init__(file)
+        self._count = 0
+
+    def start(self):
+        self._count = 0
+        self._file.write("[")
+
+    def add(
+        self,
+        item: Union[ReporterError, PackageVulnerability],
+        header: Optional[str] = None,
+    ):
+        separator = ",\n  " if self._count else "\n  "
+        self._file.write(separator + json.dumps(to_record(item, header)))
+        self._count += 1
+
+    def finish(self):
+        self._file.write("\n]\n" if self._count else "]\n")
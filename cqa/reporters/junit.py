@@ -0,0 +1,66 @@
+"""
+reporter writing the items as a JUnit XML report, ingested by the test
+report integrations of CI services
+
+every item is a test case of its own, failed when the item is an error or
+a warning. the counts of the test suite are only known once all the items
+are, so they are left out of the report, they are counted by the readers
+"""
+
+from typing import Dict, Optional, Union
+from xml.sax.saxutils import escape, quoteattr
+
+from cqa.reporters.base import FileReporter
+from cqa.types import PackageVulnerability, ReporterError, Severity
+
+
+class JUnitReporter(FileReporter):
+    def start(self):
+        self._file.write(
+            '<?xml version="1.0" encoding="utf-8"?>\n'
+            '<testsuites name="cqa">\n'
+            '  <testsuite name="cqa">\n'
+        )
+
+    def add(
+        self,
+        item: Union[ReporterError, PackageVulnerability],
+        header: Optional[str] = None,
+    ):
+        attributes = {"classname": header or "cqa"}
+        if isinstance(item, PackageVulnerability):
+            attributes["name"] = (
+                f"{item.package_name}=={item.current_version} "
+                f"{item.vulnerability_id}"
+            )
+        else:
+            attributes["name"] = f"{item.path}:{item.lnum}:{item.col}"
+            attributes["file"] = item.path
+            attributes["line"] = str(item.lnum)
+        testcase = "    <testcase " + _attributes(attributes)
+
+        if item.severity not in (Severity.ERROR, Severity.WARNING):
+            self._file.write(testcase + " />\n")
+            return
+
+        message = item.message.strip()
+        failure = _attributes(
+            {
+                "type": item.severity.value,
+                "message": message.splitlines()[0] if message else "",
+            }
+        )
+        self._file.write(
+            f"{testcase}>\n"
+            f"      <failure {failure}>{escape(message)}</failure>\n"
+            "    </testcase>\n"
+        )
+
+    def finish(self):
+        self._file.write("  </testsuite>\n</testsuites>\n")
+
+
+def _attributes(attributes: Dict[str, str]) -> str:
+    return " ".join(
+        f"{name}={quoteattr(value)}" for name, value in attributes.items()
+    )
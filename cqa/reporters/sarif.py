@@ -0,0 +1,109 @@
+"""
+reporter writing the items as a SARIF 2.1.0 log, the format ingested by
+code scanning services
+
+the results are written as they are added, and the rules, which are only
+known once all the results are, are written after them
+"""
+
+import json
+import os
+from typing import Any, Dict, Optional, TextIO, Union
+
+from cqa.reporters.base import FileReporter, get_rule_id
+from cqa.types import PackageVulnerability, ReporterError, Severity
+
+SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+VERSION = "2.1.0"
+
+LEVELS = {
+    Severity.ERROR: "error",
+    Severity.WARNING: "warning",
+    Severity.INFO: "note",
+}
+
+
+class SarifReporter(FileReporter):
+    def __init__(self, file: TextIO, rootdir: Optional[str] = None):
+        """
+        :param file: (TextIO) file the log is written to
+        :param rootdir: (str) directory the paths of the results are made
+                    relative to, the current directory when None
+        """
+        super().__init__(file)
+        self._rootdir = rootdir or os.getcwd()
+        self._rules: Dict[str, Dict[str, Any]] = {}
+        self._count = 0
+
+    def start(self):
+        self._rules = {}
+        self._count = 0
+        self._file.write(
+            '{"$schema": %s, "version": %s, "runs": [{"results": ['
+            % (json.dumps(SCHEMA), json.dumps(VERSION))
+        )
+
+    def add(
+        self,
+        item: Union[ReporterError, PackageVulnerability],
+        header: Optional[str] = None,
+    ):
+        rule_id = get_rule_id(item, header)
+        if rule_id not in self._rules:
+            self._rules[rule_id] = self._get_rule(rule_id, item, header)
+
+        result = {
+            "ruleId": rule_id,
+            "level": LEVELS[item.severity],
+            "message": {"text": item.message.strip() or rule_id},
+            "properties": {"group": header},
+        }
+        if isinstance(item, ReporterError) and item.path:
+            result["locations"] = [self._get_location(item)]
+
+        separator = ",\n" if self._count else "\n"
+        self._file.write(separator + json.dumps(result))
+        self._count += 1
+
+    def finish(self):
+        tool = {
+            "driver": {
+                "name": "cqa",
+                "informationUri": "https://github.com/tata1mg/cqa",
+                "rules": list(self._rules.values()),
+            }
+        }
+        self._file.write(
+            '\n], "tool": %s, "columnKind": "unicodeCodePoints"}]}\n'
+            % json.dumps(tool)
+        )
+
+    @staticmethod
+    def _get_rule(
+        rule_id: str,
+        item: Union[ReporterError, PackageVulnerability],
+        group: Optional[str],
+    ) -> Dict[str, Any]:
+        rule: Dict[str, Any] = {"id": rule_id, "properties": {"group": group}}
+        if isinstance(item, PackageVulnerability) and item.more_info_url:
+            rule["helpUri"] = item.more_info_url
+        return rule
+
+    def _get_location(self, item: ReporterError) -> Dict[str, Any]:
+        path = item.path
+        if os.path.isabs(path):
+            path = os.path.relpath(path, self._rootdir)
+
+        location: Dict[str, Any] = {
+            "artifactLocation": {
+                "uri": path.replace(os.sep, "/"),
+                "uriBaseId": "%SRCROOT%",
+            }
+        }
+        # line and column are 1-based, 0 means the tool did not give them
+        if item.lnum > 0:
+            region = {"startLine": item.lnum}
+            if item.col > 0:
+                region["startColumn"] = item.col
+            location["region"] = region
+        return {"physicalLocation": location}
@@ -0,0 +1,5 @@
+from .costs import COSTS_NAME as COSTS_NAME
+from .costs import CostModel as CostModel
+from .scheduler import RunnerRef as RunnerRef
+from .scheduler import ScheduledRunner as ScheduledRunner
+from .scheduler import Scheduler as Scheduler
@@ -0,0 +1,145 @@
+"""
+cost model of the tasks of a run, learned from the timings of previous runs
+
+the cost of a file for a tool is the time the tool last took on that file,
+and for files the tool has not seen yet, the size of the file times the
+average time per byte of the tool. the model is kept as a json file along
+with the result cache.
+"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+LOGGER = logging.getLogger(__name__)
+
+COSTS_NAME = "costs.json"
+
+# time per byte assumed for tools without any timing yet, in seconds
+DEFAULT_SECONDS_PER_BYTE = 2e-6
+
+# time assumed for tools which do not analyse files, in seconds
+DEFAULT_RUN_SECONDS = 1.0
+
+# weight of the latest timing in the average time per byte of a tool
+SMOOTHING = 0.3
+
+
+class CostModel:
+    def __init__(self, path: Optional[str] = None):
+        """
+        :param path: (str) json file the model is loaded from and saved to,
+                    the model is only kept in memory when None
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._tools: Dict[str, Dict[str, float]] = {}
+        self._files: Dict[str, Dict[str, float]] = {}
+        if path is not None:
+            self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                data = json.load(file)
+            self._tools = data["tools"]
+            self._files = data["files"]
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError) as exc:
+            LOGGER.warning(
+                "ignoring the invalid cost model %s: %r", self.path, exc
+            )
+
+    def estimate(self, tool: str, path: str, size: int) -> float:
+        """
+        expected time of ``tool`` on the file ``path`` of ``size`` bytes
+        """
+        seconds = self._files.get(tool, {}).get(path)
+        if seconds is not None:
+            return seconds
+        per_byte = self._tools.get(tool, {}).get(
+            "per_byte", DEFAULT_SECONDS_PER_BYTE
+        )
+        return per_byte * size
+
+    def estimate_run(self, tool: str) -> float:
+        """
+        expected time of ``tool`` when it does not analyse files
+        """
+        return self._tools.get(tool, {}).get("run", DEFAULT_RUN_SECONDS)
+
+    def observe(
+        self,
+        tool: str,
+        files: Iterable[Tuple[str, int]],
+        seconds: float,
+        timings: Optional[Dict[str, float]] = None,
+    ):
+        """
+        learn from the time ``tool`` took on a set of files
+
+        :param tool: (str) name of the tool
+        :param files: (Iterable) path and size of every file of the task
+        :param seconds: (float) time the task took
+        :param timings: (Dict) time taken on each file, when known, the time
+                    of the task is split over its files by size otherwise
+        """
+        files = list(files)
+        total = sum(size for _, size in files)
+        with self._lock:
+            stats = self._tools.setdefault(tool, {})
+            if not files:
+                stats["run"] = _smooth(stats.get("run"), seconds)
+                return
+
+            if total:
+                stats["per_byte"] = _smooth(
+                    stats.get("per_byte"), seconds / total
+                )
+            known = self._files.setdefault(tool, {})
+            for path, size in files:
+                if timings is not None and path in timings:
+                    known[path] = timings[path]
+                else:
+                    known[path] = seconds * size / total if total else 0.0
+
+    def save(self):
+        """
+        write the model to its file, the timings of the files which do not
+        exist anymore are dropped
+        """
+        if self.path is None:
+            return
+
+        with self._lock:
+            files = {
+                tool: {
+                    path: seconds
+                    for path, seconds in known.items()
+                    if os.path.exists(path)
+                }
+                for tool, known in self._files.items()
+            }
+            data = {"tools": self._tools, "files": files}
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        fd, temp = tempfile.mkstemp(
+            dir=os.path.dirname(self.path) or ".", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                json.dump(data, file)
+            os.replace(temp, self.path)
+        except BaseException:
+            os.unlink(temp)
+            raise
+
+
+def _smooth(previous: Optional[float], latest: float) -> float:
+    if previous is None:
+        return latest
+    return (1 - SMOOTHING) * previous + SMOOTHING * latest
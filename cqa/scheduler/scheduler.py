@@ -0,0 +1,630 @@
+"""
+global scheduler of the tasks of a run
+
+the work of every selected runner is split in tasks, each running the runner
+on a shard of the files, and the tasks of all the tool groups share a single
+process pool sized by ``--jobs``. shards are cut so their expected cost,
+given by the cost model, is about the same, and the ready task with the
+longest expected path to the end of the run is always started first. the
+``jobs`` option of a tool caps the number of its tasks running at once.
+
+runners which rewrite the files they analyse, i.e. the formatters unless
+they only check the files, run in stages and the tasks of the other runners
+on a file only start once the file has been formatted.
+"""
+
+import heapq
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    wait,
+)
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from cqa import registry
+from cqa.base import Runner
+from cqa.types import PackageVulnerability, ReporterError
+from cqa.utils.pool import resolve_jobs
+from cqa.utils.profile import current_rss
+
+from .costs import CostModel
+
+if TYPE_CHECKING:
+    from cqa.cache import ResultCache
+    from cqa.utils.profile import Profiler
+    from cqa.utils.sources import SourceStore
+
+Item = Union[ReporterError, PackageVulnerability]
+
+# registry groups whose runners report the files they change, only their
+# clean results are cached
+FORMATTER_GROUPS = frozenset(["formatter"])
+
+# registry groups whose runners analyse the project as a whole, their
+# ``run`` is called once without any files
+PROJECT_GROUPS = frozenset(["vuln"])
+
+
+class RunnerRef(NamedTuple):
+    """
+    picklable description of a runner, so worker processes can build it
+    """
+
+    # tool group of the runner in the registry, e.g. linter or sec
+    group: str
+    # name of the tool in the registry
+    tool: str
+    # config of the tool group
+    options: Dict
+
+    @property
+    def key(self) -> str:
+        return json.dumps(
+            [self.group, self.tool, self.options], sort_keys=True, default=str
+        )
+
+    @property
+    def max_tasks(self) -> Optional[int]:
+        """
+        number of tasks of the runner allowed to run at once, from the
+        ``jobs`` option of the tool, None when it has none
+        """
+        spec = registry.get_specs(self.group, [self.tool]).get(self.tool)
+        if spec is None:
+            return None
+        jobs = registry.get_options(spec, self.options).get("jobs")
+        if jobs is None:
+            return None
+        return resolve_jobs(jobs)
+
+    def create(self) -> Runner:
+        # runners are given a single worker, as the scheduler is in charge of
+        # running their tasks in parallel, up to ``max_tasks`` at once
+        (runner,) = registry.create_runners(
+            self.group, self.options, jobs=1, tools=[self.tool]
+        )
+        return runner
+
+
+class ScheduledRunner(NamedTuple):
+    # name of the tool group the results are reported under, e.g. linter
+    name: str
+    ref: RunnerRef
+    # the runner built in the current process
+    runner: Runner
+
+
+class TaskResult(NamedTuple):
+    items: List[Item]
+    # ``time.perf_counter`` at the start and the end of the task
+    start: float
+    end: float
+    # cpu time of the task, in seconds
+    cpu: float
+    # change of the resident memory of the process, in bytes
+    rss_delta: int
+    pid: int
+    tid: int
+    # start, end, cpu time and change of the resident memory of every file,
+    # only recorded when profiling
+    files: Dict[str, Tuple[float, float, float, int]]
+
+
+def execute(
+    runner: Runner,
+    paths: Optional[Sequence[str]],
+    rootdir: str,
+    sources: Optional["SourceStore"] = None,
+    profile: bool = False,
+) -> TaskResult:
+    """
+    run a runner on a shard of the files and time it
+
+    :param runner: (Runner) the runner
+    :param paths: (Sequence[str]) the files, None for the runners which
+                analyse the project as a whole
+    :param rootdir: (str) root directory of the project
+    :param sources: (SourceStore) store the files are read from
+    :param profile: (bool) analyse the files one at a time and time each,
+                unless the runner follows the imports of the files
+    """
+    start = time.perf_counter()
+    cpu = time.thread_time()
+    rss = current_rss()
+
+    files: Dict[str, Tuple[float, float, float, int]] = {}
+    if paths is None:
+        items = list(runner.run(None, rootdir))
+    elif profile and not runner.follows_imports:
+        items = []
+        for path in paths:
+            file_start = time.perf_counter()
+            file_cpu = time.thread_time()
+            file_rss = current_rss()
+            items.extend(
+                runner.stream_sources([path], rootdir, sources=sources)
+            )
+            files[path] = (
+                file_start,
+                time.perf_counter(),
+                time.thread_time() - file_cpu,
+                current_rss() - file_rss,
+            )
+    else:
+        items = list(runner.stream_sources(paths, rootdir, sources=sources))
+
+    return TaskResult(
+        items=items,
+        start=start,
+        end=time.perf_counter(),
+        cpu=time.thread_time() - cpu,
+        rss_delta=current_rss() - rss,
+        pid=os.getpid(),
+        tid=threading.get_ident(),
+        files=files,
+    )
+
+
+# runners built by each worker process, by the key of their description
+_WORKER_RUNNERS: Dict[str, Runner] = {}
+
+
+def _run_in_worker(
+    ref: RunnerRef,
+    paths: Optional[Sequence[str]],
+    rootdir: str,
+) -> TaskResult:
+    runner = _WORKER_RUNNERS.get(ref.key)
+    if runner is None:
+        runner = _WORKER_RUNNERS[ref.key] = ref.create()
+    return execute(runner, paths, rootdir)
+
+
+class _Task:
+    def __init__(
+        self,
+        runner: ScheduledRunner,
+        paths: Optional[List[str]],
+        misses: List[Tuple[str, str]],
+        stage: int,
+        cost: float,
+        priority: float,
+    ):
+        self.runner = runner
+        self.paths = paths
+        # path and cache key of the files, when the result cache is used
+        self.misses = misses
+        self.stage = stage
+        self.cost = cost
+        self.priority = priority
+
+
+class Scheduler:
+    """
+    runs the tasks of the runners on a single process pool, tasks run in
+    the current process when a single job is requested
+    """
+
+    LOGGER = logging.getLogger(__name__)
+
+    # number of shards of the files of every runner per job
+    SHARDS_PER_JOB = 4
+
+    def __init__(self, jobs: int = 1):
+        """
+        :param jobs: (int) number of worker processes
+        """
+        self.jobs = jobs
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _submit(self, task: _Task, run: "_Run") -> Future:
+        # the tasks run in the current process while profiling, so the
+        # timings of the files are not skewed by concurrent tasks
+        if self.jobs > 1 and run.profiler is None:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.jobs)
+            return self._executor.submit(
+                _run_in_worker, task.runner.ref, task.paths, run.rootdir
+            )
+
+        future: Future = Future()
+        try:
+            future.set_result(
+                execute(
+                    task.runner.runner,
+                    task.paths,
+                    run.rootdir,
+                    sources=run.sources,
+                    profile=run.profiler is not None,
+                )
+            )
+        except Exception as exc:  # pylint: disable=broad-except
+            future.set_exception(exc)
+        return future
+
+    def run(
+        self,
+        runners: List[ScheduledRunner],
+        paths: Sequence[str],
+        rootdir: str,
+        cache: Optional["ResultCache"] = None,
+        costs: Optional[CostModel] = None,
+        sources: Optional["SourceStore"] = None,
+        line_filter: Optional[Callable[[ReporterError], bool]] = None,
+        profiler: Optional["Profiler"] = None,
+        on_task_done: Optional[Callable[[], None]] = None,
+    ) -> Iterator[Tuple[str, Item]]:
+        """
+        run the runners on the files and yield their results as the tasks
+        complete
+
+        :param runners: (List[ScheduledRunner]) the runners to run
+        :param paths: (Sequence[str]) the discovered files
+        :param rootdir: (str) root directory of the project
+        :param cache: (ResultCache) per file result cache, if any
+        :param costs: (CostModel) expected cost of the tasks, updated with
+                    the timings of the run
+        :param sources: (SourceStore) store the files are read from
+        :param line_filter: (Callable) filter of the results of the line
+                    oriented runners
+        :param profiler: (Profiler) records the cost of every task and file
+        :param on_task_done: (Callable) called once all the results of a
+                    task, or the cached results of a runner, were yielded
+        :returns: iterator of the name of the tool group and the item found
+        """
+        run = _Run(
+            self,
+            runners,
+            paths,
+            rootdir,
+            cache=cache,
+            costs=costs if costs is not None else CostModel(),
+            sources=sources,
+            line_filter=line_filter,
+            profiler=profiler,
+            on_task_done=on_task_done,
+        )
+        return run.run()
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self) -> "Scheduler":
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+
+class _Run:
+    """
+    state of a single run of the scheduler
+    """
+
+    def __init__(
+        self,
+        scheduler: Scheduler,
+        runners: List[ScheduledRunner],
+        paths: Sequence[str],
+        rootdir: str,
+        cache: Optional["ResultCache"],
+        costs: CostModel,
+        sources: Optional["SourceStore"],
+        line_filter: Optional[Callable[[ReporterError], bool]],
+        profiler: Optional["Profiler"],
+        on_task_done: Optional[Callable[[], None]],
+    ):
+        self.scheduler = scheduler
+        self.paths = list(paths)
+        self.rootdir = rootdir
+        self.cache = cache
+        self.costs = costs
+        self.sources = sources
+        self.line_filter = line_filter
+        self.profiler = profiler
+        self.on_task_done = on_task_done
+
+        # every runner which rewrites the files is a stage of its own,
+        # followed by a stage with all the other runners of files, the
+        # stages run in order per file
+        self.stages: List[List[ScheduledRunner]] = [
+            [runner] for runner in runners if runner.runner.MODIFIES_FILES
+        ]
+        self.stages.append(
+            [
+                runner
+                for runner in runners
+                if not runner.runner.MODIFIES_FILES
+                and runner.ref.group not in PROJECT_GROUPS
+            ]
+        )
+        self.project_runners = [
+            runner for runner in runners if runner.ref.group in PROJECT_GROUPS
+        ]
+
+        # number of files which reached every stage, the runners following
+        # imports only start once all the files reached their stage
+        self._arrived = [0] * len(self.stages)
+        self._sizes: Dict[str, int] = {}
+        self._targets: Dict[str, float] = {}
+        self._ready: List[Tuple[float, int, _Task]] = []
+        self._counter = itertools.count()
+        # tasks allowed to run at once and tasks running, by runner
+        self._max_tasks: Dict[str, Optional[int]] = {
+            runner.ref.key: runner.ref.max_tasks for runner in runners
+        }
+        self._running: Dict[str, int] = defaultdict(int)
+
+    def _size(self, path: str) -> int:
+        size = self._sizes.get(path)
+        if size is None:
+            try:
+                size = os.stat(path).st_size
+            except OSError:
+                size = 0
+            self._sizes[path] = size
+        return size
+
+    def _estimate(self, runner: ScheduledRunner, paths: List[str]) -> float:
+        return sum(
+            self.costs.estimate(runner.ref.tool, path, self._size(path))
+            for path in paths
+        )
+
+    def _target(self, runner: ScheduledRunner) -> float:
+        # expected cost of a shard, so every runner has about
+        # ``SHARDS_PER_JOB`` shards per job
+        target = self._targets.get(runner.ref.key)
+        if target is None:
+            target = self._estimate(runner, self.paths) / (
+                self.scheduler.jobs * self.scheduler.SHARDS_PER_JOB
+            )
+            self._targets[runner.ref.key] = target
+        return target
+
+    def _shard(self, runner: ScheduledRunner, paths: List[str]):
+        if runner.runner.follows_imports:
+            # the runner orders the files by their imports itself
+            if paths:
+                yield paths, self._estimate(runner, paths)
+            return
+
+        # contiguous shards keep the results of a shard in the order of the
+        # files, the files expected to take a whole shard get their own one
+        # so they start first
+        target = self._target(runner)
+        shard: List[str] = []
+        cost = 0.0
+        for path in paths:
+            estimate = self.costs.estimate(
+                runner.ref.tool, path, self._size(path)
+            )
+            if shard and target > 0 and estimate >= target:
+                yield shard, cost
+                shard, cost = [], 0.0
+            shard.append(path)
+            cost += estimate
+            if target > 0 and cost >= target:
+                yield shard, cost
+                shard, cost = [], 0.0
+        if shard:
+            yield shard, cost
+
+    def _remaining(self, stage: int, paths: List[str]) -> float:
+        # expected time to the end of the run for the files once ``stage``
+        # is done, the runners of a stage run in parallel
+        return sum(
+            max(self._estimate(runner, paths) for runner in runners)
+            for runners in self.stages[stage + 1 :]
+            if runners
+        )
+
+    def _push(self, task: _Task):
+        heapq.heappush(
+            self._ready, (-task.priority, next(self._counter), task)
+        )
+
+    def _schedule_stage(
+        self, stage: int, paths: List[str]
+    ) -> Iterator[Tuple[str, Item]]:
+        """
+        create the tasks of ``stage`` for the files, and yield the cached
+        results of the files
+        """
+        self._arrived[stage] += len(paths)
+        for runner in self.stages[stage]:
+            if runner.runner.follows_imports:
+                # the files reach the stage as the formatters complete, the
+                # runner gets a single task with all of them once they did
+                if self._arrived[stage] == len(self.paths):
+                    self._push_all(runner, stage)
+                continue
+
+            misses = [(path, "") for path in paths]
+            if self.cache is not None:
+                hits, misses = self.cache.lookup(
+                    runner.runner, paths, sources=self.sources
+                )
+                yield from self._batch(runner, hits)
+
+            keys = dict(misses)
+            for shard, cost in self._shard(runner, list(keys)):
+                self._push(
+                    _Task(
+                        runner,
+                        shard,
+                        [(path, keys[path]) for path in shard],
+                        stage,
+                        cost,
+                        cost + self._remaining(stage, shard),
+                    )
+                )
+
+            # the stages rewriting the files have a single runner, the files
+            # it already formatted move on to the next stage right away
+            cached = [path for path in paths if path not in keys]
+            if cached and stage + 1 < len(self.stages):
+                yield from self._schedule_stage(stage + 1, cached)
+
+    def _push_all(self, runner: ScheduledRunner, stage: int):
+        for shard, cost in self._shard(runner, self.paths):
+            self._push(
+                _Task(
+                    runner,
+                    shard,
+                    [(path, "") for path in shard],
+                    stage,
+                    cost,
+                    cost + self._remaining(stage, shard),
+                )
+            )
+
+    def _results(
+        self, runner: ScheduledRunner, items: List[Item]
+    ) -> Iterator[Tuple[str, Item]]:
+        if self.line_filter is not None and runner.runner.LINE_ORIENTED:
+            items = filter(self.line_filter, items)
+        for item in items:
+            yield runner.name, item
+
+    def _batch(
+        self, runner: ScheduledRunner, items: List[Item]
+    ) -> Iterator[Tuple[str, Item]]:
+        # the consumer processed every result of the batch once the last
+        # one was yielded
+        yield from self._results(runner, items)
+        if self.on_task_done is not None:
+            self.on_task_done()
+
+    def _complete(
+        self, task: _Task, result: TaskResult
+    ) -> Iterator[Tuple[str, Item]]:
+        runner = task.runner
+        tool = runner.ref.tool
+        is_formatter = runner.ref.group in FORMATTER_GROUPS
+
+        if task.paths is None:
+            self.costs.observe(tool, [], result.end - result.start)
+        else:
+            self.costs.observe(
+                tool,
+                [(path, self._size(path)) for path in task.paths],
+                result.end - result.start,
+                timings={
+                    path: end - start
+                    for path, (start, end, *_) in result.files.items()
+                }
+                or None,
+            )
+            if runner.runner.MODIFIES_FILES:
+                # the files may have been rewritten, by a worker process
+                for path in task.paths:
+                    self._sizes.pop(path, None)
+                    if self.sources is not None:
+                        self.sources.update(path)
+            if self.cache is not None:
+                self.cache.store(
+                    runner.runner,
+                    task.misses,
+                    result.items,
+                    self.rootdir,
+                    clean_only=is_formatter,
+                )
+
+        if self.profiler is not None:
+            self._record(task, result)
+
+        yield from self._batch(runner, result.items)
+
+        if task.paths is not None and task.stage + 1 < len(self.stages):
+            yield from self._schedule_stage(task.stage + 1, task.paths)
+
+    def _record(self, task: _Task, result: TaskResult):
+        name = task.runner.runner.name
+        self.profiler.record(
+            name,
+            "runner",
+            start=result.start,
+            end=result.end,
+            cpu=result.cpu,
+            rss_delta=result.rss_delta,
+            pid=result.pid,
+            tid=result.tid,
+            files=len(task.paths or []),
+            items=len(result.items),
+            expected_ms=task.cost * 1e3,
+        )
+        for path, (start, end, cpu, rss_delta) in result.files.items():
+            self.profiler.record(
+                path,
+                "file",
+                start=start,
+                end=end,
+                cpu=cpu,
+                rss_delta=rss_delta,
+                pid=result.pid,
+                tid=result.tid,
+                runner=name,
+            )
+
+    def _start(self, free: int) -> List[_Task]:
+        """
+        pop up to ``free`` ready tasks by priority, the tasks of the runners
+        already running as many tasks as they allow are left for later
+        """
+        started: List[_Task] = []
+        deferred = []
+        while self._ready and len(started) < free:
+            entry = heapq.heappop(self._ready)
+            key = entry[2].runner.ref.key
+            limit = self._max_tasks.get(key)
+            if limit is not None and self._running[key] >= limit:
+                deferred.append(entry)
+                continue
+            self._running[key] += 1
+            started.append(entry[2])
+        for entry in deferred:
+            heapq.heappush(self._ready, entry)
+        return started
+
+    def run(self) -> Iterator[Tuple[str, Item]]:
+        for runner in self.project_runners:
+            cost = self.costs.estimate_run(runner.ref.tool)
+            self._push(_Task(runner, None, [], -1, cost, cost))
+        yield from self._schedule_stage(0, self.paths)
+
+        running: Dict[Future, _Task] = {}
+        try:
+            while self._ready or running:
+                for task in self._start(self.scheduler.jobs - len(running)):
+                    running[self.scheduler._submit(task, self)] = task
+
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    task = running.pop(future)
+                    self._running[task.runner.ref.key] -= 1
+                    yield from self._complete(task, future.result())
+        finally:
+            for future in running:
+                future.cancel()
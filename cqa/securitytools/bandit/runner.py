@@ -1,15 +1,31 @@
 import tempfile
-from typing import Any, Dict, List, Optional
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional
 
 import toml
 from bandit import config as b_config
 from bandit import constants as b_constants
 from bandit import manager as b_manager
 
+from cqa import utils
 from cqa.base import Runner
 from cqa.types import ReporterError, Severity
 
 
+# runner owned by each worker process of the process pool, so the bandit
+# config is only built once per worker
+_WORKER_RUNNER: Optional["BanditRunner"] = None
+
+
+def _init_worker(options: Dict):
+    global _WORKER_RUNNER
+    _WORKER_RUNNER = BanditRunner(options)
+
+
+def _run_in_worker(paths: List[str]) -> List[ReporterError]:
+    return _WORKER_RUNNER._run_tests(paths)
+
+
 class BanditRunner(Runner):
     """
     runner for bandit to check for security vulnerabilities in
@@ -22,11 +38,25 @@ class BanditRunner(Runner):
         "HIGH": Severity.ERROR,
     }
 
-    def __init__(self, options: Optional[Dict] = None):
-        config = self.get_config(options)
-        self.manager: b_manager.BanditManager = b_manager.BanditManager(
-            config=config, agg_type=None
-        )
+    TOOL = "bandit"
+    LINE_ORIENTED = True
+
+    # number of shards handed to every worker process
+    SHARDS_PER_JOB = 4
+
+    def __init__(
+        self, options: Optional[Dict] = None, jobs: Optional[int] = None
+    ):
+        if options is None:
+            options = {}
+
+        options = dict(options)
+        # number of worker processes, files are split in shards scanned in a
+        # process pool when more than one worker is requested
+        self.jobs = utils.resolve_jobs(jobs, default=options.pop("jobs", 1))
+
+        self._cfg = options
+        self.config: b_config.BanditConfig = self.get_config(options)
 
     def get_config(self, cfg: Dict[str, Any]):
         with tempfile.NamedTemporaryFile(mode="w", suffix=".toml") as temp:
@@ -43,12 +73,46 @@ class BanditRunner(Runner):
         :param rootdir: (str) root directory of the project
         :returns: list of errors reported by bandit
         """
+        return list(self.stream(paths, rootdir))
+
+    def stream(
+        self, paths: List[str], rootdir: str
+    ) -> Iterator[ReporterError]:
+        paths = list(paths)
+        if self.jobs > 1 and len(paths) > 1:
+            yield from self._run_in_process_pool(paths)
+            return
+
+        yield from self._run_tests(paths)
 
-        self.manager.discover_files(paths, recursive=False)
-        self.manager.run_tests()
+    def _run_in_process_pool(
+        self, paths: List[str]
+    ) -> Iterator[ReporterError]:
+        shards = utils.shard(paths, self.jobs, per_job=self.SHARDS_PER_JOB)
+        self.LOGGER.info(
+            "scanning %d files in %d shards using %d workers",
+            len(paths),
+            len(shards),
+            self.jobs,
+        )
+
+        with ProcessPoolExecutor(
+            max_workers=min(self.jobs, len(shards)),
+            initializer=_init_worker,
+            initargs=(self._cfg,),
+        ) as executor:
+            for errors in executor.map(_run_in_worker, shards):
+                yield from errors
 
-        issues = self.manager.get_issue_list(b_constants.LOW, b_constants.LOW)
-        results = [
+    def _run_tests(self, paths: List[str]) -> List[ReporterError]:
+        # the manager accumulates the files and the issues it has seen, so a
+        # fresh one is used for every run, the config is shared between them
+        manager = b_manager.BanditManager(config=self.config, agg_type=None)
+        manager.discover_files(paths, recursive=False)
+        manager.run_tests()
+
+        issues = manager.get_issue_list(b_constants.LOW, b_constants.LOW)
+        return [
             ReporterError(
                 path=issue.fname,
                 message=issue.text,
@@ -57,9 +121,9 @@ class BanditRunner(Runner):
                     issue.severity,
                     Severity.WARNING,
                 ),
+                tool=self.TOOL,
+                code=issue.test_id,
                 confidence=issue.confidence,
             )
             for issue in issues
         ]
-
-        return results
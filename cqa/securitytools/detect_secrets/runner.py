@@ -1,32 +1,102 @@
-from typing import List
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional
 
 from detect_secrets import SecretsCollection
 from detect_secrets.settings import default_settings
 
+from cqa import utils
+from cqa.base import Runner
 from cqa.types import ReporterError, Severity
 
+# runner owned by each worker process of the process pool
+_WORKER_RUNNER: Optional["DetectSecretsRunner"] = None
 
-class DetectSecretsRunner:
 
-    _collection = SecretsCollection()
+def _init_worker(options: Dict):
+    global _WORKER_RUNNER
+    _WORKER_RUNNER = DetectSecretsRunner(options)
 
-    @classmethod
-    def run(cls, paths: List[str], _rootdir: str):
+
+def _run_in_worker(paths: List[str]) -> List[ReporterError]:
+    return _WORKER_RUNNER._scan(paths)
+
+
+class DetectSecretsRunner(Runner):
+    TOOL = "detect-secrets"
+    LINE_ORIENTED = True
+
+    # number of shards handed to every worker process
+    SHARDS_PER_JOB = 4
+
+    def __init__(
+        self, options: Optional[Dict] = None, jobs: Optional[int] = None
+    ):
+        if options is None:
+            options = {}
+
+        options = dict(options)
+        # number of worker processes, files are split in shards scanned in a
+        # process pool when more than one worker is requested
+        self.jobs = utils.resolve_jobs(jobs, default=options.pop("jobs", 1))
+
+        self._cfg = options
+
+    def run(self, paths: List[str], rootdir: str) -> List[ReporterError]:
+        """
+        scan the given files for secrets
+
+        :param paths: (List[str]) files to be scanned
+        :param rootdir: (str) root directory of the project
+        :returns: a warning for every secret found
+        """
+        return list(self.stream(paths, rootdir))
+
+    def stream(
+        self, paths: List[str], rootdir: str
+    ) -> Iterator[ReporterError]:
+        paths = list(paths)
+        if self.jobs > 1 and len(paths) > 1:
+            yield from self._run_in_process_pool(paths)
+            return
+
+        yield from self._scan(paths)
+
+    def _run_in_process_pool(
+        self, paths: List[str]
+    ) -> Iterator[ReporterError]:
+        shards = utils.shard(paths, self.jobs, per_job=self.SHARDS_PER_JOB)
+        self.LOGGER.info(
+            "scanning %d files in %d shards using %d workers",
+            len(paths),
+            len(shards),
+            self.jobs,
+        )
+
+        with ProcessPoolExecutor(
+            max_workers=min(self.jobs, len(shards)),
+            initializer=_init_worker,
+            initargs=(self._cfg,),
+        ) as executor:
+            for errors in executor.map(_run_in_worker, shards):
+                yield from errors
+
+    def _scan(self, paths: List[str]) -> List[ReporterError]:
+        # a collection per run, so the secrets found by previous runs are
+        # not reported again
+        collection = SecretsCollection()
         with default_settings():
-            cls._collection.scan_files(*paths)
-
-        result = []
-        for path, issues in cls._collection.data.items():
-            result.extend(
-                [
-                    ReporterError(
-                        path=path,
-                        message=issue.type,
-                        lnum=issue.line_number,
-                        severity=Severity.WARNING,
-                    )
-                    for issue in issues
-                ]
-            )
+            for path in paths:
+                collection.scan_file(path)
 
-        return result
+        return [
+            ReporterError(
+                path=path,
+                message=issue.type,
+                lnum=issue.line_number,
+                severity=Severity.WARNING,
+                tool=self.TOOL,
+                code=issue.type,
+            )
+            for path, issues in collection.data.items()
+            for issue in sorted(issues, key=lambda issue: issue.line_number)
+        ]
@@ -0,0 +1,206 @@
+"""
+local copy of the safety vulnerability database
+
+the database is downloaded at most once every ``ttl`` seconds into a
+directory laid out like a safety mirror.
+offline, the network is never used and the local copy is used whatever
+its age. the results of a dependency set are memoized next to the
+database, keyed by the contents of the requirements file and the version
+of the database, so they are only computed again when either changes.
+"""
+
+import json
+import logging
+import os
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from cqa.types import PackageVulnerability
+
+from .index import VulnerabilityIndex
+
+DB_NAMES = ("insecure.json", "insecure_full.json")
+
+# seconds after which the local copy of the database is downloaded again
+DEFAULT_TTL = 24 * 60 * 60
+
+_MEMO_NAME = "results.json"
+
+
+def _is_remote(mirror: str) -> bool:
+    return mirror.startswith(("http://", "https://"))
+
+
+def _write_json(path: str, data: Any):
+    # written to a temporary file first, so concurrent runs never read a
+    # partially written file
+    fd, temp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            json.dump(data, file)
+        os.replace(temp, path)
+    except BaseException:
+        os.unlink(temp)
+        raise
+
+
+class VulnerabilityDatabase:
+    LOGGER = logging.getLogger(__name__)
+
+    # index and version of the database by the directory of the database
+    _indexes: Dict[str, Tuple[str, VulnerabilityIndex]] = {}
+
+    def __init__(
+        self,
+        directory: str,
+        ttl: int = DEFAULT_TTL,
+        offline: bool = False,
+        mirror: Optional[str] = None,
+    ):
+        """
+        :param directory: (str) directory of the local copy of the database
+        :param ttl: (int) seconds after which the local copy is stale
+        :param offline: (bool) never download the database
+        :param mirror: (str) url of a safety mirror to download the database
+                    from, or the path of a directory holding the database
+        """
+        self.directory = directory
+        self.ttl = ttl
+        self.offline = offline
+        self.mirror = mirror
+
+    def _age(self, directory: str) -> Optional[float]:
+        try:
+            return time.time() - min(
+                os.stat(os.path.join(directory, name)).st_mtime
+                for name in DB_NAMES
+            )
+        except FileNotFoundError:
+            return None
+
+    def ensure(self) -> Optional[str]:
+        """
+        make sure a copy of the database is available on disk, downloading
+        it if the local copy is missing or stale
+
+        :returns: directory of the database, None when none is available
+        """
+        if self.mirror and not _is_remote(self.mirror):
+            if self._age(self.mirror) is None:
+                self.LOGGER.warning(
+                    "vulnerability database not found in %s", self.mirror
+                )
+                return None
+            return self.mirror
+
+        age = self._age(self.directory)
+        if age is not None and (self.offline or age < self.ttl):
+            return self.directory
+
+        if self.offline:
+            self.LOGGER.warning(
+                "no local vulnerability database in %s, run once without "
+                "--offline to download it",
+                self.directory,
+            )
+            return None
+
+        try:
+            self._download()
+        except Exception as exc:  # pylint: disable=broad-except
+            if age is None:
+                self.LOGGER.warning(
+                    "could not download the vulnerability database: %r", exc
+                )
+                return None
+            self.LOGGER.warning(
+                "could not refresh the vulnerability database, using the "
+                "copy downloaded %d hours ago: %r",
+                age // 3600,
+                exc,
+            )
+        return self.directory
+
+    def _download(self):
+        from safety.safety import fetch_database  # noqa
+
+        os.makedirs(self.directory, exist_ok=True)
+        for name in DB_NAMES:
+            self.LOGGER.info("downloading vulnerability database %s", name)
+            data = fetch_database(
+                full=name == "insecure_full.json",
+                db=self.mirror or False,
+                telemetry=False,
+            )
+            _write_json(os.path.join(self.directory, name), data)
+
+    def load(self, directory: str, name: str) -> Dict[str, Any]:
+        """
+        contents of the database ``name`` of the copy in ``directory``
+        """
+        with open(os.path.join(directory, name), encoding="utf-8") as file:
+            return json.load(file)
+
+    def get_index(self, directory: str) -> VulnerabilityIndex:
+        """
+        index of the copy of the database in ``directory``, shared by all the
+        runners of the process until the database is updated
+        """
+        version = self.version(directory)
+        cached = self._indexes.get(directory)
+        if cached is None or cached[0] != version:
+            cached = (
+                version,
+                VulnerabilityIndex(self.load(directory, "insecure.json")),
+            )
+            self._indexes[directory] = cached
+        return cached[1]
+
+    def version(self, directory: str) -> str:
+        """
+        identifier of the copy of the database in ``directory``
+        """
+        return ":".join(
+            str(os.stat(os.path.join(directory, name)).st_mtime_ns)
+            for name in DB_NAMES
+        )
+
+    def _load_memo(self) -> Dict[str, Any]:
+        try:
+            with open(
+                os.path.join(self.directory, _MEMO_NAME), encoding="utf-8"
+            ) as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def get_results(
+        self, key: str, version: str
+    ) -> Optional[List[PackageVulnerability]]:
+        """
+        memoized results of the dependency set ``key`` for the database
+        ``version``, None if there are none
+        """
+        entry = self._load_memo().get(key)
+        if entry is None or entry["version"] != version:
+            return None
+        return [
+            PackageVulnerability.from_dict(item) for item in entry["items"]
+        ]
+
+    def set_results(
+        self, key: str, version: str, items: List[PackageVulnerability]
+    ):
+        # results computed with another version of the database are dropped
+        memo = {
+            k: entry
+            for k, entry in self._load_memo().items()
+            if entry["version"] == version
+        }
+        memo[key] = {
+            "version": version,
+            "items": [item.to_dict() for item in items],
+        }
+        os.makedirs(self.directory, exist_ok=True)
+        _write_json(os.path.join(self.directory, _MEMO_NAME), memo)
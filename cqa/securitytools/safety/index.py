@@ -0,0 +1,162 @@
+"""
+index of the safety vulnerability database
+
+the vulnerable specifiers of every package are turned into version
+intervals, which split the versions of the package into disjoint regions
+each knowing the specifiers covering it. matching a pinned package is then
+a dictionary lookup followed by a binary search over the boundaries of the
+regions. packages are only indexed the first time they are looked up.
+"""
+
+import bisect
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from packaging.specifiers import SpecifierSet
+from packaging.utils import canonicalize_name
+from packaging.version import parse
+
+# bound of an interval, the version and whether it is part of the interval
+_Bound = Tuple[Any, bool]
+
+
+class Interval(NamedTuple):
+    lower: Optional[_Bound]
+    upper: Optional[_Bound]
+
+
+def to_interval(specifier: str) -> Optional[Interval]:
+    """
+    interval of the versions matched by a specifier, e.g. ``>=1.0,<1.2``
+
+    :returns: the interval, None if the specifier can not be expressed as a
+                single interval, e.g. ``!=1.0`` or ``==1.*``
+    """
+    lower: Optional[_Bound] = None
+    upper: Optional[_Bound] = None
+    for spec in SpecifierSet(specifier):
+        if spec.operator not in ("<", "<=", ">", ">=", "==") or (
+            spec.version.endswith(".*")
+        ):
+            return None
+
+        version = parse(spec.version)
+        if spec.operator in (">", ">=", "=="):
+            bound = (version, spec.operator != ">")
+            if (
+                lower is None
+                or bound[0] > lower[0]
+                or bound == (lower[0], False)
+            ):
+                lower = bound
+        if spec.operator in ("<", "<=", "=="):
+            bound = (version, spec.operator != "<")
+            if (
+                upper is None
+                or bound[0] < upper[0]
+                or bound == (upper[0], False)
+            ):
+                upper = bound
+    return Interval(lower, upper)
+
+
+class _PackageIndex:
+    """
+    disjoint regions of the versions of a single package
+
+    for the sorted boundaries ``b0 < b1 < ... < bk-1``, region ``2i`` holds
+    the versions strictly between ``bi-1`` and ``bi``, region ``2i + 1``
+    the version ``bi`` itself, and region ``2k`` the versions above ``bk-1``
+    """
+
+    def __init__(self, specifiers: List[str]):
+        intervals: List[Tuple[str, Interval]] = []
+        # specifiers which are not intervals are matched one by one
+        self.others: List[str] = []
+        for specifier in specifiers:
+            interval = to_interval(specifier)
+            if interval is None:
+                self.others.append(specifier)
+            else:
+                intervals.append((specifier, interval))
+
+        self.bounds = sorted(
+            {
+                bound[0]
+                for _, interval in intervals
+                for bound in interval
+                if bound is not None
+            }
+        )
+        self.regions: List[List[str]] = [
+            [] for _ in range(2 * len(self.bounds) + 1)
+        ]
+        for specifier, interval in intervals:
+            first, last = self._region_range(interval)
+            for region in range(first, last + 1):
+                self.regions[region].append(specifier)
+
+    def _region_range(self, interval: Interval) -> Tuple[int, int]:
+        first, last = 0, 2 * len(self.bounds)
+        if interval.lower is not None:
+            version, inclusive = interval.lower
+            i = bisect.bisect_left(self.bounds, version)
+            first = 2 * i + (1 if inclusive else 2)
+        if interval.upper is not None:
+            version, inclusive = interval.upper
+            i = bisect.bisect_left(self.bounds, version)
+            last = 2 * i + (1 if inclusive else 0)
+        return first, last
+
+    def match(self, version) -> List[str]:
+        i = bisect.bisect_left(self.bounds, version)
+        if i < len(self.bounds) and self.bounds[i] == version:
+            region = 2 * i + 1
+        else:
+            region = 2 * i
+        return self.regions[region] + [
+            specifier
+            for specifier in self.others
+            if SpecifierSet(specifier).contains(version, prereleases=True)
+        ]
+
+
+class VulnerabilityIndex:
+    def __init__(self, db: Dict[str, List[str]]):
+        """
+        :param db: (Dict) contents of the ``insecure.json`` database, the
+                    vulnerable specifiers of every package
+        """
+        self._db = {
+            canonicalize_name(name): specifiers
+            for name, specifiers in db.items()
+            if not name.startswith("$")
+        }
+        self._packages: Dict[str, _PackageIndex] = {}
+
+    def match(self, name: str, version: str) -> List[str]:
+        """
+        vulnerable specifiers matching a pinned version of a package
+
+        :param name: (str) name of the package
+        :param version: (str) pinned version of the package
+        :returns: the specifiers, as found in the database
+        """
+        name = canonicalize_name(name)
+        if name not in self._db:
+            return []
+
+        index = self._packages.get(name)
+        if index is None:
+            index = self._packages[name] = _PackageIndex(self._db[name])
+
+        parsed = parse(version)
+        specifiers = index.match(parsed)
+        if specifiers and parsed.is_prerelease:
+            # like safety, pre-releases are only matched by the specifiers
+            # which explicitly include them
+            specifiers = [
+                specifier
+                for specifier in specifiers
+                if SpecifierSet(specifier).contains(parsed)
+            ]
+        return specifiers
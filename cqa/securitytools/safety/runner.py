@@ -1,91 +1,162 @@
+import hashlib
+import json
 import os
-from typing import Dict, Generator, List, Optional
+from typing import Dict, Generator, List, Optional, Tuple
 
 from dparse import filetypes, parse
-from safety.models import Package, Vulnerability
-from safety.safety import check
+from packaging.utils import canonicalize_name
+from safety.models import Package
 
 from cqa.base import Runner
+from cqa.cache import DEFAULT_CACHE_DIR, git_blob_id
 from cqa.types import PackageVulnerability
 
+from .database import DEFAULT_TTL, VulnerabilityDatabase
+
+DEFAULT_DB_DIR = os.path.join(DEFAULT_CACHE_DIR, "safety")
+
 
 class SafetyRunner(Runner):
+    """
+    checks the pinned requirements of the project against the safety
+    vulnerability database
+
+    options, from the ``[tool.cqa.vuln]`` section:
+
+    - ``requirements_file``: requirements file used without a Pipfile.lock
+    - ``db``: url of a safety mirror, or directory holding the database
+    - ``cache-ttl``: seconds after which the database is downloaded again
+    - ``offline``: never download the database
+    - ``cache-dir``: directory of the local copy of the database
+    """
+
+    TOOL = "safety"
+
     _options: Dict = {}
 
-    def __init__(self, options: Optional[Dict] = None):
+    def __init__(
+        self, options: Optional[Dict] = None, jobs: Optional[int] = None
+    ):
         if options is None:
             options = {}
 
-        self._options.update(options)
-
-    rootdir = ""
+        self._options = {**self._options, **options}
+        self._cfg = {
+            k: v
+            for k, v in self._options.items()
+            if k not in ("offline", "cache-dir", "cache-ttl")
+        }
+        self.database = VulnerabilityDatabase(
+            directory=self._options.get("cache-dir", DEFAULT_DB_DIR),
+            ttl=self._options.get("cache-ttl", DEFAULT_TTL),
+            offline=self._options.get("offline", False),
+            mirror=self._options.get("db"),
+        )
 
-    @classmethod
     def run(
-        cls,
+        self,
         _paths: Optional[List[str]] = None,
         rootdir: Optional[str] = "",
-    ):
-        cls.rootdir = rootdir
-        requirements = cls._get_packages()
-        issues = check(requirements, ignore_vulns=[])
-        if not issues[0] and not issues[1]:
+    ) -> List[PackageVulnerability]:
+        found = self._find_requirements(rootdir or "")
+        if found is None:
+            return []
+        path, file_type = found
+
+        db_dir = self.database.ensure()
+        if db_dir is None:
+            self.LOGGER.warning("skipping the vulnerability checks")
+            return []
+
+        # an unchanged dependency set is not parsed and checked again until
+        # the database is updated
+        version = self.database.version(db_dir)
+        key = hashlib.sha1(  # nosec
+            json.dumps(
+                [git_blob_id(path), self._cfg], sort_keys=True, default=str
+            ).encode()
+        ).hexdigest()
+        errors = self.database.get_results(key, version)
+        if errors is not None:
+            return errors
+
+        with open(path, "r", encoding="utf-8") as file:
+            requirements = list(
+                self._parse_requirements(
+                    content=file.read(), file_type=file_type
+                )
+            )
+
+        try:
+            errors = self._check(requirements, db_dir)
+        except (OSError, ValueError) as exc:
+            self.LOGGER.warning("could not check the requirements: %r", exc)
             return []
 
+        self.database.set_results(key, version, errors)
+        return errors
+
+    def _check(
+        self, requirements: List[Package], db_dir: str
+    ) -> List[PackageVulnerability]:
+        index = self.database.get_index(db_dir)
+        vulnerable = [
+            (package, specifier)
+            for package in requirements
+            for specifier in index.match(package.name, package.version)
+        ]
+        if not vulnerable:
+            return []
+
+        # the full database holding the advisories is only loaded when a
+        # package is vulnerable
+        db_full = self.database.load(db_dir, "insecure_full.json")
+        meta = db_full.get("$meta", {})
+
         errors: List[PackageVulnerability] = []
-        for pkg_issues in issues:
-            for vuln in pkg_issues:
-                if isinstance(vuln, Vulnerability):
-                    errors.append(
-                        PackageVulnerability(
-                            vulnerability_id=vuln.vulnerability_id,
-                            package_name=vuln.pkg.name,
-                            current_version=vuln.pkg.version,
-                            affected_versions=vuln.all_vulnerable_specs,
-                            cvssv2_score=vuln.CVE.cvssv2,
-                            cvssv3_score=vuln.CVE.cvssv3,
-                            advisory=vuln.advisory,
-                            more_info_url=vuln.more_info_url,
-                        )
+        seen = set()
+        for package, specifier in vulnerable:
+            name = canonicalize_name(package.name)
+            for entry in db_full.get(name, []):
+                if (
+                    specifier not in entry.get("specs", [])
+                    or entry.get("transitive", False)
+                    or (name, entry["id"]) in seen
+                ):
+                    continue
+                seen.add((name, entry["id"]))
+
+                cve_id = (entry.get("cve") or "").split(",")[0].strip()
+                cve = meta.get("cve", {}).get(cve_id, {})
+                errors.append(
+                    PackageVulnerability(
+                        vulnerability_id=entry["id"].replace("pyup.io-", ""),
+                        package_name=package.name,
+                        current_version=package.version,
+                        affected_versions=entry.get("specs", []),
+                        cvssv2_score=cve.get("cvssv2"),
+                        cvssv3_score=cve.get("cvssv3"),
+                        advisory=entry.get("advisory"),
+                        more_info_url=f"{meta.get('base_domain') or ''}"
+                        f"{entry.get('more_info_path', '')}",
                     )
+                )
         return errors
 
-    @classmethod
-    def _get_packages(cls):
-        content = ""
-        file_type = None
-
-        if os.path.exists(os.path.join(cls.rootdir, "Pipfile.lock")):
-            with open(
-                os.path.join(cls.rootdir, "Pipfile.lock"),
-                "r",
-                encoding="utf-8",
-            ) as file:
-                content = file.read()
-                file_type = filetypes.pipfile_lock
-        elif os.path.exists(
-            os.path.join(
-                cls.rootdir,
-                cls._options.get("requirements_file", "requirements.txt"),
-            )
-        ):
-            with open(
-                os.path.join(
-                    cls.rootdir,
-                    cls._options.get("requirements_file", "requirements.txt"),
-                ),
-                "r",
-                encoding="utf-8",
-            ) as file:
-                content = file.read()
-                file_type = filetypes.requirements_txt
-        else:
-            return []
+    def _find_requirements(self, rootdir: str) -> Optional[Tuple[str, str]]:
+        """
+        path and type of the file pinning the requirements of the project
+        """
+        path = os.path.join(rootdir, "Pipfile.lock")
+        if os.path.exists(path):
+            return path, filetypes.pipfile_lock
 
-        requirements = list(
-            cls._parse_requirements(content=content, file_type=file_type)
+        path = os.path.join(
+            rootdir, self._options.get("requirements_file", "requirements.txt")
         )
-        return requirements
+        if os.path.exists(path):
+            return path, filetypes.requirements_txt
+        return None
 
     @classmethod
     def _parse_requirements(
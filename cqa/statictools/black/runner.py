@@ -2,7 +2,13 @@ import os
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
-from black import Mode, WriteBack, format_file_in_place
+from black import (
+    Mode,
+    NothingChanged,
+    WriteBack,
+    format_file_contents,
+    format_file_in_place,
+)
 from black.mode import TargetVersion
 
 from cqa.base import Runner
@@ -15,18 +21,21 @@ class BlackRunner(Runner):
     runner for black formatter
     """
 
+    TOOL = "black"
+
     def __init__(self, options: Optional[Dict] = None):
         if options is None:
             options = {}
 
+        self._cfg = options
         self._options = self.get_config(options)
 
     def get_config(self, cfg: Dict[str, Any]):
         config = {k.replace("--", "").replace("-", "_"): v for k, v in cfg.items()}
         target_versions = config.get("target_versions", set())
-        config["target_versions"] = [
+        config["target_versions"] = {
             TargetVersion[val.upper()] for val in target_versions
-        ]
+        }
 
         return {
             "fast": True,
@@ -55,11 +64,32 @@ class BlackRunner(Runner):
 
         changed = format_file_in_place(Path(path), **options)
         if changed:
-            error_msg = FILE_FORMATTED_ERROR.format(path=path, linter="black")
-            return ReporterError(
-                path=path,
-                message=error_msg,
-                severity=Severity.ERROR,
-            )
+            return self.get_error(path)
 
         return ReporterError(severity=Severity.WARNING)  # NULL Warning if not modified
+
+    def get_error(self, path: str) -> ReporterError:
+        """
+        error reported for a file which has been reformatted
+        """
+        error_msg = FILE_FORMATTED_ERROR.format(path=path, linter="black")
+        return ReporterError(
+            path=path,
+            message=error_msg,
+            severity=Severity.ERROR,
+            tool=self.TOOL,
+        )
+
+    def format_source(self, src: str, _path: Optional[str] = None) -> str:
+        """
+        format the in-memory source code of a file
+
+        :param src: (str) source code of the file
+        :returns: formatted source code, ``src`` itself if nothing changed
+        """
+        try:
+            return format_file_contents(
+                src, fast=self._options["fast"], mode=self._options["mode"]
+            )
+        except NothingChanged:
+            return src
@@ -1,9 +1,12 @@
 import os
+from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 from isort import Config
 from isort import check_file as isort_check_file
+from isort import code as isort_code
 from isort import file as isort_file
+from isort.exceptions import FileSkipped
 
 from cqa.base import Runner
 from cqa.config import constants
@@ -15,10 +18,13 @@ class ISortRunner(Runner):
     Runner for isort
     """
 
+    TOOL = "isort"
+
     def __init__(self, options: Optional[Dict] = None):
         if options is None:
             options = {}
 
+        self._cfg = options
         self.options = {}  # To use when config needs to be overridden
         options = self.get_config(options)
         self.config = Config(**options)
@@ -50,16 +56,38 @@ class ISortRunner(Runner):
             )
 
             if is_changed:
-                errors.append(
-                    ReporterError(
-                        path=path,
-                        message=constants.ISORT_ERROR_MSG,
-                        severity=Severity.WARNING,
-                    )
-                )
+                errors.append(self.get_error(path))
 
         return errors
 
+    def get_error(self, path: str) -> ReporterError:
+        """
+        error reported for a file whose imports have been sorted
+        """
+        return ReporterError(
+            path=path,
+            message=constants.ISORT_ERROR_MSG,
+            severity=Severity.WARNING,
+            tool=self.TOOL,
+        )
+
+    def format_source(self, src: str, path: str) -> str:
+        """
+        sort the imports of the in-memory source of the file at ``path``
+
+        :param src: (str) source code of the file
+        :param path: (str) path of the file, used to resolve isort settings
+        :returns: source with sorted imports, ``src`` itself if the file
+                is skipped by the configuration
+        """
+        if self.config.is_skipped(Path(path)):
+            return src
+
+        try:
+            return isort_code(src, config=self.config, file_path=Path(path))
+        except FileSkipped:
+            return src
+
     def _format_or_check(
         self,
         path: str,
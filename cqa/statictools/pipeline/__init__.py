@@ -0,0 +1 @@
+from .runner import FormatPipelineRunner as FormatPipelineRunner
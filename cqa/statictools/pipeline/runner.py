@@ -0,0 +1,215 @@
+import difflib
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional
+
+from black import decode_bytes
+
+from cqa import utils
+from cqa.base import Runner
+from cqa.cache import tool_version
+from cqa.config.constants import FILE_UNFORMATTED_ERROR
+from cqa.statictools.black import BlackRunner
+from cqa.statictools.isort import ISortRunner
+from cqa.types import ReporterError
+from cqa.utils.sources import SourceStore
+
+# pipeline owned by each worker process of the process pool, so the
+# formatters are only configured once per worker
+_WORKER_PIPELINE: Optional["FormatPipelineRunner"] = None
+
+
+def _init_worker(options: Dict):
+    global _WORKER_PIPELINE
+    _WORKER_PIPELINE = FormatPipelineRunner(options)
+
+
+def _run_in_worker(path: str, rootdir: str) -> List[ReporterError]:
+    return _WORKER_PIPELINE._format_single_path(path, rootdir)
+
+
+class FormatPipelineRunner(Runner):
+    """
+    runs isort and then black over the in-memory source of every file,
+    the file is read once and only written back if its contents changed
+
+    with the ``check`` option, the files are never written and the changes
+    each formatter would make are reported as a diff instead
+    """
+
+    TOOL = "isort+black"
+    ACCEPTS_SOURCES = True
+    MODIFIES_FILES = True
+
+    def __init__(
+        self, options: Optional[Dict] = None, jobs: Optional[int] = None
+    ):
+        if options is None:
+            options = {}
+
+        self._cfg = options
+        self.jobs = utils.resolve_jobs(jobs, default=options.get("jobs", 1))
+        self.check = options.get("check", False)
+        if self.check:
+            self.MODIFIES_FILES = False
+
+        # formatters are applied in order, each on the output of the previous
+        self._formatters = [
+            ISortRunner(options.get("isort", {})),
+            BlackRunner(options.get("black", {})),
+        ]
+
+    def get_cache_token(self) -> Dict[str, Any]:
+        return {
+            formatter.TOOL: [
+                tool_version(formatter.TOOL),
+                formatter.get_cache_token(),
+            ]
+            for formatter in self._formatters
+        }
+
+    def run(self, paths: List[str], rootdir: str) -> List[ReporterError]:
+        """
+        format the given files in place, or only check them with the
+        ``check`` option
+
+        :param paths: (List[str]) paths of files to be formatted
+        :param rootdir: (str) path of the root directory
+
+        :returns: an error for every formatter that modified, or would
+                modify, a file
+        """
+        return list(self.stream(paths, rootdir))
+
+    def stream(
+        self,
+        paths: List[str],
+        rootdir: str,
+        sources: Optional[SourceStore] = None,
+    ) -> Iterator[ReporterError]:
+        paths = list(paths)
+        if self.jobs > 1 and len(paths) > 1:
+            with ProcessPoolExecutor(
+                max_workers=min(self.jobs, len(paths)),
+                initializer=_init_worker,
+                initargs=(self._cfg,),
+            ) as executor:
+                results = executor.map(
+                    _run_in_worker,
+                    paths,
+                    itertools.repeat(rootdir),
+                    chunksize=max(1, len(paths) // (self.jobs * 4)),
+                )
+                for path, errors in zip(paths, results):
+                    # the file was rewritten by a worker process
+                    if errors and sources is not None and not self.check:
+                        sources.update(path)
+                    yield from errors
+            return
+
+        for path in paths:
+            yield from self._format_single_path(path, rootdir, sources)
+
+    def _format_single_path(
+        self, path: str, rootdir: str, sources: Optional[SourceStore] = None
+    ) -> List[ReporterError]:
+        self.LOGGER.info("formatting file %s", path)
+        if sources is None:
+            with open(path, "rb") as file:
+                data = file.read()
+        else:
+            data = bytes(sources.data(path))
+        src, encoding, newline = decode_bytes(data)
+        filename = path
+
+        if rootdir is not None:
+            path = os.path.relpath(path, rootdir)
+
+        errors: List[ReporterError] = []
+        dst = src
+        for formatter in self._formatters:
+            formatted = formatter.format_source(dst, path)
+            if formatted != dst:
+                errors.append(
+                    self._get_error(formatter, path, dst, formatted, src)
+                )
+                dst = formatted
+
+        if dst != src and not self.check:
+            with open(
+                os.path.join(rootdir or "", path),
+                "w",
+                encoding=encoding,
+                newline=newline,
+            ) as file:
+                file.write(dst)
+            if sources is not None:
+                sources.update(filename)
+
+        return errors
+
+    def _get_error(
+        self, formatter: Runner, path: str, src: str, dst: str, original: str
+    ) -> ReporterError:
+        """
+        :param src: (str) source given to the formatter
+        :param dst: (str) source formatted by the formatter
+        :param original: (str) source of the file, before any formatter
+        """
+        error = formatter.get_error(path)
+        if not self.check:
+            return error
+
+        before = src.splitlines(keepends=True)
+        after = dst.splitlines(keepends=True)
+        # the error points at the first line the formatter would change, in
+        # the file rather than in the output of the previous formatters
+        lnum = 0
+        start = _first_change(before, after)
+        if start is not None:
+            lnum = _original_line(
+                original.splitlines(keepends=True), before, start
+            )
+        return ReporterError(
+            path=path,
+            message=FILE_UNFORMATTED_ERROR.format(
+                path=path, linter=formatter.TOOL
+            ),
+            lnum=lnum,
+            severity=error.severity,
+            tool=formatter.TOOL,
+            diff="".join(
+                difflib.unified_diff(before, after, fromfile=path, tofile=path)
+            ),
+        )
+
+
+def _first_change(before: List[str], after: List[str]) -> Optional[int]:
+    # index of the first line of ``before`` which differs in ``after``
+    return next(
+        (
+            start
+            for tag, start, _, _, _ in difflib.SequenceMatcher(
+                None, before, after, autojunk=False
+            ).get_opcodes()
+            if tag != "equal"
+        ),
+        None,
+    )
+
+
+def _original_line(original: List[str], lines: List[str], index: int) -> int:
+    """
+    number of the line of ``original`` the line at ``index`` of ``lines``,
+    a formatted version of it, comes from, or of the first line of the
+    block it replaced
+    """
+    if original == lines:
+        return index + 1
+    for tag, i1, _, j1, j2 in difflib.SequenceMatcher(
+        None, original, lines, autojunk=False
+    ).get_opcodes():
+        if j1 <= index < j2:
+            return (i1 + index - j1 if tag == "equal" else i1) + 1
+    return len(original) + 1
@@ -1,10 +1,13 @@
+import itertools
 import tempfile
 from argparse import ArgumentParser, Namespace
-from typing import Dict, List, Optional
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional
 
 import toml
 from pylama.main import check_paths, parse_options
 
+from cqa import utils
 from cqa.base import Runner
 from cqa.types import ReporterError, Severity
 
@@ -17,11 +20,39 @@ ERROR_MAPPING: Dict[str, Severity] = {
 }
 
 
+# runner owned by each worker process of the process pool, so the pylama
+# options are only parsed once per worker
+_WORKER_RUNNER: Optional["PylamaRunner"] = None
+
+
+def _init_worker(options: Dict):
+    global _WORKER_RUNNER
+    _WORKER_RUNNER = PylamaRunner(options)
+
+
+def _run_in_worker(paths: List[str], rootdir: str) -> List[ReporterError]:
+    return _WORKER_RUNNER._check_paths(paths, rootdir)
+
+
 class PylamaRunner(Runner):
-    def __init__(self, options: Optional[Dict] = None):
+    TOOL = "pylama"
+    LINE_ORIENTED = True
+
+    # number of shards handed to every worker process
+    SHARDS_PER_JOB = 4
+
+    def __init__(
+        self, options: Optional[Dict] = None, jobs: Optional[int] = None
+    ):
         if options is None:
             options = {}
 
+        options = dict(options)
+        # number of worker processes, files are split in shards linted in a
+        # process pool when more than one worker is requested
+        self.jobs = utils.resolve_jobs(jobs, default=options.pop("jobs", 1))
+
+        self._cfg = options
         self.options = self.get_config(options)
 
     def get_config(self, cfg):
@@ -44,7 +75,42 @@ class PylamaRunner(Runner):
 
         :returns: errors found in the file for each file path
         """
-        errors: List[ReporterError] = []
+        return list(self.stream(paths, rootdir))
+
+    def stream(
+        self, paths: List[str], rootdir: str
+    ) -> Iterator[ReporterError]:
+        paths = list(paths)
+        if self.jobs > 1 and len(paths) > 1:
+            yield from self._run_in_process_pool(paths, rootdir)
+            return
+
+        yield from self._check_paths(paths, rootdir)
+
+    def _run_in_process_pool(
+        self, paths: List[str], rootdir: str
+    ) -> Iterator[ReporterError]:
+        shards = utils.shard(paths, self.jobs, per_job=self.SHARDS_PER_JOB)
+        self.LOGGER.info(
+            "linting %d files in %d shards using %d workers",
+            len(paths),
+            len(shards),
+            self.jobs,
+        )
+
+        with ProcessPoolExecutor(
+            max_workers=min(self.jobs, len(shards)),
+            initializer=_init_worker,
+            initargs=(self._cfg,),
+        ) as executor:
+            for errors in executor.map(
+                _run_in_worker, shards, itertools.repeat(rootdir)
+            ):
+                yield from errors
+
+    def _check_paths(
+        self, paths: List[str], rootdir: str
+    ) -> List[ReporterError]:
         pylama_errors = check_paths(
             paths,
             self.options,
@@ -52,15 +118,16 @@ class PylamaRunner(Runner):
             rootdir=rootdir,
         )
 
-        errors.extend(
-            [
-                ReporterError(
-                    path=error.filename,
-                    severity=ERROR_MAPPING.get(error.etype, Severity.WARNING),
-                    **(error.to_dict()),
-                )
-                for error in pylama_errors
-            ]
-        )
-
-        return errors
+        return [
+            ReporterError(
+                path=error.filename,
+                message=error.message,
+                col=error.col,
+                lnum=error.lnum,
+                severity=ERROR_MAPPING.get(error.etype, Severity.WARNING),
+                tool=error.source,
+                code=error.number,
+                etype=error.etype,
+            )
+            for error in pylama_errors
+        ]
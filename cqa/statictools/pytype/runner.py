@@ -1,15 +1,22 @@
-import asyncio
 import functools
-import itertools
+import hashlib
+import json
+import os
 import sys
-from typing import Dict, List, Optional
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
 
-import aiofiles
-from pytype import analyze, config, load_pytd
+from pytype import analyze, config
+from pytype import io as pytype_io
+from pytype import load_pytd
 
+from cqa import utils
 from cqa.base import Runner
+from cqa.cache import DEFAULT_CACHE_DIR, StubCache, tool_version
 from cqa.config import constants
 from cqa.types import ReporterError, Severity
+from cqa.utils.imports import ImportGraph, ImportIndex, is_package
+from cqa.utils.sources import SourceStore
 
 WARNINGS = frozenset(["annotation-type-mismatch"])
 ERRORS = frozenset(["unsupported-operands", "wrong-arg-types"])
@@ -18,8 +25,42 @@ ERROR_MAPPING = {
     Severity.ERROR: ERRORS,
 }
 
+DEFAULT_STUBS_DIR = os.path.join(DEFAULT_CACHE_DIR, "pytype")
+
+# name of the import graph index, kept along with the stubs
+INDEX_NAME = "imports.json"
+
+# runner owned by each worker process of the process pool, so the options
+# and the loader are only built once per worker
+_WORKER_RUNNER: Optional["PytypeRunner"] = None
+
+
+def _init_worker(options: Dict):
+    global _WORKER_RUNNER
+    _WORKER_RUNNER = PytypeRunner(options)
+
+
+def _run_in_worker(path: str) -> List[ReporterError]:
+    return _WORKER_RUNNER._run_for_single_path_sync(path)
+
 
 class PytypeRunner(Runner):
+    """
+    type checks the files with pytype
+
+    options, from the ``[tool.cqa.linter.pytype]`` section, besides the
+    options of pytype itself:
+
+    - ``jobs``: number of worker processes
+    - ``ordered``: analyse the modules in the order of their imports, the
+      stubs inferred for the modules are used to check the modules which
+      import them, and are kept to skip the unchanged modules on later runs
+    - ``cache-dir``: directory of the stubs of the ordered analysis
+    """
+
+    TOOL = "pytype"
+    ACCEPTS_SOURCES = True
+
     _options = {
         "python_version": sys.version_info[:2],
         "enable_cached_property": True,
@@ -32,12 +73,23 @@ class PytypeRunner(Runner):
     _loader = None
     _opt = None
 
-    def __init__(self, options: Optional[Dict] = None):
+    def __init__(
+        self, options: Optional[Dict] = None, jobs: Optional[int] = None
+    ):
         if options is None:
             options = {}
 
+        options = dict(options)
+        # number of worker processes, files are type checked in a process
+        # pool when more than one worker is requested
+        self.jobs = utils.resolve_jobs(jobs, default=options.pop("jobs", 1))
+        self.ordered = bool(options.pop("ordered", False))
+        self.stubs_dir = options.pop("cache-dir", DEFAULT_STUBS_DIR)
+        self.follows_imports = self.ordered
+
         # override pytype options with newer options
-        self._options.update(options)
+        self._options = {**self._options, **options}
+        self._cfg = self._options
         self._opt = config.Options.create(**self._options)
         self._loader = load_pytd.create_loader(self._opt)
 
@@ -51,47 +103,251 @@ class PytypeRunner(Runner):
         return REVERSE_MAPPING
 
     def run(self, paths: List[str], rootdir: str) -> List[ReporterError]:
-        coro = []  # List of all the coroutines
+        return list(self.stream(paths, rootdir))
+
+    def stream(
+        self,
+        paths: List[str],
+        rootdir: str,
+        sources: Optional[SourceStore] = None,
+    ) -> Iterator[ReporterError]:
+        paths = list(paths)
+        if self.ordered:
+            yield from self._stream_ordered(paths, rootdir, sources)
+            return
+
+        if self.jobs > 1 and len(paths) > 1:
+            # worker processes read the files themselves
+            yield from self._run_in_process_pool(paths)
+            return
+
         for filename in paths:
-            coro.append(self._run_for_single_path(filename))
+            if sources is None:
+                yield from self._run_for_single_path_sync(filename)
+            else:
+                yield from self._check_source(sources.text(filename), filename)
 
-        event_loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(event_loop)
+    def _run_in_process_pool(
+        self, paths: List[str]
+    ) -> Iterator[ReporterError]:
+        self.LOGGER.info(
+            "type checking %d files using %d workers", len(paths), self.jobs
+        )
+        with ProcessPoolExecutor(
+            max_workers=min(self.jobs, len(paths)),
+            initializer=_init_worker,
+            initargs=(self._options,),
+        ) as executor:
+            # the cost of a file varies a lot, so hand out one file at a time
+            for errors in executor.map(_run_in_worker, paths, chunksize=1):
+                yield from errors
 
-        futures = asyncio.gather(*coro)
-        errors = event_loop.run_until_complete(futures)
-        event_loop.close()
-        return list(itertools.chain.from_iterable(errors))
+    def _run_for_single_path_sync(self, path) -> List[ReporterError]:
+        with open(path, "r", encoding="utf-8") as f:
+            return self._check_source(f.read(), path)
 
-    async def _run_for_single_path(self, path) -> List[ReporterError]:
-        errors: List[ReporterError] = []
-        async with aiofiles.open(path, "r", encoding="utf-8") as f:
-            src = await f.read()
-            ret = analyze.check_types(
-                src=src,
-                filename=path,
-                options=self._opt,
-                loader=self._loader,
-            )
+    def _stream_ordered(
+        self,
+        paths: List[str],
+        rootdir: str,
+        sources: Optional[SourceStore] = None,
+    ) -> Iterator[ReporterError]:
+        """
+        infer the stubs of the modules in the order of their imports, the
+        modules which import each other are analysed one after the other
 
-            for error in ret.errorlog:
-                error_name = getattr(error, "_name")
-                if error_name in WARNINGS | ERRORS:
-                    message = getattr(
-                        error,
-                        "_message",
-                        constants.TYPE_MISMATCH_ERROR,
-                    )
-                    severity = self.__REVERSE_ERROR_MAPPING.get(
-                        error_name, Severity.WARNING
+        the modules importing a changed module are analysed as well, even
+        when they are not part of ``paths``, e.g. with ``--changed-since``,
+        as their results may change along with the stubs they import. the
+        results of those modules are only reported when they had to be
+        analysed again. the modules they import are analysed first when
+        their stubs are missing, e.g. with a cold cache, and their results
+        are not reported
+        """
+        owns_sources = sources is None
+        if owns_sources:
+            sources = SourceStore()
+        stubs = StubCache(
+            os.path.join(rootdir, self.stubs_dir), token=self._stubs_token()
+        )
+        index = ImportIndex.load(
+            os.path.join(stubs.directory, INDEX_NAME), rootdir=rootdir
+        )
+
+        try:
+            changed = index.update(paths, sources=sources)
+            for module in changed - set(index.modules):
+                stubs.discard(module)
+            # the modules imported by the given ones but left out of
+            # ``paths``, e.g. with ``--changed-since``, are scanned as well
+            # so that their stubs can be inferred
+            index.add_dependencies(sources=sources)
+
+            given = {os.path.abspath(path) for path in paths}
+            # files named like another module, e.g. scripts of different
+            # directories, can not be imported and are checked on their own
+            indexed = {
+                os.path.abspath(path) for path in index.modules.values()
+            }
+            for path in paths:
+                if os.path.abspath(path) not in indexed:
+                    yield from self._check_source(sources.text(path), path)
+
+            selected = index.affected(changed).union(
+                module
+                for module, path in index.modules.items()
+                if os.path.abspath(path) in given
+            )
+            # the stubs of the modules the selected ones import are inferred
+            # first when missing, without reporting their results
+            required = index.imported(selected)
+            for component in index.components():
+                modules = [
+                    module for module in component if module in required
+                ]
+                if not modules:
+                    continue
+                # the components come after the ones they import, so a single
+                # loader serves the modules of a component
+                loader = self._create_loader(stubs.directory)
+                for module in modules:
+                    yield from self._analyse_module(
+                        module,
+                        index,
+                        stubs,
+                        sources,
+                        loader,
+                        cached=os.path.abspath(index.modules[module]) in given,
+                        report=module in selected,
                     )
-                    errors.append(
-                        ReporterError(
-                            path=path,
-                            message=message,
-                            lnum=getattr(error, "_lineno", 0),
-                            severity=severity,
-                        )
+        finally:
+            index.save()
+            stubs.save()
+            self.LOGGER.info(
+                "stubs reused: %d, inferred: %d", stubs.hits, stubs.misses
+            )
+            if owns_sources:
+                sources.close()
+
+    def _stubs_token(self) -> str:
+        payload = json.dumps(
+            [tool_version(self.TOOL), self._options],
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha1(payload.encode()).hexdigest()  # nosec
+
+    def _analyse_module(
+        self,
+        module: str,
+        graph: ImportGraph,
+        stubs: StubCache,
+        sources: SourceStore,
+        loader: load_pytd.Loader,
+        cached: bool = True,
+        report: bool = True,
+    ) -> List[ReporterError]:
+        """
+        :param loader: (load_pytd.Loader) loader of the component of the
+                    module, see ``_create_loader``
+        :param cached: (bool) whether the results of a module whose stub is
+                    up to date are returned, rather than only the results
+                    of a module analysed again
+        :param report: (bool) whether the results are returned at all, the
+                    stub of the module is inferred when missing either way
+        """
+        path = graph.modules[module]
+        package = is_package(path)
+        key = stubs.key(
+            module, sources.blob_id(path), graph.dependencies(module)
+        )
+        errors = stubs.get(module, key, path)
+        if errors is not None:
+            return errors if cached and report else []
+
+        try:
+            errors, stub = self._infer_source(
+                sources.text(path), path, module, package, loader
+            )
+        except Exception:  # pylint: disable=broad-except
+            self.LOGGER.warning(
+                "could not infer the types of %s", path, exc_info=True
+            )
+            stubs.discard(module)
+            return []
+
+        stubs.set(module, key, stub, errors, package=package)
+        # the modules of the component importing the module load its new
+        # stub rather than the one the loader may have loaded before
+        loader.remove_name(module)
+        return errors if report else []
+
+    def _create_loader(self, stubs_dir: str) -> load_pytd.Loader:
+        """
+        loader resolving the first party imports to the stubs already
+        inferred in ``stubs_dir``
+        """
+        return load_pytd.create_loader(
+            config.Options.create(**self._options, pythonpath=stubs_dir)
+        )
+
+    def _infer_source(
+        self,
+        src: str,
+        path: str,
+        module: str,
+        package: bool,
+        loader: load_pytd.Loader,
+    ) -> Tuple[List[ReporterError], str]:
+        """
+        check a module and infer its stub, the modules it imports are
+        resolved by ``loader`` to the stubs already inferred
+        """
+        options = config.Options.create(
+            path,
+            **self._options,
+            module_name=f"{module}.__init__" if package else module,
+            pythonpath=loader.options.pythonpath,
+        )
+        # the loader resolves the relative imports against the module name
+        # of its options
+        loader.options = options
+        errorlog, stub, _ = pytype_io.generate_pyi(
+            src, options=options, loader=loader
+        )
+        return self._get_errors(errorlog, path), stub
+
+    def _check_source(self, src: str, path: str) -> List[ReporterError]:
+        ret = analyze.check_types(
+            src=src,
+            filename=path,
+            options=self._opt,
+            loader=self._loader,
+        )
+        return self._get_errors(ret.errorlog, path)
+
+    def _get_errors(self, errorlog, path: str) -> List[ReporterError]:
+        errors: List[ReporterError] = []
+        for error in errorlog:
+            error_name = getattr(error, "_name")
+            if error_name in WARNINGS | ERRORS:
+                message = getattr(
+                    error,
+                    "_message",
+                    constants.TYPE_MISMATCH_ERROR,
+                )
+                severity = self.__REVERSE_ERROR_MAPPING.get(
+                    error_name, Severity.WARNING
+                )
+                errors.append(
+                    ReporterError(
+                        path=path,
+                        message=message,
+                        lnum=getattr(error, "_lineno", 0),
+                        severity=severity,
+                        tool=self.TOOL,
+                        code=error_name,
                     )
+                )
 
         return errors
@@ -1,5 +1,7 @@
+import hashlib
+import os
 from enum import Enum
-from typing import List, Optional, TypeVar
+from typing import Any, Dict, List, Optional, Tuple, TypeVar
 
 from cqa.config import constants
 
@@ -15,8 +17,23 @@ class Severity(Enum):
 class ReporterError:
     """
     base class for reporting any errors
+
+    errors are immutable and hashable, and only keep the extra fields of
+    the tool they are reported by as a tuple
     """
 
+    __slots__ = (
+        "path",
+        "message",
+        "col",
+        "lnum",
+        "_strict",
+        "severity",
+        "tool",
+        "code",
+        "_details",
+    )
+
     def __init__(
         self,
         path: str = "",
@@ -25,19 +42,103 @@ class ReporterError:
         lnum: int = 0,
         strict: bool = False,
         severity: Severity = Severity.ERROR,
+        tool: str = "",
+        code: str = "",
         **extras,
     ):
-        self.path = path
-        self.message = message
-        self.col = col
-        self.lnum = lnum
-        self._strict = strict
-        self.severity = severity
-        self.details = extras
+        """
+        :param tool: (str) tool which reported the error, e.g. pyflakes
+        :param code: (str) code of the check of the tool, e.g. W0611
+        :param extras: extra fields given by the tool
+        """
+        _set = object.__setattr__
+        _set(self, "path", path)
+        _set(self, "message", message)
+        _set(self, "col", col)
+        _set(self, "lnum", lnum)
+        _set(self, "_strict", strict)
+        _set(self, "severity", severity)
+        _set(self, "tool", tool)
+        _set(self, "code", code)
+        _set(self, "_details", tuple(extras.items()))
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError(f"{self.__class__.__name__} is immutable")
+
+    def __delattr__(self, name: str):
+        raise AttributeError(f"{self.__class__.__name__} is immutable")
+
+    def __getstate__(self) -> Tuple:
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state: Tuple):
+        for name, value in zip(self.__slots__, state):
+            object.__setattr__(self, name, value)
 
     def __repr__(self):
         return f"{self.path}:{self.lnum}:{self.col} - {self.message}"
 
+    @property
+    def details(self) -> Dict[str, Any]:
+        """
+        extra fields given by the tool
+        """
+        return dict(self._details)
+
+    def fingerprint(
+        self, rootdir: Optional[str] = None, line: str = ""
+    ) -> str:
+        """
+        stable identifier of the error, which does not depend on the number
+        of its line so it survives unrelated edits of the file
+
+        :param rootdir: (str) root the path of the error is made relative
+                    to, so the identifier is the same in every checkout, the
+                    current directory when None
+        :param line: (str) content of the line of the error, whitespace
+                    aside
+        """
+        path = self.path
+        if path:
+            path = os.path.relpath(
+                os.path.abspath(path), os.path.abspath(rootdir or os.getcwd())
+            )
+        payload = "\0".join(
+            (
+                path,
+                self.tool,
+                self.code,
+                " ".join(self.message.split()),
+                " ".join(line.split()),
+            )
+        )
+        return hashlib.sha1(payload.encode()).hexdigest()  # nosec
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        serialize the error into a json compatible dictionary
+        """
+        return {
+            "path": self.path,
+            "message": self.message,
+            "col": self.col,
+            "lnum": self.lnum,
+            "strict": self._strict,
+            "severity": self.severity.value,
+            "tool": self.tool,
+            "code": self.code,
+            **self.details,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> Self:
+        """
+        build the error back from the output of ``to_dict``
+        """
+        data = dict(data)
+        data["severity"] = Severity(data.get("severity", Severity.ERROR.value))
+        return cls(**data)
+
     def __eq__(self, other: Self) -> bool:
         eq_path_and_message = (
             other.path == self.path and other.message == self.message
@@ -51,6 +152,10 @@ class ReporterError:
         # otherwise only check for path and error message
         return eq_path_and_message
 
+    def __hash__(self) -> int:
+        # equal errors always have the same path and message
+        return hash((self.path, self.message))
+
 
 class PackageVulnerability:
     __cvssv2_score_severity = {
@@ -83,18 +188,24 @@ class PackageVulnerability:
         self.affected_versions = affected_versions
         self.advisory = advisory
         self.more_info_url = more_info_url
+        self.cvssv2_score = cvssv2_score
+        self.cvssv3_score = cvssv3_score
 
         self.severity = Severity.WARNING
         if cvssv3_score:
             self.severity = self.__cvssv3_score_severity.get(
                 next(
-                    k for k in self.__cvssv3_score_severity if k > cvssv3_score
+                    k
+                    for k in self.__cvssv3_score_severity
+                    if k >= cvssv3_score
                 )  # noqa
             )
         if not cvssv3_score and cvssv2_score:
             self.severity = self.__cvssv2_score_severity.get(
                 next(
-                    k for k in self.__cvssv2_score_severity if k > cvssv2_score
+                    k
+                    for k in self.__cvssv2_score_severity
+                    if k >= cvssv2_score
                 )  # noqa
             )
 
@@ -110,3 +221,25 @@ class PackageVulnerability:
 
     def __repr__(self):
         return self.message
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        serialize the vulnerability into a json compatible dictionary
+        """
+        return {
+            "vulnerability_id": self.vulnerability_id,
+            "package_name": self.package_name,
+            "current_version": self.current_version,
+            "advisory": self.advisory,
+            "cvssv2_score": self.cvssv2_score,
+            "cvssv3_score": self.cvssv3_score,
+            "affected_versions": list(self.affected_versions),
+            "more_info_url": self.more_info_url,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PackageVulnerability":
+        """
+        build the vulnerability back from the output of ``to_dict``
+        """
+        return cls(**data)
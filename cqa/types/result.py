@@ -1,28 +1,301 @@
-import itertools
-from collections import defaultdict
-from typing import List
+"""
+results of a run, stored as columns
 
-from cqa.types import ReporterError, Severity
+every diagnostic is a row of compact columns: the path, the message, the
+tool and the extra fields are ids into tables of the distinct values, the
+line and column numbers and the severity are ``array`` items. rows are
+indexed by severity, path and tool as they are added, and the diagnostics
+are only built back as objects when they are read.
+"""
+
+from array import array
+from typing import (
+    Any,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Union,
+)
+
+from cqa.types import PackageVulnerability, ReporterError, Severity
+
+Item = Union[ReporterError, PackageVulnerability]
+
+_SEVERITIES = list(Severity)
+_SEVERITY_CODES = {severity: code for code, severity in enumerate(_SEVERITIES)}
+
+# flags of a row
+_STRICT = 1
+_VULNERABILITY = 2
+
+
+class _Table:
+    """
+    distinct values of a column, a value is stored once and referred to by
+    its id
+    """
+
+    __slots__ = ("values", "_ids")
+
+    def __init__(self):
+        self.values: List[Any] = []
+        self._ids: Dict[Hashable, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def get_id(self, value: Any, key: Optional[Hashable] = None) -> int:
+        """
+        id of ``value``, added to the table if missing
+
+        :param key: (Hashable) key of the value, the value itself when None
+        """
+        if key is None:
+            key = value
+        found = self._ids.get(key)
+        if found is None:
+            found = self._ids[key] = len(self.values)
+            self.values.append(value)
+        return found
+
+    def find(self, value: Hashable) -> Optional[int]:
+        return self._ids.get(value)
+
+
+def _hashable(value: Any) -> bool:
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
 
 
 class Result:
-    def __init__(self, errors: List[ReporterError]):
-        groups = itertools.groupby(errors, key=lambda key: key.severity)
+    def __init__(
+        self, errors: Iterable[Item] = (), tool: Optional[str] = None
+    ):
+        """
+        :param errors: (Iterable) diagnostics and vulnerabilities found
+        :param tool: (str) tool or tool group which found them, if known
+        """
+        self._paths = _Table()
+        self._messages = _Table()
+        self._tools = _Table()
+        self._details = _Table()
+        # id 0 is the empty path, tool and details
+        self._paths.get_id("")
+        self._tools.get_id("")
+        self._details.get_id(("", "", ()))
+
+        self._path = array("I")
+        self._message = array("I")
+        self._tool = array("H")
+        self._details_id = array("I")
+        self._lnum = array("i")
+        self._col = array("i")
+        self._severity = array("B")
+        self._flags = array("B")
+        # extra fields which can not be shared and vulnerabilities, by row
+        self._objects: Dict[int, Any] = {}
+
+        self._by_severity: Dict[int, array] = {}
+        self._by_path: Dict[int, array] = {}
+        self._by_tool: Dict[int, array] = {}
+
+        self.extend(errors, tool=tool)
+
+    def __len__(self) -> int:
+        return len(self._severity)
 
-        _results = defaultdict(list)
-        for sev, group in groups:
-            _results[sev].extend(group)
+    def __iter__(self) -> Iterator[Item]:
+        return (self._get(row) for row in range(len(self)))
 
-        self._results = _results
+    def add(self, item: Item, tool: Optional[str] = None):
+        """
+        add a diagnostic or a vulnerability found by ``tool``
+        """
+        row = len(self)
+        flags = 0
+        if isinstance(item, PackageVulnerability):
+            self._objects[row] = item
+            path = message = ""
+            lnum = col = 0
+            details = 0
+            flags |= _VULNERABILITY
+        else:
+            path, message = item.path, item.message
+            lnum, col = item.lnum, item.col
+            # the tool, the code and the extra fields of the diagnostics
+            # repeat a lot, e.g. for the pylama error codes, so equal ones
+            # are stored once
+            details = 0
+            extras = (item.tool, item.code, item._details)
+            if _hashable(extras):
+                details = self._details.get_id(extras)
+            else:
+                self._objects[row] = extras
+            if item._strict:
+                flags |= _STRICT
+
+        self._append(
+            self._paths.get_id(path),
+            self._messages.get_id(message),
+            self._tools.get_id(tool or ""),
+            details,
+            lnum,
+            col,
+            _SEVERITY_CODES[item.severity],
+            flags,
+        )
+
+    def extend(self, items: Iterable[Item], tool: Optional[str] = None):
+        for item in items:
+            self.add(item, tool=tool)
+
+    def update(self, other: "Result"):
+        """
+        append the rows of ``other``, e.g. the result of another shard,
+        without building its diagnostics back
+        """
+        paths = [self._paths.get_id(value) for value in other._paths.values]
+        messages = [
+            self._messages.get_id(value) for value in other._messages.values
+        ]
+        tools = [self._tools.get_id(value) for value in other._tools.values]
+        details = [
+            self._details.get_id(value) for value in other._details.values
+        ]
+
+        offset = len(self)
+        for row, value in other._objects.items():
+            self._objects[offset + row] = value
+
+        # the columns are extended as a whole, only the ids are mapped
+        for column, values, ids in (
+            (self._path, other._path, paths),
+            (self._message, other._message, messages),
+            (self._tool, other._tool, tools),
+            (self._details_id, other._details_id, details),
+        ):
+            column.extend(array(column.typecode, [ids[i] for i in values]))
+        self._lnum.extend(other._lnum)
+        self._col.extend(other._col)
+        self._severity.extend(other._severity)
+        self._flags.extend(other._flags)
+
+        for index, other_index, ids in (
+            (self._by_severity, other._by_severity, None),
+            (self._by_path, other._by_path, paths),
+            (self._by_tool, other._by_tool, tools),
+        ):
+            for key, rows in other_index.items():
+                if ids is not None:
+                    key = ids[key]
+                found = index.get(key)
+                if found is None:
+                    found = index[key] = array("I")
+                found.extend(array("I", [row + offset for row in rows]))
+
+    @classmethod
+    def merge(cls, results: Iterable["Result"]) -> "Result":
+        """
+        single result with the rows of all the ``results``, in order
+        """
+        merged = cls()
+        for result in results:
+            merged.update(result)
+        return merged
+
+    def _append(
+        self,
+        path: int,
+        message: int,
+        tool: int,
+        details: int,
+        lnum: int,
+        col: int,
+        severity: int,
+        flags: int,
+    ):
+        row = len(self)
+        self._path.append(path)
+        self._message.append(message)
+        self._tool.append(tool)
+        self._details_id.append(details)
+        self._lnum.append(lnum)
+        self._col.append(col)
+        self._severity.append(severity)
+        self._flags.append(flags)
+
+        for index, key in (
+            (self._by_severity, severity),
+            (self._by_path, path),
+            (self._by_tool, tool),
+        ):
+            rows = index.get(key)
+            if rows is None:
+                rows = index[key] = array("I")
+            rows.append(row)
+
+    def _get(self, row: int) -> Item:
+        flags = self._flags[row]
+        if flags & _VULNERABILITY:
+            return self._objects[row]
+
+        extras = self._objects.get(row)
+        if extras is None:
+            extras = self._details.values[self._details_id[row]]
+        tool, code, details = extras
+        return ReporterError(
+            path=self._paths.values[self._path[row]],
+            message=self._messages.values[self._message[row]],
+            col=self._col[row],
+            lnum=self._lnum[row],
+            strict=bool(flags & _STRICT),
+            severity=_SEVERITIES[self._severity[row]],
+            tool=tool,
+            code=code,
+            **dict(details),
+        )
+
+    def _rows(self, index: Dict[int, array], key: Optional[int]) -> List[Item]:
+        if key is None:
+            return []
+        return [self._get(row) for row in index.get(key, ())]
+
+    def by_severity(self, severity: Severity) -> List[Item]:
+        return self._rows(self._by_severity, _SEVERITY_CODES[severity])
+
+    def by_path(self, path: str) -> List[Item]:
+        return self._rows(self._by_path, self._paths.find(path))
+
+    def by_tool(self, tool: str) -> List[Item]:
+        return self._rows(self._by_tool, self._tools.find(tool))
+
+    @property
+    def paths(self) -> List[str]:
+        """
+        paths with at least one diagnostic, in the order they were found
+        """
+        return [
+            self._paths.values[path] for path in self._by_path if path != 0
+        ]
+
+    @property
+    def tools(self) -> List[str]:
+        return [self._tools.values[tool] for tool in self._by_tool]
 
     @property
     def errors(self):
-        return self._results.get(Severity.ERROR, [])
+        return self.by_severity(Severity.ERROR)
 
     @property
     def warnings(self):
-        return self._results.get(Severity.WARNING, [])
+        return self.by_severity(Severity.WARNING)
 
     @property
     def info(self):
-        return self._results.get(Severity.INFO, [])
+        return self.by_severity(Severity.INFO)
@@ -1,2 +1,7 @@
+from .baseline import Baseline
+from .dedup import deduplicate
 from .hook import install_git_hook
-from .path import walk_path
+from .path import discover_files, walk_path
+from .pool import resolve_jobs, shard
+from .profile import Profiler
+from .sources import SourceStore
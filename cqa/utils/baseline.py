@@ -0,0 +1,155 @@
+"""
+baseline of the findings already known in a repository
+
+the fingerprint of a finding is made of its path relative to the root of
+the repository, the tool, the code of the check, the message and the
+content of its line, all with normalized whitespace, so that it survives
+lines moved by unrelated edits. a baseline counts the findings of every
+fingerprint, and is written as a sorted text file of the fingerprints and
+their counts, one per line.
+"""
+
+import hashlib
+import logging
+import os
+from collections import Counter
+from typing import Dict, Iterable, Iterator, Optional, Tuple, TypeVar, Union
+
+from cqa.types import PackageVulnerability, ReporterError
+from cqa.utils.sources import SourceStore
+
+T = TypeVar("T")
+
+Item = Union[ReporterError, PackageVulnerability]
+
+DEFAULT_BASELINE = ".cqa-baseline"
+
+_HEADER = "# cqa baseline"
+VERSION = 1
+
+# hexadecimal digits kept of the fingerprints, 64 bits keep collisions
+# unlikely even for hundreds of thousands of findings
+_DIGITS = 16
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.split())
+
+
+class Baseline:
+
+    LOGGER = logging.getLogger(__name__)
+
+    def __init__(
+        self,
+        counts: Optional[Dict[str, int]] = None,
+        rootdir: Optional[str] = None,
+    ):
+        """
+        :param counts: (Dict) number of known findings by fingerprint
+        :param rootdir: (str) root the paths of the findings are made
+                    relative to, the current directory when None
+        """
+        self.counts: Counter = Counter(counts or {})
+        self.rootdir = os.path.abspath(rootdir or os.getcwd())
+
+    def __len__(self) -> int:
+        return sum(self.counts.values())
+
+    @classmethod
+    def load(cls, path: str, rootdir: Optional[str] = None) -> "Baseline":
+        """
+        read a baseline written by ``save``
+
+        :raises ValueError: when the file is not a baseline of this version
+        """
+        counts: Dict[str, int] = {}
+        with open(path, encoding="utf-8") as file:
+            header = file.readline().strip()
+            if header != f"{_HEADER} {VERSION}":
+                raise ValueError(f"{path} is not a cqa baseline")
+            for line in file:
+                fingerprint, _, count = line.partition(" ")
+                if fingerprint:
+                    counts[fingerprint] = int(count or 1)
+        return cls(counts, rootdir=rootdir)
+
+    def save(self, path: str):
+        # the fingerprints are sorted so the file changes as little as
+        # possible when the baseline is created again
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(f"{_HEADER} {VERSION}\n")
+            for fingerprint, count in sorted(self.counts.items()):
+                if count > 0:
+                    file.write(f"{fingerprint} {count}\n")
+
+    @staticmethod
+    def _get_line(item: ReporterError, sources: Optional[SourceStore]) -> str:
+        if sources is None or item.lnum <= 0:
+            return ""
+        try:
+            lines = sources.lines(item.path)
+        except (OSError, SyntaxError, UnicodeDecodeError):
+            return ""
+        if item.lnum > len(lines):
+            return ""
+        return lines[item.lnum - 1]
+
+    def fingerprint(
+        self,
+        item: Item,
+        sources: Optional[SourceStore] = None,
+    ) -> str:
+        """
+        fingerprint of a finding, see ``ReporterError.fingerprint``
+
+        :param sources: (SourceStore) store the line of the finding is read
+                    from, the line is left out when None
+        """
+        if isinstance(item, PackageVulnerability):
+            payload = "\0".join(
+                (
+                    "vulnerability",
+                    item.package_name,
+                    item.current_version,
+                    item.vulnerability_id,
+                )
+            )
+            digest = hashlib.sha1(payload.encode()).hexdigest()  # nosec
+        else:
+            digest = item.fingerprint(
+                self.rootdir, self._get_line(item, sources)
+            )
+        return digest[:_DIGITS]
+
+    def add(
+        self,
+        item: Item,
+        sources: Optional[SourceStore] = None,
+    ):
+        self.counts[self.fingerprint(item, sources)] += 1
+
+    def filter(
+        self,
+        items: Iterable[Tuple[T, Item]],
+        sources: Optional[SourceStore] = None,
+    ) -> Iterator[Tuple[T, Item]]:
+        """
+        drop the findings known by the baseline, as they are found
+
+        every fingerprint hides as many findings as it counted when the
+        baseline was created, so a new finding identical to a known one is
+        still reported
+
+        :param items: (Iterable) pairs of a tool group and a finding
+        """
+        remaining = Counter(self.counts)
+        known = 0
+        for name, item in items:
+            fingerprint = self.fingerprint(item, sources)
+            if remaining[fingerprint] > 0:
+                remaining[fingerprint] -= 1
+                known += 1
+                continue
+            yield name, item
+        self.LOGGER.info("%d known findings hidden by the baseline", known)
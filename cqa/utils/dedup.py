@@ -0,0 +1,84 @@
+"""
+de-duplication of the findings reported by several tools
+
+the same problem is often found by more than one tool, e.g. an undefined
+name by pyflakes, pylint and pytype. findings are equivalent when they are
+on the same line of the same file, and either are equivalent checks of
+different tools, as listed in ``EQUIVALENT_CHECKS``, or have the same
+column and message.
+"""
+
+import os
+from typing import Dict, Hashable, Iterable, Iterator, Tuple, TypeVar, Union
+
+from cqa.types import PackageVulnerability, ReporterError, Severity
+
+T = TypeVar("T")
+
+Item = Union[ReporterError, PackageVulnerability]
+
+# checks of different tools which find the same problem, by kind of problem
+_CHECKS = {
+    "unused-import": {("pyflakes", "W0611"), ("pylint", "W0611")},
+    "unused-variable": {("pyflakes", "W0612"), ("pylint", "W0612")},
+    "undefined-name": {
+        ("pyflakes", "E0602"),
+        ("pylint", "E0602"),
+        ("pytype", "name-error"),
+    },
+    "import-error": {("pylint", "E0401"), ("pytype", "import-error")},
+    "line-too-long": {("pycodestyle", "E501"), ("pylint", "C0301")},
+    "eval": {("bandit", "B307"), ("pylint", "W0123")},
+    "hardcoded-secret": {
+        ("bandit", "B105"),
+        ("bandit", "B106"),
+        ("bandit", "B107"),
+        ("detect-secrets", "Secret Keyword"),
+    },
+}
+
+# kind of problem found by a check, by tool and code of the check
+EQUIVALENT_CHECKS: Dict[Tuple[str, str], str] = {
+    check: kind for kind, checks in _CHECKS.items() for check in checks
+}
+
+_RANKS = {Severity.INFO: 0, Severity.WARNING: 1, Severity.ERROR: 2}
+
+
+def finding_keys(item: Item) -> Tuple[Hashable, ...]:
+    """
+    keys of a finding, equivalent findings share at least one of them
+    """
+    if isinstance(item, PackageVulnerability):
+        return (
+            (item.package_name, item.current_version, item.vulnerability_id),
+        )
+
+    # tools spell the same path differently, e.g. with a leading ``./``
+    path = os.path.normpath(item.path)
+    message = (path, item.lnum, item.col, " ".join(item.message.split()))
+    kind = EQUIVALENT_CHECKS.get((item.tool, item.code))
+    if kind is None:
+        return (message,)
+    return (message, (path, item.lnum, kind))
+
+
+def deduplicate(items: Iterable[Tuple[T, Item]]) -> Iterator[Tuple[T, Item]]:
+    """
+    drop the findings equivalent to a finding already yielded, in a single
+    pass over the findings as they are found
+
+    a finding is still yielded when it is more severe than the equivalent
+    ones yielded before, so de-duplication never hides an error
+
+    :param items: (Iterable) pairs of a tool group and a finding
+    """
+    reported: Dict[Hashable, int] = {}
+    for name, item in items:
+        keys = finding_keys(item)
+        rank = _RANKS[item.severity]
+        if any(reported.get(key, -1) >= rank for key in keys):
+            continue
+        for key in keys:
+            reported[key] = max(rank, reported.get(key, -1))
+        yield name, item
@@ -0,0 +1,450 @@
+"""
+import graph of the modules of a project
+
+the imports of a module are found by scanning its syntax tree, without
+importing it. the name of a module is derived from the packages it lives
+in, i.e. the directories with an ``__init__.py`` above it, so it matches
+the name the module is imported by.
+
+the graph can be kept on disk as an index, along with the contents every
+module was scanned from, so that only the modules which changed since are
+scanned again.
+"""
+
+import ast
+import json
+import os
+from collections import defaultdict
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+
+from cqa.utils.sources import SourceStore
+
+_INIT = "__init__.py"
+
+# version of the index, indexes of an older version are never read
+INDEX_VERSION = 1
+
+
+def module_name(path: str) -> str:
+    """
+    dotted name of the module at ``path``, e.g. ``pkg.mod`` for
+    ``pkg/mod.py`` when ``pkg`` has an ``__init__.py``, and ``pkg`` for
+    ``pkg/__init__.py``
+    """
+    directory, filename = os.path.split(os.path.abspath(path))
+    parts = [] if filename == _INIT else [os.path.splitext(filename)[0]]
+    while os.path.isfile(os.path.join(directory, _INIT)):
+        directory, package = os.path.split(directory)
+        parts.append(package)
+    return ".".join(reversed(parts))
+
+
+def is_package(path: str) -> bool:
+    return os.path.basename(path) == _INIT
+
+
+def find_imports(
+    tree: ast.AST, module: str, package: bool = False
+) -> Set[str]:
+    """
+    absolute names of the modules or objects imported by a module, at any
+    level of its syntax tree
+
+    :param tree: (ast.AST) syntax tree of the module
+    :param module: (str) name of the module, relative imports are resolved
+                against it
+    :param package: (bool) whether the module is the ``__init__`` of a
+                package
+    """
+    # relative imports are resolved against the package of the module
+    parts = module.split(".") if package else module.split(".")[:-1]
+
+    names: Set[str] = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            base = node.module or ""
+            if node.level:
+                if node.level - 1 > len(parts):
+                    continue
+                prefix = parts[: len(parts) - (node.level - 1)]
+                base = ".".join(prefix + ([base] if base else []))
+            if not base:
+                continue
+            names.add(base)
+            # ``from pkg import mod`` may import a module as well
+            names.update(
+                f"{base}.{alias.name}"
+                for alias in node.names
+                if alias.name != "*"
+            )
+    return names
+
+
+class ImportGraph:
+    """
+    graph of the imports between the modules of a project, the imports of
+    modules outside of the graph, e.g. of the standard library, are dropped
+    """
+
+    def __init__(self):
+        # path of every module, by name
+        self.modules: Dict[str, str] = {}
+        # names imported by every module, whether part of the graph or not
+        self.imports: Dict[str, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.modules)
+
+    def __contains__(self, module: str) -> bool:
+        return module in self.modules
+
+    @classmethod
+    def build(
+        cls, paths: Iterable[str], sources: Optional[SourceStore] = None
+    ) -> "ImportGraph":
+        """
+        scan the imports of the modules at ``paths``, the modules which can
+        not be parsed have no imports
+        """
+        owns_sources = sources is None
+        if owns_sources:
+            sources = SourceStore()
+
+        graph = cls()
+        try:
+            for path in paths:
+                name = module_name(path)
+                tree = sources.tree(path)
+                graph.add(
+                    name,
+                    path,
+                    set()
+                    if tree is None
+                    else find_imports(tree, name, is_package(path)),
+                )
+        finally:
+            if owns_sources:
+                sources.close()
+        return graph
+
+    def add(self, module: str, path: str, imports: Set[str]) -> bool:
+        """
+        add a module, unless a module of the same name was already added
+
+        :returns: (bool) whether the module was added
+        """
+        if module in self.modules:
+            return False
+        self.modules[module] = path
+        self.imports[module] = set(imports)
+        return True
+
+    def remove(self, module: str):
+        self.modules.pop(module, None)
+        self.imports.pop(module, None)
+
+    def importers(self) -> Dict[str, Set[str]]:
+        """
+        modules importing every name, the names of modules which are not part
+        of the graph anymore included
+        """
+        found: Dict[str, Set[str]] = defaultdict(set)
+        for module, names in self.imports.items():
+            for name in names:
+                parts = name.split(".")
+                for end in range(1, len(parts) + 1):
+                    found[".".join(parts[:end])].add(module)
+        return found
+
+    def affected(self, modules: Iterable[str]) -> Set[str]:
+        """
+        the modules along with the modules importing them, directly or not,
+        i.e. the modules whose analysis may change when ``modules`` change
+        """
+        importers = self.importers()
+        found = set(modules)
+        pending = list(found)
+        while pending:
+            for importer in importers.get(pending.pop(), ()):
+                if importer not in found:
+                    found.add(importer)
+                    pending.append(importer)
+        return found
+
+    def imported(self, modules: Iterable[str]) -> Set[str]:
+        """
+        the modules along with the modules they import, directly or not,
+        i.e. the modules whose analysis ``modules`` depend on
+        """
+        found = set(modules)
+        pending = list(found)
+        while pending:
+            for dependency in self.dependencies(pending.pop()):
+                if dependency not in found:
+                    found.add(dependency)
+                    pending.append(dependency)
+        return found
+
+    def dependencies(self, module: str) -> Set[str]:
+        """
+        modules of the graph imported by ``module``, along with their parent
+        packages, which are imported first
+        """
+        found = set()
+        for name in self.imports.get(module, ()):
+            parts = name.split(".")
+            for end in range(1, len(parts) + 1):
+                parent = ".".join(parts[:end])
+                if parent in self.modules and parent != module:
+                    found.add(parent)
+        return found
+
+    def components(self) -> List[List[str]]:
+        """
+        strongly connected components of the graph, i.e. the modules which
+        import each other, ordered so that every module comes after the
+        modules it imports outside of its own component
+        """
+        # iterative version of tarjan's algorithm, which yields every
+        # component after the components reachable from it
+        index: Dict[str, int] = {}
+        lowlink: Dict[str, int] = {}
+        stack: List[str] = []
+        on_stack: Set[str] = set()
+        components: List[List[str]] = []
+        # modules being visited, along with their dependencies left to visit
+        path: List[str] = []
+        work: List[Iterator[str]] = []
+
+        def visit(module: str):
+            index[module] = lowlink[module] = len(index)
+            stack.append(module)
+            on_stack.add(module)
+            path.append(module)
+            work.append(iter(sorted(self.dependencies(module))))
+
+        for root in sorted(self.modules):
+            if root in index:
+                continue
+            visit(root)
+            while work:
+                module = path[-1]
+                for dependency in work[-1]:
+                    if dependency not in index:
+                        visit(dependency)
+                        break
+                    if dependency in on_stack:
+                        lowlink[module] = min(
+                            lowlink[module], index[dependency]
+                        )
+                else:
+                    work.pop()
+                    path.pop()
+                    if path:
+                        lowlink[path[-1]] = min(
+                            lowlink[path[-1]], lowlink[module]
+                        )
+                    if lowlink[module] == index[module]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component.append(member)
+                            if member == module:
+                                break
+                        components.append(sorted(component))
+        return components
+
+    def order(self) -> List[str]:
+        """
+        modules of the graph, every module after the modules it imports
+        unless they import each other
+        """
+        return [
+            module for component in self.components() for module in component
+        ]
+
+
+class ImportIndex(ImportGraph):
+    """
+    import graph kept on disk, updated by scanning the modules whose
+    contents changed since it was saved
+    """
+
+    def __init__(self, path: str, rootdir: Optional[str] = None):
+        """
+        :param path: (str) file the index is kept in
+        :param rootdir: (str) root the paths of the modules are stored
+                    relative to, the current directory when None
+        """
+        super().__init__()
+        self.path = path
+        self.rootdir = os.path.abspath(rootdir or os.getcwd())
+        # blob id of the contents every module was scanned from
+        self.blob_ids: Dict[str, str] = {}
+        self._dirty = False
+
+    @classmethod
+    def load(cls, path: str, rootdir: Optional[str] = None) -> "ImportIndex":
+        """
+        read the index at ``path``, an empty index when there is none
+        """
+        index = cls(path, rootdir=rootdir)
+        try:
+            with open(path, encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return index
+        if data.get("version") != INDEX_VERSION:
+            return index
+
+        for module, entry in data.get("modules", {}).items():
+            index.add(
+                module,
+                os.path.relpath(os.path.join(index.rootdir, entry["path"])),
+                set(entry["imports"]),
+            )
+            index.blob_ids[module] = entry["blob"]
+        return index
+
+    def save(self):
+        """
+        write the index, if any module changed
+        """
+        if not self._dirty:
+            return
+        modules = {
+            module: {
+                "path": os.path.relpath(os.path.abspath(path), self.rootdir),
+                "blob": self.blob_ids.get(module, ""),
+                "imports": sorted(self.imports[module]),
+            }
+            for module, path in self.modules.items()
+        }
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        # written aside and renamed, so an interrupted run never leaves a
+        # truncated index behind
+        temporary = f"{self.path}.{os.getpid()}"
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump({"version": INDEX_VERSION, "modules": modules}, file)
+        os.replace(temporary, self.path)
+        self._dirty = False
+
+    def remove(self, module: str):
+        super().remove(module)
+        self.blob_ids.pop(module, None)
+        self._dirty = True
+
+    def update(
+        self, paths: Iterable[str], sources: Optional[SourceStore] = None
+    ) -> Set[str]:
+        """
+        scan the modules at ``paths`` whose contents changed, and drop the
+        modules whose files were removed
+
+        :returns: (Set[str]) names of the new, changed and removed modules
+        """
+        owns_sources = sources is None
+        if owns_sources:
+            sources = SourceStore()
+
+        changed: Set[str] = set()
+        seen: Set[str] = set()
+        try:
+            for path in paths:
+                name = module_name(path)
+                # files named like a module already seen are left out, the
+                # same way ``add`` keeps the first module of a name
+                if name in seen:
+                    continue
+                seen.add(name)
+
+                blob_id = sources.blob_id(path)
+                known = self.modules.get(name)
+                self.modules[name] = path
+                if (
+                    known is not None
+                    and os.path.abspath(known) == os.path.abspath(path)
+                    and self.blob_ids.get(name) == blob_id
+                ):
+                    continue
+
+                tree = sources.tree(path)
+                self.imports[name] = (
+                    set()
+                    if tree is None
+                    else find_imports(tree, name, is_package(path))
+                )
+                self.blob_ids[name] = blob_id
+                changed.add(name)
+                self._dirty = True
+        finally:
+            if owns_sources:
+                sources.close()
+
+        for name, path in list(self.modules.items()):
+            if name not in seen and not os.path.exists(path):
+                self.remove(name)
+                changed.add(name)
+        return changed
+
+    def add_dependencies(
+        self, sources: Optional[SourceStore] = None
+    ) -> Set[str]:
+        """
+        scan the modules imported by the modules of the index which are not
+        part of it yet, e.g. the unchanged modules a changed module imports,
+        looked up in the directories the modules of the index are rooted in
+
+        :returns: (Set[str]) names of the added modules
+        """
+        added: Set[str] = set()
+        tried: Set[str] = set()
+        while True:
+            roots = {
+                self._root(module, path)
+                for module, path in self.modules.items()
+            }
+            paths = []
+            for names in list(self.imports.values()):
+                for name in names:
+                    parts = name.split(".")
+                    for end in range(1, len(parts) + 1):
+                        parent = ".".join(parts[:end])
+                        if parent in self.modules or parent in tried:
+                            continue
+                        tried.add(parent)
+                        path = self._find(parent, roots)
+                        if path is not None:
+                            paths.append(path)
+            if not paths:
+                return added
+            self.update(paths, sources=sources)
+            added.update(module_name(path) for path in paths)
+
+    @staticmethod
+    def _root(module: str, path: str) -> str:
+        """
+        directory the top level package of ``module`` lives in
+        """
+        root = os.path.dirname(os.path.abspath(path))
+        for _ in range(module.count(".") + is_package(path)):
+            root = os.path.dirname(root)
+        return root
+
+    @staticmethod
+    def _find(module: str, roots: Iterable[str]) -> Optional[str]:
+        """
+        path of the module named ``module`` in one of ``roots``, if any
+        """
+        parts = module.split(".")
+        for root in sorted(roots):
+            for path in (
+                os.path.join(root, *parts[:-1], f"{parts[-1]}.py"),
+                os.path.join(root, *parts, _INIT),
+            ):
+                if os.path.isfile(path) and module_name(path) == module:
+                    return os.path.relpath(path)
+        return None
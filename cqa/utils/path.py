@@ -1,63 +1,252 @@
-import functools
+"""
+discovery of the files to be analysed
+
+the given paths are walked once per run with ``os.scandir``. excluded
+directories are pruned before they are descended into, and the patterns
+of the ``.gitignore`` files and of the configured excludes are compiled
+once. the outcome is a single sorted, immutable tuple of paths shared by
+all the tool groups.
+"""
+
+import logging
 import os
+import re
 from glob import glob, has_magic
-from typing import Callable, Generator, List, Tuple
+from typing import Iterable, List, Optional, Pattern, Sequence, Tuple
+
+LOGGER = logging.getLogger(__name__)
+
+# directories which are never descended into
+EXCLUDED_DIRS = frozenset(
+    [
+        ".cqa_cache",
+        ".eggs",
+        ".git",
+        ".hg",
+        ".mypy_cache",
+        ".nox",
+        ".pytest_cache",
+        ".pytype",
+        ".svn",
+        ".tox",
+        ".venv",
+        "__pycache__",
+        "build",
+        "dist",
+        "node_modules",
+        "tests",
+        "venv",
+    ]
+)
+
+_GITIGNORE = ".gitignore"
 
-_EXCLUDED_DIR = ["tests", "build"]
+# compiled pattern, whether it is a negation, whether it only matches dirs
+_Rule = Tuple[Pattern, bool, bool]
+# directory the rules are relative to, and the rules themselves
+_RuleSet = Tuple[str, List[_Rule]]
+
+
+def _translate(pattern: str) -> str:
+    """
+    translate a gitignore glob into a regular expression
+    """
+    regex, i = "", 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            regex += "(?:.*/)?"
+            i += 3
+        elif pattern.startswith("**", i):
+            regex += ".*"
+            i += 2
+        elif pattern[i] == "*":
+            regex += "[^/]*"
+            i += 1
+        elif pattern[i] == "?":
+            regex += "[^/]"
+            i += 1
+        elif pattern[i] == "[" and "]" in pattern[i + 1 :]:
+            end = pattern.index("]", i + 1)
+            content = pattern[i + 1 : end]
+            if content.startswith("!"):
+                content = "^" + content[1:]
+            regex += f"[{content}]"
+            i = end + 1
+        else:
+            regex += re.escape(pattern[i])
+            i += 1
+    return regex
 
 
-def _walk_file_or_dir(
-    root: str,
-) -> Generator[Tuple[str, List[str], List[str]], None, None]:
+def compile_pattern(pattern: str) -> Optional[_Rule]:
     """
-    walk the the root path recursively if its a directory
-    otherwise yield the parent directory, directories, and filename
+    compile a single line of a ``.gitignore`` file
 
-    :param root: (str) path to walk
-    :returns: generator to the os.walk object
+    :param pattern: (str) the gitignore pattern
+    :returns: the compiled rule, None for blank lines and comments
     """
+    pattern = pattern.rstrip()
+    if not pattern or pattern.startswith("#"):
+        return None
+
+    negate = pattern.startswith("!")
+    if negate:
+        pattern = pattern[1:]
+    if pattern.startswith("\\"):
+        pattern = pattern[1:]
+
+    dir_only = pattern.endswith("/")
+    pattern = pattern.rstrip("/")
+
+    # patterns with a slash are relative to the directory of the
+    # ``.gitignore``, others match at any depth
+    anchored = "/" in pattern
+    regex = _translate(pattern.lstrip("/"))
+    if not anchored:
+        regex = "(?:.*/)?" + regex
+
+    return re.compile(f"^{regex}$"), negate, dir_only
+
+
+def _read_rules(path: str) -> List[_Rule]:
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            lines = file.readlines()
+    except (OSError, UnicodeDecodeError):
+        return []
+
+    return [rule for rule in map(compile_pattern, lines) if rule is not None]
+
 
-    if os.path.isfile(root):
-        dirname, basename = os.path.split(root)
-        yield dirname, [], [basename]
-    else:
-        for path, dirnames, filenames in os.walk(root):
-            yield path, dirnames, filenames
+def _is_ignored(path: str, is_dir: bool, rulesets: Sequence[_RuleSet]) -> bool:
+    # the last matching rule wins, and deeper ``.gitignore`` files
+    # override the outer ones
+    for base, rules in reversed(rulesets):
+        relpath = os.path.relpath(path, base).replace(os.sep, "/")
+        for regex, negate, dir_only in reversed(rules):
+            if dir_only and not is_dir:
+                continue
+            if regex.match(relpath):
+                return not negate
+    return False
 
 
-def _is_cqa_eligible_file(path: str) -> bool:
-    return (
-        os.path.isfile(path)
-        and path.endswith(".py")
-        and not any([(_exclude in path.lower()) for _exclude in _EXCLUDED_DIR])
+def _is_excluded_dir(entry: os.DirEntry) -> bool:
+    return entry.name in EXCLUDED_DIRS or os.path.exists(
+        os.path.join(entry.path, "pyvenv.cfg")  # an unconventional virtualenv
     )
 
 
-@functools.lru_cache()  # Caching because `os.walk` is an expensive process
-def walk_path(
-    root: str, predicate: Callable[[str], bool] = _is_cqa_eligible_file
-) -> List[str]:
+def _parent_rulesets(path: str, rootdir: str) -> List[_RuleSet]:
     """
-    walk the path if its magic path, then match all files matching the pattern
-    otherwise walk the os path
+    rules of the ``.gitignore`` files of ``rootdir`` and of the directories
+    between ``rootdir`` and ``path``
+    """
+    rootdir = os.path.abspath(rootdir)
+    path = os.path.abspath(path)
+    if path == rootdir or os.path.commonpath([rootdir, path]) != rootdir:
+        return []
 
-    :param root: (str) path/pattern to match all the files
-    :returns: list of all the files matching the predicate function
+    rulesets, current = [], rootdir
+    parts = os.path.relpath(path, rootdir).split(os.sep)
+    for part in [""] + parts[:-1]:
+        current = os.path.join(current, part) if part else current
+        rules = _read_rules(os.path.join(current, _GITIGNORE))
+        if rules:
+            rulesets.append((current, rules))
+    return rulesets
+
+
+def _scan(
+    root: str, rulesets: List[_RuleSet], excludes: _RuleSet
+) -> Iterable[str]:
+    stack = [(root, rulesets)]
+    while stack:
+        directory, inherited = stack.pop()
+        rules = _read_rules(os.path.join(directory, _GITIGNORE))
+        if rules:
+            inherited = inherited + [(os.path.abspath(directory), rules)]
+        applicable = inherited + [excludes]
+
+        try:
+            entries = list(os.scandir(directory))
+        except OSError as exc:
+            LOGGER.warning("could not read directory %s: %s", directory, exc)
+            continue
+
+        for entry in entries:
+            abspath = os.path.abspath(entry.path)
+            if entry.is_dir(follow_symlinks=False):
+                if _is_excluded_dir(entry) or _is_ignored(
+                    abspath, True, applicable
+                ):
+                    continue
+                stack.append((entry.path, inherited))
+            elif entry.name.endswith(".py") and entry.is_file():
+                if not _is_ignored(abspath, False, applicable):
+                    yield os.path.normpath(entry.path)
+
+
+def discover_files(
+    paths: Iterable[str],
+    rootdir: Optional[str] = None,
+    exclude: Optional[Iterable[str]] = None,
+) -> Tuple[str, ...]:
     """
+    find all the python files to be analysed under the given paths
 
-    allfiles = []
+    files given explicitly are always kept unless they match one of the
+    ``exclude`` patterns or are located in an excluded directory, files
+    found by walking directories also have to pass the ``.gitignore`` rules
 
-    if has_magic(root):
-        onlyfiles = [file for file in glob(root) if predicate(file)]
-    else:
-        path_iter = _walk_file_or_dir(root)
-        onlyfiles = [
-            os.path.join(parent, file)
-            for parent, _, files in path_iter
-            for file in files
-            if predicate(os.path.join(parent, file))
-        ]
+    :param paths: (Iterable[str]) files, directories or glob patterns
+    :param rootdir: (str) root directory of the project, the ``exclude``
+                patterns and the outer ``.gitignore`` rules are relative to it
+    :param exclude: (Iterable[str]) gitignore style patterns to exclude
+    :returns: sorted tuple of the unique paths of the python files
+    """
+    rootdir = os.path.abspath(rootdir or os.getcwd())
+    excludes: _RuleSet = (
+        rootdir,
+        [
+            rule
+            for rule in map(compile_pattern, exclude or [])
+            if rule is not None
+        ],
+    )
+
+    found = set()
+    for root in paths:
+        roots = glob(root) if has_magic(root) else [root]
+        if not roots:
+            LOGGER.warning("path %s does not exist", root)
+
+        for path in roots:
+            if os.path.isfile(path):
+                parts = os.path.normpath(path).split(os.sep)[:-1]
+                if (
+                    path.endswith(".py")
+                    and not EXCLUDED_DIRS.intersection(parts)
+                    and not _is_ignored(
+                        os.path.abspath(path), False, [excludes]
+                    )
+                ):
+                    found.add(os.path.normpath(path))
+            elif os.path.isdir(path):
+                found.update(
+                    _scan(path, _parent_rulesets(path, rootdir), excludes)
+                )
+            else:
+                LOGGER.warning("path %s does not exist", path)
+
+    return tuple(sorted(found))
 
-    allfiles.extend(onlyfiles)
 
-    return allfiles
+def walk_path(root: str) -> List[str]:
+    """
+    walk a single path, see ``discover_files``
+
+    :param root: (str) path/pattern to match all the files
+    :returns: list of all the python files under the path
+    """
+    return list(discover_files([root]))
@@ -0,0 +1,40 @@
+import os
+from typing import List, Optional
+
+
+def resolve_jobs(jobs: Optional[int], default: int = 1) -> int:
+    """
+    resolve the number of worker processes to use
+
+    :param jobs: (int) requested number of workers, zero or a negative
+                number means one worker per available core
+    :param default: (int) number of workers to use if none were requested
+    :returns: number of worker processes, at least one
+    """
+    if jobs is None:
+        jobs = default
+
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+
+    return jobs
+
+
+def shard(paths: List[str], jobs: int, per_job: int = 4) -> List[List[str]]:
+    """
+    split the paths in contiguous shards to be handed to worker processes
+
+    more shards than workers keep the workers busy when some files take
+    longer to analyse, and contiguous shards processed in order keep the
+    results in the order of the paths whatever the number of workers
+
+    :param paths: (List[str]) paths to split
+    :param jobs: (int) number of worker processes
+    :param per_job: (int) number of shards per worker
+    :returns: non empty shards of the paths
+    """
+    if not paths:
+        return []
+
+    size = -(-len(paths) // (jobs * per_job))
+    return [paths[i : i + size] for i in range(0, len(paths), size)]
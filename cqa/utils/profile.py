@@ -0,0 +1,199 @@
+"""
+profiling of the runs of cqa
+
+spans record the wall time, the cpu time of the thread and the change of
+the resident memory of the process over a step of the run, e.g. a runner
+or a single file analysed by a runner. the spans are written in the chrome
+trace event format, which can be opened in ``chrome://tracing`` or
+https://ui.perfetto.dev
+"""
+
+import contextlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    TypeVar,
+)
+
+T = TypeVar("T")
+
+# category of the spans of the files analysed by a runner
+FILE_CATEGORY = "file"
+RUNNER_CATEGORY = "runner"
+
+
+def current_rss() -> int:
+    """
+    resident memory of the process in bytes, 0 when it is not known
+    """
+    try:
+        with open("/proc/self/statm") as file:
+            pages = int(file.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+class FileCost(NamedTuple):
+    path: str
+    # total wall time spent on the file by all the runners, in seconds
+    seconds: float
+    # wall time spent on the file by each runner, in seconds
+    runners: Dict[str, float]
+
+
+class Profiler:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        self._events: List[Dict[str, Any]] = []
+
+    @contextlib.contextmanager
+    def span(self, name: str, category: str, **args) -> Iterator[Dict]:
+        """
+        record a span around the body of the ``with`` statement
+
+        :param name: (str) name of the span, e.g. a runner or a file
+        :param category: (str) category of the span
+        :param args: extra arguments attached to the span, more can be added
+                    to the yielded dictionary
+        """
+        start = time.perf_counter()
+        cpu = time.thread_time()
+        rss = current_rss()
+        try:
+            yield args
+        finally:
+            self.record(
+                name,
+                category,
+                start=start,
+                end=time.perf_counter(),
+                cpu=time.thread_time() - cpu,
+                rss_delta=current_rss() - rss,
+                **args,
+            )
+
+    def record(
+        self,
+        name: str,
+        category: str,
+        start: float,
+        end: float,
+        cpu: float,
+        rss_delta: int,
+        pid: Optional[int] = None,
+        tid: Optional[int] = None,
+        **args,
+    ):
+        """
+        record a span measured elsewhere, e.g. in a worker process
+
+        :param start: (float) ``time.perf_counter`` at the start of the span
+        :param end: (float) ``time.perf_counter`` at the end of the span
+        :param cpu: (float) cpu time of the span, in seconds
+        :param rss_delta: (int) change of the resident memory, in bytes
+        :param pid: (int) process of the span, the current one when None
+        :param tid: (int) thread of the span, the current one when None
+        """
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": (start - self._origin) * 1e6,
+            "dur": (end - start) * 1e6,
+            "pid": os.getpid() if pid is None else pid,
+            "tid": threading.get_ident() if tid is None else tid,
+            "args": {
+                **args,
+                "cpu_ms": cpu * 1e3,
+                "rss_delta_kb": rss_delta // 1024,
+            },
+        }
+        with self._lock:
+            self._events.append(event)
+
+    def iterate(
+        self, items: Iterable[T], name: str, category: str, **args
+    ) -> Iterator[T]:
+        """
+        record a span over the whole iteration of ``items``
+        """
+        with self.span(name, category, **args) as extra:
+            count = 0
+            for item in items:
+                count += 1
+                yield item
+            extra["items"] = count
+
+    def slowest(self, top: int = 10) -> List[FileCost]:
+        """
+        the files which took the longest to analyse, over all the runners
+        """
+        by_path: Dict[str, Dict[str, float]] = defaultdict(
+            lambda: defaultdict(float)
+        )
+        with self._lock:
+            for event in self._events:
+                if event["cat"] == FILE_CATEGORY:
+                    runner = event["args"].get("runner", "")
+                    by_path[event["name"]][runner] += event["dur"] / 1e6
+
+        costs = [
+            FileCost(path, sum(runners.values()), dict(runners))
+            for path, runners in by_path.items()
+        ]
+        costs.sort(key=lambda cost: (-cost.seconds, cost.path))
+        return costs[:top]
+
+    def trace(self) -> Dict[str, Any]:
+        """
+        the spans recorded so far, in the chrome trace event format
+        """
+        with self._lock:
+            events = sorted(self._events, key=lambda event: event["ts"])
+
+        # threads are named after the runners which ran in them
+        names: Dict[Any, List[str]] = defaultdict(list)
+        for event in events:
+            if event["cat"] == RUNNER_CATEGORY:
+                key = (event["pid"], event["tid"])
+                if event["name"] not in names[key]:
+                    names[key].append(event["name"])
+
+        metadata = [
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": pid,
+                "tid": tid,
+                "args": {"name": ", ".join(runners)},
+            }
+            for (pid, tid), runners in names.items()
+        ]
+        metadata.extend(
+            {
+                "name": "process_name",
+                "ph": "M",
+                "pid": pid,
+                "args": {
+                    "name": "cqa" if pid == os.getpid() else f"worker {pid}"
+                },
+            }
+            for pid in sorted({event["pid"] for event in events})
+        )
+        return {"traceEvents": metadata + events, "displayTimeUnit": "ms"}
+
+    def write(self, path: str):
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.trace(), file)
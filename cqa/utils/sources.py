@@ -0,0 +1,169 @@
+"""
+per run store of the contents of the analysed files
+
+every file is read at most once per run, whichever runner, cache lookup or
+reporter asks for it first, and its decoded text, lines and syntax tree are
+only computed once as well. large files are memory mapped rather than copied
+in memory.
+"""
+
+import ast
+import hashlib
+import io
+import mmap
+import os
+import threading
+import tokenize
+from typing import Dict, List, Optional, Union
+
+Buffer = Union[bytes, mmap.mmap]
+
+# files of at least this many bytes are memory mapped
+DEFAULT_MMAP_THRESHOLD = 1024 * 1024
+
+_HEADER_SIZE = 4096
+
+# tree cached for the files which could not be parsed
+_INVALID = object()
+
+
+class SourceStore:
+    def __init__(self, mmap_threshold: int = DEFAULT_MMAP_THRESHOLD):
+        """
+        :param mmap_threshold: (int) size in bytes from which files are
+                    memory mapped
+        """
+        self.mmap_threshold = mmap_threshold
+        self.reads = 0
+
+        self._lock = threading.Lock()
+        self._data: Dict[str, Buffer] = {}
+        self._text: Dict[str, str] = {}
+        self._lines: Dict[str, List[str]] = {}
+        self._trees: Dict[str, object] = {}
+        self._blob_ids: Dict[str, str] = {}
+
+    @staticmethod
+    def _key(path: str) -> str:
+        return os.path.abspath(path)
+
+    def _read(self, path: str) -> Buffer:
+        with open(path, "rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            if size >= self.mmap_threshold:
+                return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            return file.read()
+
+    def data(self, path: str) -> Buffer:
+        """
+        raw contents of a file, memory mapped for large files
+        """
+        key = self._key(path)
+        data = self._data.get(key)
+        if data is None:
+            # files are read outside of the lock, a file requested by two
+            # threads at once may be read twice but is stored once
+            data = self._read(path)
+            with self._lock:
+                self.reads += 1
+                data = self._data.setdefault(key, data)
+        return data
+
+    def text(self, path: str) -> str:
+        """
+        contents of a file, decoded with the encoding it declares
+
+        :raises SyntaxError: when the declared encoding is unknown
+        :raises UnicodeDecodeError: when the file is not valid in its
+                    encoding
+        """
+        key = self._key(path)
+        text = self._text.get(key)
+        if text is None:
+            data = self.data(path)
+            # the encoding is declared on one of the first two lines
+            encoding, _ = tokenize.detect_encoding(
+                io.BytesIO(data[:_HEADER_SIZE]).readline
+            )
+            if isinstance(data, mmap.mmap):
+                data = data[:]
+            text = self._text.setdefault(key, data.decode(encoding))
+        return text
+
+    def lines(self, path: str) -> List[str]:
+        """
+        lines of the text of a file, without their line endings
+
+        :raises SyntaxError: when the declared encoding is unknown
+        :raises UnicodeDecodeError: when the file is not valid in its
+                    encoding
+        """
+        key = self._key(path)
+        lines = self._lines.get(key)
+        if lines is None:
+            lines = self._lines.setdefault(key, self.text(path).splitlines())
+        return lines
+
+    def tree(self, path: str) -> Optional[ast.AST]:
+        """
+        syntax tree of a file, None if the file is not valid python
+        """
+        key = self._key(path)
+        tree = self._trees.get(key)
+        if tree is None:
+            try:
+                tree = ast.parse(self.text(path), filename=path)
+            except (SyntaxError, ValueError, UnicodeDecodeError):
+                tree = _INVALID
+            tree = self._trees.setdefault(key, tree)
+        return None if tree is _INVALID else tree
+
+    def blob_id(self, path: str) -> str:
+        """
+        git blob id of the contents of a file
+        """
+        key = self._key(path)
+        blob_id = self._blob_ids.get(key)
+        if blob_id is None:
+            data = self.data(path)
+            digest = hashlib.sha1(f"blob {len(data)}\0".encode())  # nosec
+            digest.update(data)
+            blob_id = self._blob_ids.setdefault(key, digest.hexdigest())
+        return blob_id
+
+    def update(self, path: str, data: Optional[bytes] = None):
+        """
+        forget the contents of a file which was modified, e.g. by a
+        formatter, and optionally store its new contents
+        """
+        key = self._key(path)
+        with self._lock:
+            # a memory map of the previous contents may still be in use by
+            # another thread, it is closed once it is not referenced anymore
+            self._data.pop(key, None)
+            self._text.pop(key, None)
+            self._lines.pop(key, None)
+            self._trees.pop(key, None)
+            self._blob_ids.pop(key, None)
+            if data is not None:
+                self._data[key] = data
+
+    def close(self):
+        """
+        release the memory mapped files and all the cached contents
+        """
+        with self._lock:
+            for data in self._data.values():
+                if isinstance(data, mmap.mmap):
+                    data.close()
+            self._data.clear()
+            self._text.clear()
+            self._lines.clear()
+            self._trees.clear()
+            self._blob_ids.clear()
+
+    def __enter__(self) -> "SourceStore":
+        return self
+
+    def __exit__(self, *_):
+        self.close()
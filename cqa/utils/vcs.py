@@ -0,0 +1,139 @@
+import os
+import re
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from cqa.types import ReporterError
+
+from .cmd import get_lines, get_output
+
+_HUNK_HEADER = re.compile(r"^@@ -\d+(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+def _diff_cmd(ref: Optional[str] = None, staged: bool = False) -> List[str]:
+    diff_cmd = [
+        "git",
+        "diff",
+        "--relative",
+        "--no-prefix",
+        "--no-color",
+        "--diff-filter=ACMRTUXB",
+    ]
+    if staged:
+        diff_cmd.append("--cached")
+    if ref:
+        diff_cmd.append(ref)
+    return diff_cmd
+
+
+def get_changed_files(
+    ref: Optional[str] = None, staged: bool = False
+) -> List[str]:
+    """
+    list the python files that were added or modified
+
+    :param ref: (str) git revision to compare the working tree against
+    :param staged: (bool) if True, only consider the changes staged for commit
+    :returns: paths of the changed files, relative to the current directory
+    """
+    files = get_lines(_diff_cmd(ref, staged) + ["--name-only", "--", "*.py"])
+    return [
+        path for path in files if path.endswith(".py") and os.path.isfile(path)
+    ]
+
+
+def get_changed_lines(
+    ref: Optional[str] = None,
+    staged: bool = False,
+    paths: Optional[List[str]] = None,
+) -> Dict[str, List[Tuple[int, int]]]:
+    """
+    find the line ranges touched in every changed file
+
+    the tools analyse the files as they are in the working tree, so with
+    ``staged`` the lines are those of the working tree which differ from
+    ``HEAD``, and include the changes to the staged files which are not
+    staged yet, see ``get_unstaged_files``
+
+    :param ref: (str) git revision to compare the working tree against
+    :param staged: (bool) if True, only consider the changes staged for commit
+    :param paths: (List[str]) restrict the diff to the given paths
+    :returns: mapping of path to the inclusive ranges of changed line numbers
+    """
+    if staged:
+        ref, staged = "HEAD", False
+    diff_cmd = _diff_cmd(ref, staged) + ["--unified=0", "--"]
+    diff_cmd.extend(paths or ["*.py"])
+    return parse_changed_lines(get_output(diff_cmd))
+
+
+def get_unstaged_files(paths: List[str]) -> List[str]:
+    """
+    the files among ``paths`` whose working tree differs from the index,
+    their staged version is not the one the tools analyse
+
+    :param paths: (List[str]) paths of the staged files
+    :returns: paths of the files with unstaged changes
+    """
+    if not paths:
+        return []
+    return get_lines(_diff_cmd() + ["--name-only", "--"] + list(paths))
+
+
+def parse_changed_lines(diff: str) -> Dict[str, List[Tuple[int, int]]]:
+    """
+    find the line ranges added by a diff without context lines
+
+    :param diff: (str) output of ``git diff --unified=0 --no-prefix``
+    :returns: mapping of path to the inclusive ranges of changed line numbers
+    """
+    hunks: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+    current = None
+    pending = 0  # content lines left in the current hunk
+    for line in diff.splitlines():
+        # "\ No newline at end of file" follows a content line
+        if line.startswith("\\"):
+            continue
+
+        if pending:
+            pending -= 1
+            continue
+
+        if line.startswith("+++ "):
+            current = line[4:] if line[4:] != "/dev/null" else None
+            continue
+
+        match = _HUNK_HEADER.match(line)
+        if current is None or match is None:
+            continue
+
+        removed = int(match.group(1) or 1)
+        start, added = int(match.group(2)), int(match.group(3) or 1)
+        pending = removed + added
+        if added:  # pure deletions do not add any line to the new file
+            hunks[current].append((start, start + added - 1))
+
+    return dict(hunks)
+
+
+class ChangedLines:
+    """
+    predicate over diagnostics, accepting only those reported on changed lines
+    """
+
+    def __init__(self, hunks: Dict[str, List[Tuple[int, int]]], rootdir: str):
+        self._rootdir = rootdir
+        self._hunks = {
+            self._normalize(path): ranges for path, ranges in hunks.items()
+        }
+
+    def _normalize(self, path: str) -> str:
+        return os.path.normpath(os.path.join(self._rootdir, path))
+
+    def __call__(self, error: ReporterError) -> bool:
+        # diagnostics which are not bound to a line are always kept
+        if error.lnum <= 0:
+            return True
+
+        ranges = self._hunks.get(self._normalize(error.path), [])
+        return any(start <= error.lnum <= end for start, end in ranges)
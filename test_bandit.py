@@ -0,0 +1,57 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from parameterized import parameterized
+
+from cqa.securitytools.bandit import BanditRunner
+
+INSECURE = """import pickle
+import subprocess
+
+
+def load(data):
+    subprocess.call(data, shell=True)
+    return pickle.loads(data)
+"""
+
+
+def _findings(errors):
+    return sorted(
+        (os.path.basename(error.path), error.lnum, error.code)
+        for error in errors
+    )
+
+
+class BanditRunnerTests(TestCase):
+    def setUp(self):
+        self._tempdir = tempfile.TemporaryDirectory()
+        self._rootdir = self._tempdir.name
+        self._paths = []
+        for index in range(6):
+            path = os.path.join(self._rootdir, f"module_{index}.py")
+            with open(path, "w") as file:
+                file.write(INSECURE if index % 2 else f"x = {index}\n")
+            self._paths.append(path)
+        super().setUp()
+
+    def tearDown(self) -> None:
+        self._tempdir.cleanup()
+
+    @parameterized.expand([(2,), (4,)])
+    def test_process_pool_finds_the_same_issues(self, jobs):
+        expected = BanditRunner(jobs=1).run(self._paths, self._rootdir)
+
+        errors = BanditRunner(jobs=jobs).run(self._paths, self._rootdir)
+
+        self.assertTrue(expected)
+        self.assertEqual(_findings(expected), _findings(errors))
+
+    def test_runs_do_not_share_state(self):
+        runner = BanditRunner()
+        first = runner.run(self._paths[1:2], self._rootdir)
+
+        self.assertEqual([], runner.run(self._paths[:1], self._rootdir))
+        self.assertEqual(
+            _findings(first), _findings(runner.run(self._paths[1:2], "."))
+        )
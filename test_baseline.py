@@ -0,0 +1,145 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from parameterized import parameterized
+
+from cqa.types import PackageVulnerability, ReporterError, Severity
+from cqa.utils import Baseline, SourceStore
+
+
+class BaselineTests(TestCase):
+    def setUp(self):
+        self._tempdir = tempfile.TemporaryDirectory()
+        self._rootdir = self._tempdir.name
+        self._path = os.path.join(self._rootdir, "module.py")
+        self._write("import os\nvalue = 1\n")
+        self._sources = SourceStore()
+
+    def tearDown(self):
+        self._sources.close()
+        self._tempdir.cleanup()
+
+    def _write(self, text: str):
+        with open(self._path, "w") as file:
+            file.write(text)
+
+    def _error(self, lnum: int, message: str = "'os' imported but unused"):
+        return ReporterError(
+            path=self._path,
+            message=message,
+            lnum=lnum,
+            severity=Severity.WARNING,
+            tool="pyflakes",
+            code="W0611",
+        )
+
+    def _baseline(self, *items) -> Baseline:
+        baseline = Baseline(rootdir=self._rootdir)
+        for item in items:
+            baseline.add(item, sources=self._sources)
+        return baseline
+
+    def _filter(self, baseline: Baseline, *items):
+        return [
+            item
+            for _, item in baseline.filter(
+                [("linter", item) for item in items], sources=self._sources
+            )
+        ]
+
+    def test_fingerprint_survives_moved_lines(self):
+        baseline = self._baseline(self._error(1))
+
+        self._write("'''docstring'''\n\nimport  os\nvalue = 1\n")
+        sources = SourceStore()
+        self.assertEqual(
+            baseline.fingerprint(self._error(1), self._sources),
+            baseline.fingerprint(self._error(3), sources),
+        )
+        sources.close()
+
+    @parameterized.expand(
+        [
+            ("line", 2, "'os' imported but unused"),
+            ("message", 1, "'sys' imported but unused"),
+        ]
+    )
+    def test_fingerprint_depends_on_the(self, _, lnum, message):
+        baseline = Baseline(rootdir=self._rootdir)
+
+        self.assertNotEqual(
+            baseline.fingerprint(self._error(1), self._sources),
+            baseline.fingerprint(self._error(lnum, message), self._sources),
+        )
+
+    def test_fingerprint_is_relative_to_the_root(self):
+        error = self._error(1)
+        relative = ReporterError(
+            path="./module.py",
+            message=error.message,
+            lnum=1,
+            tool=error.tool,
+            code=error.code,
+        )
+        cwd = os.getcwd()
+        os.chdir(self._rootdir)
+        try:
+            fingerprint = Baseline(rootdir=self._rootdir).fingerprint(relative)
+        finally:
+            os.chdir(cwd)
+
+        self.assertEqual(
+            Baseline(rootdir=self._rootdir).fingerprint(error), fingerprint
+        )
+
+    def test_fingerprint_of_undecodable_files(self):
+        with open(self._path, "wb") as file:
+            file.write(b"# -*- coding: nope -*-\nimport os\n")
+
+        self.assertEqual(
+            Baseline(rootdir=self._rootdir).fingerprint(self._error(1)),
+            Baseline(rootdir=self._rootdir).fingerprint(
+                self._error(1), self._sources
+            ),
+        )
+
+    def test_filter_only_yields_new_findings(self):
+        vulnerability = PackageVulnerability("1", "django", "2.2.0")
+        baseline = self._baseline(self._error(1), vulnerability)
+        new = self._error(2, "undefined name 'value'")
+
+        self.assertEqual(
+            [new], self._filter(baseline, vulnerability, new, self._error(1))
+        )
+
+    def test_filter_counts_the_occurrences(self):
+        baseline = self._baseline(self._error(1))
+
+        self.assertEqual(
+            1, len(self._filter(baseline, self._error(1), self._error(1)))
+        )
+        # the baseline itself is left untouched
+        self.assertEqual([], self._filter(baseline, self._error(1)))
+
+    def test_save_and_load(self):
+        baseline = self._baseline(self._error(1), self._error(1))
+        baseline.add(self._error(2, "other"), sources=self._sources)
+        path = os.path.join(self._rootdir, "baseline")
+
+        baseline.save(path)
+        loaded = Baseline.load(path, rootdir=self._rootdir)
+
+        self.assertEqual(baseline.counts, loaded.counts)
+        self.assertEqual(3, len(loaded))
+        with open(path) as file:
+            lines = file.read().splitlines()
+        self.assertEqual(lines[1:], sorted(lines[1:]))
+
+    def test_load_rejects_other_files(self):
+        path = os.path.join(self._rootdir, "baseline")
+        with open(path, "w") as file:
+            file.write("[tool.cqa]\n")
+
+        with self.assertRaises(ValueError):
+            Baseline.load(path)
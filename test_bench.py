@@ -0,0 +1,92 @@
+import ast
+import os
+import tempfile
+from unittest import TestCase
+
+from parameterized import parameterized
+
+from cqa.bench import Benchmark, RepoShape, generate_repo
+
+
+def _read_tree(directory):
+    contents = {}
+    for root, _, files in os.walk(directory):
+        for name in files:
+            path = os.path.join(root, name)
+            with open(path) as file:
+                contents[os.path.relpath(path, directory)] = file.read()
+    return contents
+
+
+class GenerateRepoTests(TestCase):
+    def setUp(self):
+        self._tempdir = tempfile.TemporaryDirectory()
+        super().setUp()
+
+    def tearDown(self) -> None:
+        self._tempdir.cleanup()
+
+    def _generate(self, name, shape, seed=0):
+        return generate_repo(
+            os.path.join(self._tempdir.name, name), shape, seed=seed
+        )
+
+    @parameterized.expand([(5, 50), (45, 120)])
+    def test_shape(self, files, loc):
+        repo = self._generate("repo", RepoShape(files=files, loc=loc))
+
+        self.assertEqual(files, len(repo.files))
+        self.assertGreaterEqual(repo.loc, files * loc)
+        self.assertLess(repo.loc, files * (loc + 40))
+        for path in repo.files:
+            with open(os.path.join(repo.directory, path)) as file:
+                ast.parse(file.read())
+
+    def test_generation_is_seeded(self):
+        shape = RepoShape(files=10, defect_rate=0.5)
+
+        first = self._generate("first", shape, seed=1)
+        second = self._generate("second", shape, seed=1)
+        third = self._generate("third", shape, seed=2)
+
+        self.assertEqual(
+            _read_tree(first.directory), _read_tree(second.directory)
+        )
+        self.assertNotEqual(
+            _read_tree(first.directory), _read_tree(third.directory)
+        )
+        self.assertEqual(first.defects, second.defects)
+
+    def test_modules_only_import_previous_modules(self):
+        repo = self._generate("repo", RepoShape(files=30, imports=5))
+
+        for index, path in enumerate(repo.files):
+            with open(os.path.join(repo.directory, path)) as file:
+                tree = ast.parse(file.read())
+            imported = [
+                int(node.module.rpartition("_")[2])
+                for node in tree.body
+                if isinstance(node, ast.ImportFrom)
+            ]
+            self.assertEqual(min(index, 5), len(imported))
+            self.assertTrue(all(other < index for other in imported))
+
+
+class BenchmarkTests(TestCase):
+    def test_report(self):
+        benchmark = Benchmark(
+            shape=RepoShape(files=3, loc=20, defect_rate=1.0),
+            tools=["pylama"],
+            repeat=2,
+        )
+
+        report = benchmark.run()
+
+        self.assertEqual(3, report["repo"]["files"])
+        self.assertEqual(["pylama"], list(report["runners"]))
+        self.assertEqual(["linter"], list(report["groups"]))
+        runner = report["runners"]["pylama"]
+        self.assertEqual(2, len(runner["seconds"]))
+        self.assertGreater(runner["items"], 0)
+        self.assertGreater(runner["peak_rss"], 0)
+        self.assertEqual(runner["items"], report["total"]["items"])
@@ -0,0 +1,184 @@
+import os
+import tempfile
+from typing import List
+from unittest import TestCase
+
+from cqa.base import Runner
+from cqa.cache import ResultCache, StubCache
+from cqa.types import ReporterError, Severity
+
+
+class _CountingRunner(Runner):
+    TOOL = "counting"
+
+    def __init__(self, options=None):
+        self._cfg = options or {}
+        self.calls: List[List[str]] = []
+
+    def run(self, paths, rootdir):
+        self.calls.append(list(paths))
+        return [
+            ReporterError(
+                path=path, message="found", lnum=1, severity=Severity.ERROR
+            )
+            for path in paths
+            if path.endswith("bad.py")
+        ]
+
+
+class ResultCacheTests(TestCase):
+    def setUp(self):
+        self._tempdir = tempfile.TemporaryDirectory()
+        self._rootdir = self._tempdir.name
+        self._files = []
+        for name in ("good.py", "bad.py"):
+            path = os.path.join(self._rootdir, name)
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(f"# {name}\n")
+            self._files.append(path)
+        super().setUp()
+
+    def tearDown(self) -> None:
+        self._tempdir.cleanup()
+        return super().tearDown()
+
+    def _cache(self, **kwargs) -> ResultCache:
+        return ResultCache(os.path.join(self._rootdir, ".cqa_cache"), **kwargs)
+
+    def test_only_misses_are_run(self):
+        runner = _CountingRunner()
+        cache = self._cache()
+        first = cache.run(runner, self._files, self._rootdir)
+        cache.close()
+
+        cache = self._cache()
+        second = cache.run(runner, self._files, self._rootdir)
+        cache.close()
+
+        self.assertEqual(len(runner.calls), 1)
+        self.assertEqual(
+            [err.to_dict() for err in first], [err.to_dict() for err in second]
+        )
+        self.assertEqual(cache.hits, 2)
+
+    def test_changed_content_and_options_miss(self):
+        runner = _CountingRunner()
+        cache = self._cache()
+        cache.run(runner, self._files, self._rootdir)
+
+        with open(self._files[0], "a", encoding="utf-8") as file:
+            file.write("x = 1\n")
+        cache.run(runner, self._files, self._rootdir)
+        self.assertEqual(runner.calls[-1], [self._files[0]])
+
+        cache.run(
+            _CountingRunner({"strict": True}), self._files, self._rootdir
+        )
+        self.assertEqual(cache.misses, 5)
+        cache.close()
+
+    def test_identical_files_keep_their_path(self):
+        paths = []
+        for name in ("a", "b"):
+            os.makedirs(os.path.join(self._rootdir, name))
+            path = os.path.join(self._rootdir, name, "bad.py")
+            with open(path, "w", encoding="utf-8") as file:
+                file.write("import os\n")
+            paths.append(path)
+        runner = _CountingRunner()
+        cache = self._cache()
+
+        cache.run(runner, paths, self._rootdir)
+        cached = cache.run(runner, paths, self._rootdir)
+        cache.close()
+
+        self.assertEqual(1, len(runner.calls))
+        self.assertEqual(paths, [error.path for error in cached])
+
+    def test_clean_only(self):
+        runner = _CountingRunner()
+        cache = self._cache()
+        cache.run(runner, self._files, self._rootdir, clean_only=True)
+        cache.run(runner, self._files, self._rootdir, clean_only=True)
+        cache.close()
+
+        self.assertEqual(runner.calls[-1], [self._files[1]])
+
+    def test_eviction_and_clear(self):
+        cache = self._cache(max_size_mb=0)
+        cache.run(_CountingRunner(), self._files, self._rootdir)
+        cache.close()
+
+        cache = self._cache()
+        self.assertEqual(cache.stats()["entries"], 0)
+        cache.run(_CountingRunner(), self._files, self._rootdir)
+        self.assertEqual(cache.stats()["entries"], 2)
+        cache.clear()
+        self.assertEqual(cache.stats()["entries"], 0)
+        cache.close()
+
+
+class StubCacheTests(TestCase):
+    def setUp(self):
+        self._tempdir = tempfile.TemporaryDirectory()
+        self._directory = os.path.join(self._tempdir.name, "stubs")
+        self._error = ReporterError(
+            path="old/a.py", message="found", lnum=3, tool="pytype"
+        )
+
+    def tearDown(self) -> None:
+        self._tempdir.cleanup()
+
+    def test_stubs_are_reused(self):
+        stubs = StubCache(self._directory, token="1")
+        key = stubs.key("pkg.a", "blob", [])
+        self.assertIsNone(stubs.get("pkg.a", key, "a.py"))
+        stubs.set("pkg.a", key, "x: int\n", [self._error])
+        stubs.set("pkg", stubs.key("pkg", "blob", []), "", [], package=True)
+        stubs.save()
+
+        stubs = StubCache(self._directory, token="1")
+        (error,) = stubs.get("pkg.a", key, "a.py")
+
+        self.assertEqual("a.py", error.path)
+        self.assertEqual(3, error.lnum)
+        self.assertTrue(
+            os.path.isfile(os.path.join(self._directory, "pkg", "a.pyi"))
+        )
+        self.assertTrue(
+            os.path.isfile(
+                os.path.join(self._directory, "pkg", "__init__.pyi")
+            )
+        )
+        self.assertIsNone(
+            StubCache(self._directory, token="2").get("pkg.a", key, "a.py")
+        )
+
+    def test_keys_depend_on_the_stubs_of_the_imports(self):
+        stubs = StubCache(self._directory)
+        stubs.set("b", stubs.key("b", "1", []), "x: int\n", [])
+        key = stubs.key("a", "blob", ["b"])
+
+        # a new source with the same stub keeps the key of the importers
+        stubs.set("b", stubs.key("b", "2", []), "x: int\n", [])
+        self.assertEqual(key, stubs.key("a", "blob", ["b"]))
+
+        stubs.set("b", stubs.key("b", "3", []), "x: str\n", [])
+        self.assertNotEqual(key, stubs.key("a", "blob", ["b"]))
+
+        stubs.discard("b")
+        self.assertEqual("", stubs.digest("b"))
+
+    def test_runners_following_imports_are_not_cached(self):
+        runner = _CountingRunner()
+        runner.follows_imports = True
+        path = os.path.join(self._tempdir.name, "bad.py")
+        with open(path, "w", encoding="utf-8") as file:
+            file.write("# bad\n")
+
+        cache = ResultCache(os.path.join(self._tempdir.name, ".cqa_cache"))
+        for _ in range(2):
+            cache.run(runner, [path], self._tempdir.name)
+        cache.close()
+
+        self.assertEqual([[path], [path]], runner.calls)
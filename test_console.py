@@ -0,0 +1,163 @@
+import io
+import os
+import tempfile
+from unittest import TestCase
+
+from parameterized import parameterized
+from rich.console import Console
+
+from cqa.reporters.console import ConsoleReporter
+from cqa.types import ReporterError, Result, Severity
+from cqa.utils import SourceStore
+
+
+def _error(path: str, lnum: int, message: str = "error") -> ReporterError:
+    return ReporterError(
+        path=path, message=message, lnum=lnum, severity=Severity.ERROR
+    )
+
+
+class ConsoleReporterTests(TestCase):
+    def setUp(self):
+        self._tempdir = tempfile.TemporaryDirectory()
+        self._paths = []
+        for name in ("a.py", "b.py"):
+            path = os.path.join(self._tempdir.name, name)
+            with open(path, "w") as file:
+                file.writelines(f"line_{i} = {i}\n" for i in range(1, 51))
+            self._paths.append(path)
+        self._sources = SourceStore()
+        self._output = io.StringIO()
+
+    def tearDown(self):
+        self._sources.close()
+        self._tempdir.cleanup()
+
+    def _reporter(self, **kwargs) -> ConsoleReporter:
+        return ConsoleReporter(
+            sources=self._sources,
+            console=Console(
+                file=self._output,
+                width=200,
+                theme=ConsoleReporter.custom_theme,
+            ),
+            **kwargs,
+        )
+
+    def test_plain_output_when_not_a_terminal(self):
+        reporter = self._reporter()
+        reporter.report(Result([_error(self._paths[0], 10)]), header="Lint")
+
+        self.assertTrue(reporter.plain)
+        self.assertEqual(
+            [
+                "=== Lint ===",
+                "--- Errors",
+                f"--- {self._paths[0]}",
+                "10:0 error",
+                "     9 | line_9 = 9",
+                ">   10 | line_10 = 10",
+                "    11 | line_11 = 11",
+            ],
+            self._output.getvalue().splitlines()[:7],
+        )
+
+    def test_report_groups_unsorted_items_by_file(self):
+        a, b = self._paths
+        items = [_error(a, 3), _error(b, 1), _error(a, 1), _error(b, 2)]
+
+        self._reporter().report(Result(items), header="Lint")
+
+        rules = [
+            line
+            for line in self._output.getvalue().splitlines()
+            if line.startswith(f"--- {self._tempdir.name}")
+        ]
+        self.assertEqual([f"--- {a}", f"--- {b}"], rules)
+
+    def test_streamed_items_are_grouped_by_file_until_flushed(self):
+        a, b = self._paths
+        reporter = self._reporter()
+        reporter.start()
+        for item in (_error(a, 3), _error(b, 1), _error(a, 1)):
+            reporter.add(item, header="Lint")
+        self.assertEqual("=== Lint ===\n", self._output.getvalue())
+
+        reporter.flush()
+        reporter.add(_error(b, 2), header="Lint")
+        reporter.finish()
+
+        lines = [
+            line
+            for line in self._output.getvalue().splitlines()
+            if line.startswith("---") or line.endswith(" error")
+        ]
+        self.assertEqual(
+            [f"--- {a}", "1:0 error", "3:0 error", f"--- {b}", "1:0 error"]
+            + ["2:0 error"],
+            lines,
+        )
+
+    def test_items_without_a_path_are_flushed(self):
+        reporter = self._reporter()
+        reporter.start()
+        reporter.add(_error("", 0, "config"), header="Lint")
+        reporter.add(_error(self._paths[0], 0, "reformat"), header="Lint")
+        reporter.flush()
+
+        self.assertEqual(
+            ["=== Lint ===", "--- ", "0:0 config"]
+            + [f"--- {self._paths[0]}", "0:0 reformat"],
+            self._output.getvalue().splitlines(),
+        )
+
+    def test_file_level_items_have_no_snippet(self):
+        reporter = self._reporter()
+        reporter.start()
+        reporter.add(_error(self._paths[0], 0, "reformat"), header="Format")
+        reporter.flush()
+
+        self.assertEqual(
+            ["=== Format ===", f"--- {self._paths[0]}", "0:0 reformat"],
+            self._output.getvalue().splitlines(),
+        )
+
+    @parameterized.expand([(2, 2), (None, 5)])
+    def test_snippets_per_file_are_capped(self, max_snippets, expected):
+        reporter = self._reporter(max_snippets=max_snippets)
+        reporter.start()
+        for lnum in range(1, 50, 10):
+            reporter.add(_error(self._paths[0], lnum), header="Lint")
+        reporter.flush()
+
+        output = self._output.getvalue()
+        self.assertEqual(5, output.count(" error\n"))
+        self.assertEqual(expected, output.count("\n>"))
+
+    def test_files_are_read_once(self):
+        reporter = self._reporter(plain=False)
+        reporter.start()
+        for lnum in range(1, 50, 5):
+            reporter.add(_error(self._paths[0], lnum), header="Lint")
+        reporter.finish()
+
+        self.assertEqual(1, self._sources.reads)
+        self.assertIn("line_41 = 41", self._output.getvalue())
+
+    @parameterized.expand(
+        [
+            ("unknown encoding", b"# -*- coding: nope -*-\nx = 1\n"),
+            ("invalid utf-8", b"x = '\xe9'\n"),
+        ]
+    )
+    def test_undecodable_files_are_reported_without_source(self, _, data):
+        with open(self._paths[0], "wb") as file:
+            file.write(data)
+
+        for plain in (True, False):
+            reporter = self._reporter(plain=plain)
+            reporter.start()
+            reporter.add(_error(self._paths[0], 1, "bad"), header="Lint")
+            reporter.finish()
+
+        self.assertEqual(2, self._output.getvalue().count("1:0 bad"))
@@ -0,0 +1,156 @@
+import os
+import stat
+import sys
+import tempfile
+import threading
+from unittest import TestCase, mock
+
+from parameterized import parameterized
+
+from cqa.cli.args import get_args
+from cqa.daemon import client, protocol
+from cqa.daemon.server import DaemonServer
+
+
+def _args(*argv):
+    with mock.patch.object(sys, "argv", ["cqa", *argv]):
+        return get_args()
+
+
+class SocketPathTests(TestCase):
+    def setUp(self):
+        self._tempdir = tempfile.TemporaryDirectory()
+        self._runtime_dir = self._tempdir.name
+
+    def tearDown(self):
+        self._tempdir.cleanup()
+
+    def test_socket_is_in_a_private_directory(self):
+        with mock.patch.dict(
+            os.environ, {"XDG_RUNTIME_DIR": self._runtime_dir}
+        ):
+            path = protocol.get_socket_path("/project")
+            self.assertEqual(path, protocol.get_socket_path("/project/"))
+
+        directory = os.path.dirname(path)
+        self.assertEqual(os.path.join(self._runtime_dir, "cqa"), directory)
+        self.assertEqual(0o700, stat.S_IMODE(os.stat(directory).st_mode))
+
+    def test_shared_directory_is_refused(self):
+        os.mkdir(os.path.join(self._runtime_dir, "cqa"), 0o777)
+        os.chmod(os.path.join(self._runtime_dir, "cqa"), 0o777)
+
+        with mock.patch.dict(
+            os.environ, {"XDG_RUNTIME_DIR": self._runtime_dir}
+        ):
+            with self.assertRaises(PermissionError):
+                protocol.get_socket_path("/project")
+
+
+class DaemonTests(TestCase):
+    def setUp(self):
+        self._tempdir = tempfile.TemporaryDirectory()
+        self._rootdir = self._tempdir.name
+        self._socket = os.path.join(self._rootdir, "cqa.sock")
+        with open(os.path.join(self._rootdir, "pyproject.toml"), "w") as file:
+            file.write("[tool.cqa]\n")
+        with open(os.path.join(self._rootdir, "module.py"), "w") as file:
+            file.write('password = "s3cr3t-Tk9xQ2vLp8"\nimport os\n')
+
+        self._cwd = os.getcwd()
+        os.chdir(self._rootdir)
+
+    def tearDown(self):
+        os.chdir(self._cwd)
+        self._tempdir.cleanup()
+
+    def _serve(self) -> threading.Thread:
+        server = DaemonServer(
+            self._socket,
+            _args(
+                "daemon",
+                "--socket",
+                self._socket,
+                "--tools",
+                "detect-secrets",
+                "pylama",
+            ),
+        )
+        thread = threading.Thread(target=self._run_server, args=(server,))
+        thread.start()
+        return thread
+
+    @staticmethod
+    def _run_server(server: DaemonServer):
+        with server:
+            server.serve_forever()
+
+    def test_round_trip(self):
+        thread = self._serve()
+        flushed = []
+        try:
+            items = client.request(
+                _args(
+                    "run",
+                    "--daemon",
+                    "--socket",
+                    self._socket,
+                    "--no-cache",
+                    "--tools",
+                    "detect-secrets",
+                ),
+                on_task_done=lambda: flushed.append(True),
+            )
+            self.assertIsNotNone(items)
+            found = [(name, item.lnum) for name, item in items]
+        finally:
+            self.assertTrue(client.stop(self._socket))
+            thread.join(timeout=10)
+
+        self.assertEqual([("security", 1)], found)
+        self.assertTrue(flushed)
+        self.assertFalse(os.path.exists(self._socket))
+        self.assertFalse(client.stop(self._socket))
+
+    @parameterized.expand(
+        [
+            ("jobs", ["--jobs", "3"]),
+            ("cache_dir", ["--cache-dir", "other"]),
+            ("config", ["--config", "other.toml"]),
+            ("tools", ["--tools", "bandit"]),
+            ("all_tools", []),
+        ]
+    )
+    def test_unsupported_options_are_refused(self, _, options):
+        thread = self._serve()
+        try:
+            self.assertIsNone(
+                client.request(
+                    _args(
+                        "run", "--daemon", "--socket", self._socket, *options
+                    )
+                )
+            )
+        finally:
+            client.stop(self._socket)
+            thread.join(timeout=10)
+
+    def test_other_users_are_refused(self):
+        thread = self._serve()
+        try:
+            with mock.patch.object(os, "getuid", return_value=os.getuid() + 1):
+                self.assertIsNone(
+                    client.request(
+                        _args(
+                            "run",
+                            "--daemon",
+                            "--socket",
+                            self._socket,
+                            "--tools",
+                            "pylama",
+                        )
+                    )
+                )
+        finally:
+            client.stop(self._socket)
+            thread.join(timeout=10)
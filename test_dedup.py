@@ -0,0 +1,129 @@
+import pickle
+from unittest import TestCase
+
+from parameterized import parameterized
+
+from cqa.types import PackageVulnerability, ReporterError, Severity
+from cqa.utils import deduplicate
+
+
+def _error(tool, code, lnum=1, col=1, message="", **kwargs):
+    return ReporterError(
+        path="mod.py",
+        message=message or f"{tool} {code}",
+        lnum=lnum,
+        col=col,
+        tool=tool,
+        code=code,
+        **kwargs,
+    )
+
+
+class ReporterErrorTests(TestCase):
+    def test_immutable(self):
+        error = _error("pyflakes", "W0611")
+
+        with self.assertRaises(AttributeError):
+            error.lnum = 2
+        with self.assertRaises(AttributeError):
+            error.other = 2
+
+    def test_hashable(self):
+        errors = {_error("pyflakes", "W0611"), _error("pyflakes", "W0611")}
+
+        self.assertEqual(1, len(errors))
+
+    def test_fingerprint_ignores_the_line(self):
+        error = _error("pyflakes", "W0611", message="'os'  imported")
+
+        self.assertEqual(
+            error.fingerprint(),
+            _error(
+                "pyflakes", "W0611", lnum=9, message="'os' imported"
+            ).fingerprint(),
+        )
+        self.assertNotEqual(
+            error.fingerprint(), _error("pylint", "W0611").fingerprint()
+        )
+
+    def test_fingerprint_is_relative_to_the_root(self):
+        error = _error("pyflakes", "W0611")
+        moved = ReporterError.from_dict(
+            {**error.to_dict(), "path": "/checkout/mod.py"}
+        )
+
+        self.assertEqual(
+            error.fingerprint(line="import os"),
+            moved.fingerprint("/checkout", line="import  os"),
+        )
+        self.assertNotEqual(
+            error.fingerprint(), error.fingerprint(line="import os")
+        )
+
+    def test_round_trip(self):
+        error = _error("bandit", "B105", confidence="HIGH")
+
+        for copy in (
+            pickle.loads(pickle.dumps(error)),
+            ReporterError.from_dict(error.to_dict()),
+        ):
+            self.assertEqual(error.to_dict(), copy.to_dict())
+            self.assertEqual(error.fingerprint(), copy.fingerprint())
+
+
+class DeduplicateTests(TestCase):
+    @parameterized.expand(
+        [
+            ("equivalent_checks", ("pyflakes", "W0611"), {}, 1),
+            ("other_line", ("pyflakes", "W0611"), {"lnum": 2}, 2),
+            ("other_check", ("pyflakes", "W0612"), {"message": "other"}, 2),
+            ("same_message", ("pycodestyle", "E225"), {}, 1),
+            ("other_column", ("pycodestyle", "E225"), {"col": 5}, 2),
+        ]
+    )
+    def test_deduplicate(self, _, check, changes, expected):
+        items = [
+            ("linter", _error(*check, message="found")),
+            (
+                "linter",
+                _error("pylint", "W0611", **{"message": "found", **changes}),
+            ),
+        ]
+
+        self.assertEqual(expected, len(list(deduplicate(items))))
+
+    def test_across_tool_groups(self):
+        items = [
+            ("security", _error("bandit", "B105")),
+            ("security", _error("detect-secrets", "Secret Keyword")),
+            ("linter", _error("pytype", "name-error", lnum=3)),
+            ("linter", _error("pyflakes", "E0602", lnum=3)),
+        ]
+
+        self.assertEqual([items[0], items[2]], list(deduplicate(items)))
+
+    def test_more_severe_duplicates_are_kept(self):
+        warning = _error("pylint", "C0301", severity=Severity.WARNING)
+        error = _error("pycodestyle", "E501", severity=Severity.ERROR)
+
+        self.assertEqual(
+            [("linter", warning), ("linter", error)],
+            list(deduplicate([("linter", warning), ("linter", error)])),
+        )
+
+    def test_vulnerabilities(self):
+        vulnerability = PackageVulnerability("1", "django", "2.2.0")
+
+        self.assertEqual(
+            1,
+            len(
+                list(
+                    deduplicate(
+                        [
+                            ("vulnerability", vulnerability),
+                            ("vulnerability", vulnerability),
+                        ]
+                    )
+                )
+            ),
+        )
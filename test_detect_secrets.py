@@ -0,0 +1,56 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from detect_secrets import SecretsCollection
+from parameterized import parameterized
+
+from cqa.securitytools.detect_secrets import DetectSecretsRunner
+
+
+def _findings(errors):
+    return sorted(
+        (os.path.basename(error.path), error.lnum, error.code)
+        for error in errors
+    )
+
+
+class DetectSecretsRunnerTests(TestCase):
+    def setUp(self):
+        self._tempdir = tempfile.TemporaryDirectory()
+        self._rootdir = self._tempdir.name
+        self._paths = []
+        for index in range(6):
+            path = os.path.join(self._rootdir, f"module_{index}.py")
+            with open(path, "w") as file:
+                if index % 2:
+                    file.write(f'password = "s3cr3t-Tk9xQ2vLp{index}"\n')
+                else:
+                    file.write(f"x = {index}\n")
+            self._paths.append(path)
+        super().setUp()
+
+    def tearDown(self) -> None:
+        self._tempdir.cleanup()
+
+    @parameterized.expand([(2,), (4,)])
+    def test_process_pool_finds_the_same_secrets(self, jobs):
+        expected = DetectSecretsRunner(jobs=1).run(self._paths, self._rootdir)
+
+        errors = DetectSecretsRunner(jobs=jobs).run(self._paths, self._rootdir)
+
+        self.assertEqual(3, len(expected))
+        self.assertEqual(_findings(expected), _findings(errors))
+
+    def test_runs_do_not_share_state(self):
+        runner = DetectSecretsRunner()
+        self.assertEqual(1, len(runner.run(self._paths[1:2], self._rootdir)))
+
+        self.assertEqual([], runner.run(self._paths[:1], self._rootdir))
+        # the collection is built by every run rather than by the class
+        self.assertFalse(
+            any(
+                isinstance(value, SecretsCollection)
+                for value in vars(DetectSecretsRunner).values()
+            )
+        )
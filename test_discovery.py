@@ -0,0 +1,72 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from parameterized import parameterized
+
+from cqa.utils import discover_files
+
+
+class DiscoverFilesTests(TestCase):
+    FILES = [
+        "build_tools/rebuild.py",
+        "migrations.py",
+        "pkg/a.py",
+        "pkg/gen_pb2.py",
+        "pkg/notes.txt",
+        "pkg/sub/b.py",
+        "pkg/vendored/c.py",
+        "pkg/vendored/keep.py",
+        ".venv/lib/site.py",
+        "node_modules/x/n.py",
+        "env/lib/e.py",
+        "tests/test_a.py",
+    ]
+
+    GITIGNORES = {
+        "pkg/.gitignore": "*_pb2.py\nvendored/*\n!vendored/keep.py\n",
+    }
+
+    def setUp(self):
+        self._tempdir = tempfile.TemporaryDirectory()
+        self._cwd = os.getcwd()
+        os.chdir(self._tempdir.name)
+
+        for path in self.FILES:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, "w", encoding="utf-8") as file:
+                file.write("x = 1\n")
+        for path, content in self.GITIGNORES.items():
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(content)
+        # a virtualenv which does not use any of the conventional names
+        with open("env/pyvenv.cfg", "w", encoding="utf-8") as file:
+            file.write("home = /usr/bin\n")
+        super().setUp()
+
+    def tearDown(self) -> None:
+        os.chdir(self._cwd)
+        self._tempdir.cleanup()
+
+    @parameterized.expand(
+        [
+            (
+                ["."],
+                [],
+                (
+                    "build_tools/rebuild.py",
+                    "migrations.py",
+                    "pkg/a.py",
+                    "pkg/sub/b.py",
+                    "pkg/vendored/keep.py",
+                ),
+            ),
+            (["pkg"], ["sub/"], ("pkg/a.py", "pkg/vendored/keep.py")),
+            (["pkg/sub", "pkg/sub/b.py"], [], ("pkg/sub/b.py",)),
+            (["pkg/gen_pb2.py", "tests/test_a.py"], [], ("pkg/gen_pb2.py",)),
+            (["pkg/*.py"], ["a.py"], ("pkg/gen_pb2.py",)),
+            (["missing"], [], ()),
+        ]
+    )
+    def test_discover_files(self, paths, exclude, expected):
+        self.assertEqual(expected, discover_files(paths, exclude=exclude))
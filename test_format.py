@@ -0,0 +1,137 @@
+import argparse
+import os
+import tempfile
+from unittest import TestCase
+
+from parameterized import parameterized
+
+from cqa import main as cqa_main
+from cqa.statictools.pipeline import FormatPipelineRunner
+
+UNFORMATTED = "import sys\nimport os\nvalue=1\n"
+
+
+class FormatPipelineTests(TestCase):
+    def setUp(self):
+        self._tempdir = tempfile.TemporaryDirectory()
+        self._rootdir = self._tempdir.name
+        self._path = os.path.join(self._rootdir, "module.py")
+        with open(self._path, "w") as file:
+            file.write(UNFORMATTED)
+        # isort resolves the paths relative to the working directory
+        self._cwd = os.getcwd()
+        os.chdir(self._rootdir)
+
+    def tearDown(self):
+        os.chdir(self._cwd)
+        self._tempdir.cleanup()
+
+    def _read(self) -> str:
+        with open(self._path) as file:
+            return file.read()
+
+    def test_format_writes_the_files(self):
+        errors = FormatPipelineRunner().run([self._path], self._rootdir)
+
+        self.assertEqual(2, len(errors))
+        self.assertEqual("import os\nimport sys\n\nvalue = 1\n", self._read())
+
+    def test_check_does_not_write_the_files(self):
+        errors = FormatPipelineRunner({"check": True}).run(
+            [self._path], self._rootdir
+        )
+
+        self.assertEqual(UNFORMATTED, self._read())
+        self.assertEqual(2, len(errors))
+        self.assertIn("isort would modify it", errors[0].message)
+        self.assertIn("+import os\n", errors[0].details["diff"])
+        self.assertEqual(1, errors[0].lnum)
+        # the line of the file black would change, not of the output of isort
+        self.assertEqual(3, errors[1].lnum)
+        self.assertIn("+value = 1\n", errors[1].details["diff"])
+
+    def test_check_reports_nothing_for_formatted_files(self):
+        FormatPipelineRunner().run([self._path], self._rootdir)
+
+        self.assertEqual(
+            [],
+            FormatPipelineRunner({"check": True}).run(
+                [self._path], self._rootdir
+            ),
+        )
+
+    def test_formatted_files_are_not_written(self):
+        FormatPipelineRunner().run([self._path], self._rootdir)
+        os.utime(self._path, (0, 0))
+
+        errors = FormatPipelineRunner().run([self._path], self._rootdir)
+
+        self.assertEqual([], errors)
+        self.assertEqual(0, os.stat(self._path).st_mtime)
+
+    def test_process_pool_formats_like_a_single_worker(self):
+        paths = [self._path]
+        for index in range(3):
+            path = os.path.join(self._rootdir, f"module_{index}.py")
+            with open(path, "w") as file:
+                file.write(UNFORMATTED)
+            paths.append(path)
+
+        errors = FormatPipelineRunner(jobs=2).run(paths, self._rootdir)
+
+        self.assertEqual(8, len(errors))
+        for path in paths:
+            with open(path) as file:
+                self.assertEqual(
+                    "import os\nimport sys\n\nvalue = 1\n", file.read()
+                )
+
+
+class FormatterSelectionTests(TestCase):
+    @parameterized.expand(
+        [
+            (False, False, []),
+            (True, False, [False]),
+            (False, True, [True]),
+        ]
+    )
+    def test_formatters_are_only_run_when_requested(
+        self, format_, check, expected
+    ):
+        args = argparse.Namespace(
+            tools=["format", "pylama"], format=format_, check=check
+        )
+
+        runners = cqa_main.create_runners(args, {})
+
+        self.assertEqual(
+            expected,
+            [
+                runner.runner.check
+                for runner in runners
+                if runner.name == "formatter"
+            ],
+        )
+        self.assertEqual(
+            ["pylama"],
+            [runner.ref.tool for runner in runners if runner.name == "linter"],
+        )
+
+    def test_runners_are_reused_in_the_same_mode(self):
+        runners = cqa_main.create_runners(
+            argparse.Namespace(tools=["format"], format=True, check=False), {}
+        )
+
+        formatted = cqa_main._with_formatters(
+            argparse.Namespace(tools=["format"], format=True, check=False),
+            {},
+            runners,
+        )
+        checked = cqa_main._with_formatters(
+            argparse.Namespace(tools=["format"], format=False, check=True),
+            {},
+            runners,
+        )
+
+        self.assertIs(runners[0], formatted[0])
+        self.assertTrue(checked[0].runner.check)
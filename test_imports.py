@@ -0,0 +1,170 @@
+import ast
+import os
+import tempfile
+from unittest import TestCase
+
+from parameterized import parameterized
+
+from cqa.utils.imports import (
+    ImportGraph,
+    ImportIndex,
+    find_imports,
+    module_name,
+)
+
+
+class ImportGraphTests(TestCase):
+    def setUp(self):
+        self._tempdir = tempfile.TemporaryDirectory()
+        self._rootdir = self._tempdir.name
+
+    def tearDown(self):
+        self._tempdir.cleanup()
+
+    def _write(self, name: str, text: str = "") -> str:
+        path = os.path.join(self._rootdir, *name.split("/"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as file:
+            file.write(text)
+        return path
+
+    def test_module_names_follow_the_packages(self):
+        self._write("src/pkg/__init__.py")
+        self._write("src/pkg/sub/__init__.py")
+
+        self.assertEqual(
+            "pkg.sub.mod", module_name(self._write("src/pkg/sub/mod.py"))
+        )
+        self.assertEqual(
+            "pkg.sub",
+            module_name(
+                os.path.join(self._rootdir, "src/pkg/sub/__init__.py")
+            ),
+        )
+        self.assertEqual("script", module_name(self._write("script.py")))
+
+    @parameterized.expand(
+        [
+            ("import os.path", False, {"os.path"}),
+            ("from . import b", False, {"pkg", "pkg.b"}),
+            ("from .b import c", False, {"pkg.b", "pkg.b.c"}),
+            ("from .. import b", False, set()),
+            ("from .b import c", True, {"pkg.mod.b", "pkg.mod.b.c"}),
+            ("def f():\n    from x import *", False, {"x"}),
+        ]
+    )
+    def test_find_imports(self, source, package, expected):
+        self.assertEqual(
+            expected, find_imports(ast.parse(source), "pkg.mod", package)
+        )
+
+    def test_modules_come_after_their_imports(self):
+        graph = ImportGraph()
+        graph.add("app", "app.py", {"pkg.a", "json"})
+        graph.add("pkg", "pkg/__init__.py", set())
+        graph.add("pkg.a", "pkg/a.py", {"pkg.b.f"})
+        graph.add("pkg.b", "pkg/b.py", {"pkg.a"})
+        graph.add("tool", "tool.py", set())
+
+        self.assertEqual({"pkg", "pkg.b"}, graph.dependencies("pkg.a"))
+        self.assertEqual(
+            [["pkg"], ["pkg.a", "pkg.b"], ["app"], ["tool"]],
+            graph.components(),
+        )
+
+    def test_build(self):
+        paths = [
+            self._write("pkg/mod.py", "from . import util\n"),
+            self._write("pkg/util.py", "import os\n"),
+            self._write("pkg/__init__.py", "invalid syntax ("),
+        ]
+
+        graph = ImportGraph.build(paths)
+
+        self.assertEqual(["pkg", "pkg.util", "pkg.mod"], graph.order())
+        self.assertEqual(paths[0], graph.modules["pkg.mod"])
+        self.assertFalse(graph.add("pkg.mod", "other.py", set()))
+
+
+class ImportIndexTests(TestCase):
+    def setUp(self):
+        self._tempdir = tempfile.TemporaryDirectory()
+        self._rootdir = self._tempdir.name
+        self._index_path = os.path.join(self._rootdir, "index", "imports.json")
+        self._paths = {
+            name: self._write(name, text)
+            for name, text in (
+                ("pkg/__init__.py", ""),
+                ("pkg/base.py", "import os\n"),
+                ("pkg/models.py", "from .base import Base\n"),
+                ("pkg/views.py", "from pkg import models\n"),
+                ("app.py", "import pkg.views\n"),
+                ("other.py", ""),
+            )
+        }
+
+    def tearDown(self):
+        self._tempdir.cleanup()
+
+    def _write(self, name: str, text: str) -> str:
+        path = os.path.join(self._rootdir, *name.split("/"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as file:
+            file.write(text)
+        return path
+
+    def _index(self) -> ImportIndex:
+        return ImportIndex.load(self._index_path, rootdir=self._rootdir)
+
+    def test_only_changed_modules_are_scanned(self):
+        index = self._index()
+        self.assertEqual(6, len(index.update(self._paths.values())))
+        index.save()
+
+        index = self._index()
+        self.assertEqual(set(), index.update(self._paths.values()))
+        self._write("pkg/base.py", "import sys\n")
+        self.assertEqual({"pkg.base"}, index.update(self._paths.values()))
+        self.assertEqual({"sys"}, index.imports["pkg.base"])
+
+    def test_affected_modules(self):
+        index = self._index()
+        index.update(self._paths.values())
+
+        self.assertEqual(
+            {"pkg.base", "pkg.models", "pkg.views", "app"},
+            index.affected({"pkg.base"}),
+        )
+        self.assertEqual({"app"}, index.affected({"app"}))
+        # the modules of a package do not import it unless they name it
+        self.assertEqual(
+            {"pkg", "pkg.models", "pkg.views", "app"},
+            index.affected({"pkg"}),
+        )
+
+    def test_removed_modules(self):
+        index = self._index()
+        index.update(self._paths.values())
+        os.remove(self._paths["pkg/models.py"])
+
+        changed = index.update([self._paths["app.py"]])
+
+        self.assertEqual({"pkg.models"}, changed)
+        self.assertNotIn("pkg.models", index)
+        self.assertEqual(
+            {"pkg.models", "pkg.views", "app"}, index.affected(changed)
+        )
+
+    def test_dependencies_are_added(self):
+        index = self._index()
+        index.update([self._paths["app.py"]])
+
+        added = index.add_dependencies()
+
+        self.assertEqual({"pkg", "pkg.views", "pkg.models", "pkg.base"}, added)
+        self.assertNotIn("other", index)
+        self.assertEqual(
+            {"app", "pkg", "pkg.views", "pkg.models", "pkg.base"},
+            index.imported({"app"}),
+        )
+        self.assertEqual(set(), index.add_dependencies())
@@ -0,0 +1,80 @@
+import os
+import subprocess
+import sys
+from typing import Dict
+from unittest import TestCase, mock
+
+from parameterized import parameterized
+
+from cqa import registry
+
+# budget of the cumulative import time of the cqa entrypoint, in microseconds
+IMPORT_TIME_BUDGET_US: int = 150_000
+
+# packages which must only be imported once a tool actually runs
+HEAVY_PACKAGES = frozenset(
+    [
+        "bandit",
+        "black",
+        "detect_secrets",
+        "dparse",
+        "git",
+        "isort",
+        "pylama",
+        "pytype",
+        "rich",
+        "safety",
+        "toml",
+    ]
+)
+
+
+def _importtime(module: str) -> Dict[str, int]:
+    """
+    import ``module`` in a fresh interpreter and parse the ``-X importtime``
+    output into the cumulative import time of every imported module
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        stderr=subprocess.PIPE,
+        check=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+
+    timings = {}
+    for line in result.stderr.decode().splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        timings[name.strip()] = int(cumulative)
+    return timings
+
+
+class ImportTimeTests(TestCase):
+    @parameterized.expand([("cqa.main",), ("cqa.cli.args",)])
+    def test_no_heavy_imports(self, module: str):
+        imported = {name.split(".")[0] for name in _importtime(module)}
+
+        self.assertEqual(set(), imported & HEAVY_PACKAGES)
+
+    def test_import_time_budget(self):
+        timings = _importtime("cqa.main")
+
+        self.assertLess(timings["cqa.main"], IMPORT_TIME_BUDGET_US)
+
+
+class PluginRunnersTests(TestCase):
+    def setUp(self):
+        registry._plugin_runners.cache_clear()
+        self.addCleanup(registry._plugin_runners.cache_clear)
+
+    def test_entry_points_are_read_once(self):
+        from importlib import metadata
+
+        with mock.patch.object(
+            metadata, "entry_points", return_value=[]
+        ) as entry_points:
+            registry.get_specs("linter")
+            registry.get_specs("sec", ["bandit"])
+
+        self.assertEqual(1, entry_points.call_count)
@@ -0,0 +1,67 @@
+import time
+from unittest import TestCase
+
+from cqa.base import Runner
+from cqa.types import ReporterError, Severity
+from cqa.utils import Profiler
+
+
+class _SleepRunner(Runner):
+    TOOL = "sleep"
+
+    def run(self, paths, rootdir):
+        errors = []
+        for path in paths:
+            time.sleep(0.02 if path == "slow.py" else 0.001)
+            errors.append(
+                ReporterError(
+                    path=path, message="slept", severity=Severity.WARNING
+                )
+            )
+        return errors
+
+
+class ProfilerTests(TestCase):
+    def test_files_are_profiled_one_at_a_time(self):
+        profiler = Profiler()
+        runner = _SleepRunner()
+
+        errors = list(
+            runner.stream_sources(
+                ["fast.py", "slow.py", "other.py"], ".", profiler=profiler
+            )
+        )
+
+        self.assertEqual(3, len(errors))
+        slowest = profiler.slowest(top=2)
+        self.assertEqual(["slow.py", 2], [slowest[0].path, len(slowest)])
+        self.assertEqual(["sleep"], list(slowest[0].runners))
+        self.assertGreaterEqual(slowest[0].seconds, 0.02)
+
+    def test_trace(self):
+        profiler = Profiler()
+
+        items = profiler.iterate(iter("abc"), "sleep", "runner")
+        self.assertEqual(["a", "b", "c"], list(items))
+        with profiler.span("discover files", "cqa") as args:
+            args["files"] = 3
+
+        trace = profiler.trace()
+        events = trace["traceEvents"]
+        self.assertEqual(
+            [
+                ("M", "thread_name"),
+                ("M", "process_name"),
+                ("X", "sleep"),
+                ("X", "discover files"),
+            ],
+            [(event["ph"], event["name"]) for event in events],
+        )
+        self.assertEqual("sleep", events[0]["args"]["name"])
+        self.assertEqual("cqa", events[1]["args"]["name"])
+        self.assertEqual(3, events[2]["args"]["items"])
+        self.assertEqual(3, events[3]["args"]["files"])
+        for event in events[2:]:
+            self.assertIn("cpu_ms", event["args"])
+            self.assertIn("rss_delta_kb", event["args"])
+            self.assertGreaterEqual(event["dur"], 0)
@@ -0,0 +1,47 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from parameterized import parameterized
+
+from cqa.statictools.pylama import PylamaRunner
+
+
+def _findings(errors):
+    return sorted(
+        (os.path.basename(error.path), error.lnum, error.code)
+        for error in errors
+    )
+
+
+class PylamaRunnerTests(TestCase):
+    def setUp(self):
+        self._tempdir = tempfile.TemporaryDirectory()
+        self._rootdir = self._tempdir.name
+        self._paths = []
+        for index in range(6):
+            path = os.path.join(self._rootdir, f"module_{index}.py")
+            with open(path, "w") as file:
+                file.write("import os\n" * (index % 3) + f"x={index}\n")
+            self._paths.append(path)
+        # pylama reads the files relative to the current directory
+        self._cwd = os.getcwd()
+        os.chdir(self._rootdir)
+        super().setUp()
+
+    def tearDown(self) -> None:
+        os.chdir(self._cwd)
+        self._tempdir.cleanup()
+
+    @parameterized.expand([(2,), (4,)])
+    def test_process_pool_finds_the_same_errors(self, jobs):
+        expected = PylamaRunner(jobs=1).run(self._paths, self._rootdir)
+
+        errors = PylamaRunner(jobs=jobs).run(self._paths, self._rootdir)
+
+        self.assertTrue(expected)
+        self.assertEqual(_findings(expected), _findings(errors))
+
+    def test_jobs_option(self):
+        self.assertEqual(3, PylamaRunner({"jobs": 3}).jobs)
+        self.assertEqual(2, PylamaRunner({"jobs": 3}, jobs=2).jobs)
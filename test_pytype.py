@@ -0,0 +1,46 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from parameterized import parameterized
+
+from cqa.statictools.pytype import PytypeRunner
+
+MISMATCH = """def add(value):
+    return value + 1
+
+
+add("one")
+"""
+
+
+def _findings(errors):
+    return sorted(
+        (os.path.basename(error.path), error.lnum, error.code)
+        for error in errors
+    )
+
+
+class PytypeRunnerTests(TestCase):
+    def setUp(self):
+        self._tempdir = tempfile.TemporaryDirectory()
+        self._rootdir = self._tempdir.name
+        self._paths = []
+        for index in range(4):
+            path = os.path.join(self._rootdir, f"module_{index}.py")
+            with open(path, "w") as file:
+                file.write(MISMATCH if index % 2 else f"x = {index}\n")
+            self._paths.append(path)
+        super().setUp()
+
+    def tearDown(self) -> None:
+        self._tempdir.cleanup()
+
+    @parameterized.expand([(2,), (4,)])
+    def test_process_pool_finds_the_same_errors(self, jobs):
+        expected = PytypeRunner(jobs=1).run(self._paths, self._rootdir)
+
+        errors = PytypeRunner(jobs=jobs).run(self._paths, self._rootdir)
+
+        self.assertTrue(expected)
+        self.assertEqual(_findings(expected), _findings(errors))
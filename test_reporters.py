@@ -0,0 +1,123 @@
+import io
+import json
+import os
+import tempfile
+import xml.etree.ElementTree as ET
+from unittest import TestCase
+
+from parameterized import parameterized
+
+from cqa import main as cqa_main
+from cqa.reporters import REPORTERS, create_reporter
+from cqa.types import PackageVulnerability, ReporterError, Severity
+
+ITEMS = [
+    (
+        "linter",
+        ReporterError(
+            path="pkg/mod.py",
+            message="E225 missing whitespace around operator",
+            lnum=3,
+            col=6,
+            severity=Severity.ERROR,
+            code="E225",
+        ),
+    ),
+    (
+        "security",
+        ReporterError(
+            path="pkg/mod.py",
+            message="Use of <eval> & friends",
+            lnum=7,
+            severity=Severity.WARNING,
+        ),
+    ),
+    (
+        "vulnerability",
+        PackageVulnerability(
+            "38624", "django", "2.2.0", "advisory", cvssv3_score=9.8
+        ),
+    ),
+]
+
+
+def _write(name: str) -> str:
+    file = io.StringIO()
+    reporter = create_reporter(name, file=file)
+    reporter.start()
+    for group, item in ITEMS:
+        reporter.add(item, header=group)
+    reporter.finish()
+    return file.getvalue()
+
+
+class ReporterTests(TestCase):
+    def test_json(self):
+        records = json.loads(_write("json"))
+
+        self.assertEqual(
+            ["linter", "security", "vulnerability"],
+            [record["group"] for record in records],
+        )
+        self.assertEqual("E225", records[0]["code"])
+        self.assertEqual("error", records[2]["severity"])
+
+    def test_json_lines(self):
+        lines = _write("jsonl").splitlines()
+
+        self.assertEqual(3, len(lines))
+        self.assertEqual("warning", json.loads(lines[1])["severity"])
+
+    @parameterized.expand([("json", []), ("jsonl", None), ("junit", None)])
+    def test_empty_report(self, name, expected):
+        file = io.StringIO()
+        reporter = create_reporter(name, file=file)
+        reporter.start()
+        reporter.finish()
+
+        if expected is not None:
+            self.assertEqual(expected, json.loads(file.getvalue()))
+
+    def test_sarif(self):
+        log = json.loads(_write("sarif"))
+
+        run = log["runs"][0]
+        self.assertEqual("2.1.0", log["version"])
+        self.assertEqual(
+            ["E225", "security", "38624"],
+            [rule["id"] for rule in run["tool"]["driver"]["rules"]],
+        )
+        self.assertEqual(
+            ["error", "warning", "error"],
+            [result["level"] for result in run["results"]],
+        )
+        self.assertEqual(
+            {
+                "artifactLocation": {
+                    "uri": "pkg/mod.py",
+                    "uriBaseId": "%SRCROOT%",
+                },
+                "region": {"startLine": 3, "startColumn": 6},
+            },
+            run["results"][0]["locations"][0]["physicalLocation"],
+        )
+        self.assertNotIn("locations", run["results"][2])
+
+    def test_junit(self):
+        suite = ET.fromstring(_write("junit").split("\n", 1)[1])[0]
+
+        self.assertEqual(
+            ["linter", "security", "vulnerability"],
+            [case.get("classname") for case in suite],
+        )
+        self.assertEqual("pkg/mod.py:7:0", suite[1].get("name"))
+        self.assertEqual("Use of <eval> & friends", suite[1][0].text)
+
+    @parameterized.expand([(name,) for name in sorted(REPORTERS)])
+    def test_report_results_writes_the_output(self, name):
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, "report")
+            cqa_main.report_results(iter(ITEMS), report=name, output=output)
+
+            with open(output, encoding="utf-8") as file:
+                self.assertIn("pkg/mod.py", file.read())
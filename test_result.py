@@ -0,0 +1,84 @@
+from unittest import TestCase
+
+from parameterized import parameterized
+
+from cqa.types import PackageVulnerability, ReporterError, Result, Severity
+
+
+def _error(path, lnum, severity, **details) -> ReporterError:
+    return ReporterError(
+        path=path,
+        message=f"{severity.value} at {lnum}",
+        lnum=lnum,
+        col=lnum % 7,
+        severity=severity,
+        **details,
+    )
+
+
+ITEMS = [
+    _error("a.py", 1, Severity.ERROR, number="E225"),
+    _error("b.py", 2, Severity.WARNING),
+    _error("a.py", 3, Severity.ERROR, number="E225"),
+    _error("a.py", 4, Severity.INFO, tags=["unhashable"]),
+    _error("b.py", 5, Severity.WARNING),
+    _error("c.py", 6, Severity.ERROR, number="E501"),
+]
+
+
+def _fields(items):
+    return [
+        (item.path, item.message, item.lnum, item.col, item.details)
+        for item in items
+    ]
+
+
+class ResultTests(TestCase):
+    @parameterized.expand(
+        [
+            ("errors", [0, 2, 5]),
+            ("warnings", [1, 4]),
+            ("info", [3]),
+        ]
+    )
+    def test_non_contiguous_severities_are_kept(self, attribute, rows):
+        self.assertEqual(
+            _fields(ITEMS[row] for row in rows),
+            _fields(getattr(Result(ITEMS), attribute)),
+        )
+
+    def test_items_are_built_back_in_order(self):
+        self.assertEqual(_fields(ITEMS), _fields(Result(ITEMS)))
+
+    def test_indexes(self):
+        result = Result(ITEMS[:3], tool="pylama")
+        result.extend(ITEMS[3:], tool="bandit")
+
+        self.assertEqual(["a.py", "b.py", "c.py"], result.paths)
+        self.assertEqual(["pylama", "bandit"], result.tools)
+        self.assertEqual(
+            _fields(ITEMS[row] for row in (0, 2, 3)),
+            _fields(result.by_path("a.py")),
+        )
+        self.assertEqual(_fields(ITEMS[3:]), _fields(result.by_tool("bandit")))
+        self.assertEqual([], result.by_path("missing.py"))
+
+    def test_merge(self):
+        vulnerability = PackageVulnerability("1", "django", "2.2.0")
+        shards = [
+            Result(ITEMS[:2], tool="pylama"),
+            Result([vulnerability], tool="safety"),
+            Result(ITEMS[2:], tool="pylama"),
+        ]
+
+        merged = Result.merge(shards)
+
+        self.assertEqual(7, len(merged))
+        self.assertIs(vulnerability, merged.by_tool("safety")[0])
+        self.assertEqual(
+            _fields(ITEMS[row] for row in (0, 2, 3)),
+            _fields(merged.by_path("a.py")),
+        )
+        self.assertEqual(
+            _fields([ITEMS[0], ITEMS[2], ITEMS[5]]), _fields(merged.errors)
+        )
@@ -0,0 +1,147 @@
+import json
+import os
+import tempfile
+from unittest import TestCase, mock
+
+from parameterized import parameterized
+
+from cqa.securitytools.safety import SafetyRunner
+from cqa.securitytools.safety.database import VulnerabilityDatabase
+from cqa.securitytools.safety.index import VulnerabilityIndex
+from cqa.types import Severity
+
+INSECURE = {
+    "django": ["<2.2.28", ">=3.0,<3.2.13"],
+    "$meta": {"timestamp": 1},
+}
+
+INSECURE_FULL = {
+    "django": [
+        {
+            "id": "pyup.io-1",
+            "specs": ["<2.2.28"],
+            "advisory": "sql injection",
+            "cve": "CVE-2022-1",
+            "more_info_path": "/v/1/",
+        },
+        {
+            "id": "pyup.io-2",
+            "specs": [">=3.0,<3.2.13"],
+            "advisory": "denial of service",
+            "cve": "CVE-2022-2",
+            "more_info_path": "/v/2/",
+        },
+    ],
+    "$meta": {
+        "base_domain": "https://example.org",
+        "cve": {"CVE-2022-1": {"cvssv2": 10.0, "cvssv3": 10.0}},
+    },
+}
+
+
+class SafetyRunnerTests(TestCase):
+    def setUp(self):
+        self._tempdir = tempfile.TemporaryDirectory()
+        self._rootdir = self._tempdir.name
+        self._db = os.path.join(self._rootdir, "db")
+        os.makedirs(self._db)
+        for name, data in (
+            ("insecure.json", INSECURE),
+            ("insecure_full.json", INSECURE_FULL),
+        ):
+            with open(os.path.join(self._db, name), "w") as file:
+                json.dump(data, file)
+
+        self._write_requirements("django==3.1.0\nrequests==2.28.0\n")
+        super().setUp()
+
+    def tearDown(self) -> None:
+        self._tempdir.cleanup()
+
+    def _write_requirements(self, content: str):
+        path = os.path.join(self._rootdir, "requirements.txt")
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(content)
+
+    def _runner(self, **options) -> SafetyRunner:
+        return SafetyRunner(
+            {"cache-dir": os.path.join(self._rootdir, "cache"), **options}
+        )
+
+    def test_local_database(self):
+        errors = self._runner(db=self._db).run(rootdir=self._rootdir)
+
+        self.assertEqual(["2"], [e.vulnerability_id for e in errors])
+        self.assertEqual("django", errors[0].package_name)
+
+    def test_results_are_memoized(self):
+        self._runner(db=self._db).run(rootdir=self._rootdir)
+
+        with mock.patch.object(SafetyRunner, "_parse_requirements") as parse:
+            errors = self._runner(db=self._db).run(rootdir=self._rootdir)
+
+        parse.assert_not_called()
+        self.assertEqual(["2"], [e.vulnerability_id for e in errors])
+
+        self._write_requirements("django==2.0.0\n")
+        errors = self._runner(db=self._db).run(rootdir=self._rootdir)
+
+        self.assertEqual(["1"], [e.vulnerability_id for e in errors])
+        self.assertEqual(Severity.ERROR, errors[0].severity)
+
+    def test_offline_without_database(self):
+        with mock.patch.object(
+            VulnerabilityDatabase, "_download", side_effect=AssertionError
+        ):
+            errors = self._runner(offline=True).run(rootdir=self._rootdir)
+
+        self.assertEqual([], errors)
+
+    def test_stale_database_is_used_when_download_fails(self):
+        cache = os.path.join(self._rootdir, "cache")
+        os.makedirs(cache)
+        for name in ("insecure.json", "insecure_full.json"):
+            with open(os.path.join(self._db, name)) as src, open(
+                os.path.join(cache, name), "w"
+            ) as dst:
+                dst.write(src.read())
+            os.utime(os.path.join(cache, name), (0, 0))
+
+        with mock.patch.object(
+            VulnerabilityDatabase, "_download", side_effect=OSError
+        ):
+            errors = self._runner().run(rootdir=self._rootdir)
+
+        self.assertEqual(["2"], [e.vulnerability_id for e in errors])
+
+
+class VulnerabilityIndexTests(TestCase):
+    SPECIFIERS = [
+        "<1.0",
+        ">=1.2,<=1.4",
+        ">1.4,<2.0",
+        "==2.1",
+        "!=3.0",
+        ">=4.0",
+    ]
+
+    @parameterized.expand(
+        [
+            ("0.9", ["<1.0", "!=3.0"]),
+            ("1.0", ["!=3.0"]),
+            ("1.2", [">=1.2,<=1.4", "!=3.0"]),
+            ("1.4", [">=1.2,<=1.4", "!=3.0"]),
+            ("1.4.1", [">1.4,<2.0", "!=3.0"]),
+            ("2.1.0", ["==2.1", "!=3.0"]),
+            ("3.0", []),
+            ("4.0rc1", []),
+            ("5.0", [">=4.0", "!=3.0"]),
+        ]
+    )
+    def test_match(self, version, expected):
+        index = VulnerabilityIndex({"Some_Package": self.SPECIFIERS})
+
+        self.assertEqual(
+            sorted(expected), sorted(index.match("some-package", version))
+        )
+        self.assertEqual([], index.match("other-package", version))
@@ -0,0 +1,348 @@
+import itertools
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+from unittest import TestCase, mock
+
+from parameterized import parameterized
+
+from cqa.base import Runner
+from cqa.cache import ResultCache
+from cqa.scheduler import CostModel, RunnerRef, ScheduledRunner, Scheduler
+from cqa.scheduler.scheduler import execute
+from cqa.types import ReporterError, Severity
+from cqa.utils import Profiler
+
+
+class _LoggingRunner(Runner):
+    def __init__(
+        self, tool: str, log: List[Tuple[str, str]], modifies: bool = False
+    ):
+        self.TOOL = tool
+        self.MODIFIES_FILES = modifies
+        self._log = log
+
+    def run(self, paths, rootdir):
+        self._log.extend((self.TOOL, path) for path in paths)
+        return [
+            ReporterError(
+                path=path, message=self.TOOL, lnum=1, severity=Severity.ERROR
+            )
+            for path in paths
+            if path.endswith("bad.py")
+        ]
+
+
+class _ImportsRunner(_LoggingRunner):
+    def __init__(self, tool: str, log: List[Tuple[str, str]]):
+        super().__init__(tool, log)
+        self.follows_imports = True
+        self.calls: List[List[str]] = []
+
+    def run(self, paths, rootdir):
+        self.calls.append(list(paths))
+        return super().run(paths, rootdir)
+
+
+class _ConcurrentRunner(Runner):
+    TOOL = "pylama"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._running = 0
+        self.most = 0
+
+    def run(self, paths, rootdir):
+        with self._lock:
+            self._running += 1
+            self.most = max(self.most, self._running)
+        time.sleep(0.02)
+        with self._lock:
+            self._running -= 1
+        return []
+
+
+class _ThreadScheduler(Scheduler):
+    """
+    runs the tasks on threads, so they can share the runners
+    """
+
+    def __init__(self, jobs: int):
+        super().__init__(jobs=jobs)
+        self._threads = ThreadPoolExecutor(max_workers=jobs)
+
+    def _submit(self, task, run):
+        return self._threads.submit(
+            execute, task.runner.runner, task.paths, run.rootdir
+        )
+
+    def close(self):
+        self._threads.shutdown()
+        super().close()
+
+
+def _scheduled(name, group, runner) -> ScheduledRunner:
+    return ScheduledRunner(name, RunnerRef(group, runner.TOOL, {}), runner)
+
+
+class SchedulerTests(TestCase):
+    def setUp(self):
+        self._tempdir = tempfile.TemporaryDirectory()
+        self._rootdir = self._tempdir.name
+        self._files = []
+        for name in ("a.py", "bad.py", "c.py", "d.py"):
+            path = os.path.join(self._rootdir, name)
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(f"# {name}\n")
+            self._files.append(path)
+        self._log: List[Tuple[str, str]] = []
+        super().setUp()
+
+    def tearDown(self) -> None:
+        self._tempdir.cleanup()
+
+    def _runners(self) -> List[ScheduledRunner]:
+        return [
+            _scheduled(
+                "formatter",
+                "formatter",
+                _LoggingRunner("fmt", self._log, modifies=True),
+            ),
+            _scheduled("linter", "linter", _LoggingRunner("lint", self._log)),
+            _scheduled("security", "sec", _LoggingRunner("sec", self._log)),
+        ]
+
+    def test_files_are_formatted_before_being_analysed(self):
+        items = list(
+            Scheduler(jobs=1).run(self._runners(), self._files, self._rootdir)
+        )
+
+        self.assertEqual(
+            [("formatter", "fmt"), ("linter", "lint"), ("security", "sec")],
+            sorted((name, item.message) for name, item in items),
+        )
+        self.assertEqual(12, len(self._log))
+        for path in self._files:
+            formatted = self._log.index(("fmt", path))
+            self.assertLess(formatted, self._log.index(("lint", path)))
+            self.assertLess(formatted, self._log.index(("sec", path)))
+
+    def test_task_done_once_its_items_were_consumed(self):
+        items = []
+        flushed = []
+        for item in Scheduler(jobs=1).run(
+            self._runners(),
+            self._files,
+            self._rootdir,
+            on_task_done=lambda: flushed.append(len(items)),
+        ):
+            items.append(item)
+
+        # one call per task of every runner, after the items of the task
+        # were consumed
+        self.assertEqual(3, len(items))
+        self.assertLessEqual(3, len(flushed))
+        self.assertEqual(sorted(flushed), flushed)
+        self.assertEqual(3, flushed[-1])
+
+    def test_longest_task_first(self):
+        costs = CostModel()
+        costs.observe(
+            "lint",
+            [(path, 1) for path in self._files if "c.py" not in path],
+            0.3,
+        )
+        costs.observe("lint", [(self._files[2], 1)], 10.0)
+        runners = [
+            _scheduled("linter", "linter", _LoggingRunner("lint", self._log))
+        ]
+
+        list(
+            Scheduler(jobs=1).run(
+                runners, self._files, self._rootdir, costs=costs
+            )
+        )
+
+        self.assertEqual(("lint", self._files[2]), self._log[0])
+        self.assertEqual(4, len(self._log))
+
+    def test_cached_files_are_not_analysed_again(self):
+        cache = ResultCache(os.path.join(self._rootdir, ".cqa_cache"))
+        first = list(
+            Scheduler(jobs=1).run(
+                self._runners(), self._files, self._rootdir, cache=cache
+            )
+        )
+        self._log.clear()
+
+        second = list(
+            Scheduler(jobs=1).run(
+                self._runners(), self._files, self._rootdir, cache=cache
+            )
+        )
+        cache.close()
+
+        # files the formatter changed are formatted again
+        self.assertEqual([("fmt", self._files[1])], self._log)
+        self.assertEqual(
+            sorted((name, item.message) for name, item in first),
+            sorted((name, item.message) for name, item in second),
+        )
+
+    def test_runners_following_imports_get_all_the_files(self):
+        runner = _ImportsRunner("types", self._log)
+        cache = ResultCache(os.path.join(self._rootdir, ".cqa_cache"))
+
+        for _ in range(2):
+            list(
+                Scheduler(jobs=1).run(
+                    [_scheduled("linter", "linter", runner)],
+                    self._files,
+                    self._rootdir,
+                    cache=cache,
+                )
+            )
+        cache.close()
+
+        self.assertEqual([self._files, self._files], runner.calls)
+
+    def test_runners_following_imports_wait_for_the_formatters(self):
+        files = []
+        for index in range(40):
+            path = os.path.join(self._rootdir, f"module_{index}.py")
+            with open(path, "w", encoding="utf-8") as file:
+                file.write("#" * (index % 7 + 1) * 100)
+            files.append(path)
+        runner = _ImportsRunner("types", self._log)
+        runners = [
+            _scheduled(
+                "formatter",
+                "formatter",
+                _LoggingRunner("fmt", self._log, modifies=True),
+            ),
+            _scheduled("linter", "linter", runner),
+        ]
+        cache = ResultCache(os.path.join(self._rootdir, ".cqa_cache"))
+
+        # the second run formats the files from the cache
+        for _ in range(2):
+            self._log.clear()
+            list(
+                Scheduler(jobs=1).run(
+                    runners, files, self._rootdir, cache=cache
+                )
+            )
+            self.assertEqual(("types", files[0]), self._log[-len(files)])
+        cache.close()
+
+        self.assertEqual([files, files], runner.calls)
+
+    def test_profiled_tasks_run_in_the_current_process(self):
+        runner = _ImportsRunner("types", self._log)
+
+        # the runners can not be built by worker processes
+        with Scheduler(jobs=2) as scheduler:
+            list(
+                scheduler.run(
+                    [_scheduled("linter", "linter", runner)],
+                    self._files,
+                    self._rootdir,
+                    profiler=Profiler(),
+                )
+            )
+
+        self.assertEqual([self._files], runner.calls)
+
+    def test_profiled_files_record_their_memory(self):
+        profiler = Profiler()
+        runner = _LoggingRunner("lint", self._log)
+
+        # the resident memory grows by 4 KiB between two measures
+        with mock.patch(
+            "cqa.scheduler.scheduler.current_rss",
+            side_effect=itertools.count(0, 4096),
+        ):
+            list(
+                Scheduler(jobs=1).run(
+                    [_scheduled("linter", "linter", runner)],
+                    self._files,
+                    self._rootdir,
+                    profiler=profiler,
+                )
+            )
+
+        files = [
+            event
+            for event in profiler.trace()["traceEvents"]
+            if event.get("cat") == "file"
+        ]
+        self.assertEqual(
+            sorted(self._files), sorted(event["name"] for event in files)
+        )
+        for event in files:
+            self.assertEqual(4, event["args"]["rss_delta_kb"])
+
+    @parameterized.expand([(1,), (2,)])
+    def test_tool_jobs_cap_its_tasks(self, jobs):
+        runner = _ConcurrentRunner()
+        files = []
+        for index in range(16):
+            path = os.path.join(self._rootdir, f"module_{index}.py")
+            with open(path, "w", encoding="utf-8") as file:
+                file.write("# module\n")
+            files.append(path)
+        ref = RunnerRef("linter", "pylama", {"pylama": {"jobs": jobs}})
+
+        with _ThreadScheduler(jobs=4) as scheduler:
+            list(
+                scheduler.run(
+                    [ScheduledRunner("linter", ref, runner)],
+                    files,
+                    self._rootdir,
+                )
+            )
+
+        self.assertEqual(jobs, runner.most)
+
+    @parameterized.expand([(1,), (2,)])
+    def test_worker_processes(self, jobs):
+        with open(self._files[0], "w", encoding="utf-8") as file:
+            file.write('password = "s3cr3t-Tk9xQ2vLp8"\n')
+        ref = RunnerRef("sec", "detect-secrets", {})
+
+        with Scheduler(jobs=jobs) as scheduler:
+            items = list(
+                scheduler.run(
+                    [ScheduledRunner("security", ref, ref.create())],
+                    self._files,
+                    self._rootdir,
+                )
+            )
+
+        self.assertEqual(
+            [("security", self._files[0], 1)],
+            [(name, item.path, item.lnum) for name, item in items],
+        )
+
+
+class CostModelTests(TestCase):
+    def test_estimates(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "costs.json")
+            costs = CostModel(path)
+            self.assertEqual(1.0, costs.estimate_run("safety"))
+
+            costs.observe("lint", [(path, 100), ("gone.py", 300)], 2.0)
+            costs.observe("safety", [], 3.0)
+            with open(path, "w"):
+                pass
+            costs.save()
+
+            costs = CostModel(path)
+            self.assertEqual(0.5, costs.estimate("lint", path, 100))
+            self.assertEqual(0.5, costs.estimate("lint", "new.py", 100))
+            self.assertEqual(0.0, costs.estimate("lint", "gone.py", 0))
+            self.assertEqual(3.0, costs.estimate_run("safety"))
@@ -0,0 +1,73 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from cqa.utils import SourceStore
+
+
+class SourceStoreTests(TestCase):
+    def setUp(self):
+        self._tempdir = tempfile.TemporaryDirectory()
+        self._path = self._write(
+            "module.py", "# -*- coding: latin-1 -*-\nx = 'é'\n"
+        )
+        super().setUp()
+
+    def tearDown(self) -> None:
+        self._tempdir.cleanup()
+
+    def _write(self, name: str, content: str, encoding="latin-1") -> str:
+        path = os.path.join(self._tempdir.name, name)
+        with open(path, "w", encoding=encoding) as file:
+            file.write(content)
+        return path
+
+    def test_files_are_read_once(self):
+        with SourceStore() as sources:
+            self.assertEqual(
+                "x = 'é'\n", sources.text(self._path).split("\n", 1)[1]
+            )
+            self.assertEqual(
+                "x", sources.tree(self._path).body[0].targets[0].id
+            )
+            sources.data(os.path.relpath(self._path))
+            sources.blob_id(self._path)
+
+            self.assertEqual(1, sources.reads)
+
+    def test_blob_id_matches_git(self):
+        path = self._write("blob.txt", "hello\n")
+
+        with SourceStore() as sources:
+            self.assertEqual(
+                "ce013625030ba8dba906f756967f9e9ca394464a",
+                sources.blob_id(path),
+            )
+
+    def test_large_files_are_memory_mapped(self):
+        with SourceStore(mmap_threshold=8) as sources:
+            data = sources.data(self._path)
+
+            self.assertNotIsInstance(data, bytes)
+            self.assertEqual(b"x = '\xe9'\n", data[-8:])
+            self.assertIn("x = 'é'", sources.text(self._path))
+
+    def test_invalid_source_has_no_tree(self):
+        path = self._write("invalid.py", "def (:\n")
+
+        with SourceStore() as sources:
+            self.assertIsNone(sources.tree(path))
+            self.assertIsNone(sources.tree(path))
+
+    def test_update_forgets_the_previous_contents(self):
+        with SourceStore() as sources:
+            sources.lines(self._path)
+            self._write("module.py", "y = 1\n")
+            sources.update(self._path)
+
+            self.assertEqual("y = 1\n", sources.text(self._path))
+            self.assertEqual(["y = 1"], sources.lines(self._path))
+            self.assertEqual(2, sources.reads)
+
+            sources.update(self._path, b"z = 2\n")
+            self.assertEqual("z = 2\n", sources.text(self._path))
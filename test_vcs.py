@@ -0,0 +1,168 @@
+import os
+import subprocess
+import tempfile
+from unittest import TestCase
+
+from parameterized import parameterized
+
+from cqa.types import ReporterError
+from cqa.utils.vcs import (
+    ChangedLines,
+    get_changed_lines,
+    get_unstaged_files,
+    parse_changed_lines,
+)
+
+ADDED = """diff --git new.py new.py
+new file mode 100644
+index 0000000..8c1b1e2
+--- /dev/null
++++ new.py
+@@ -0,0 +1,3 @@
++import os
++
++value = 1
+"""
+
+MODIFIED = """diff --git mod.py mod.py
+index 1111111..2222222 100644
+--- mod.py
++++ mod.py
+@@ -2 +2 @@ import os
+-value = 1
++value = 2
+@@ -10,0 +11,2 @@ def f():
++    return 1
++    return 2
+"""
+
+DELETED_LINES = """diff --git mod.py mod.py
+index 1111111..2222222 100644
+--- mod.py
++++ mod.py
+@@ -4,2 +3,0 @@ import os
+-+++ looks like a header
+-value = 1
+"""
+
+RENAMED = """diff --git old.py pkg/new.py
+similarity index 90%
+rename from old.py
+rename to pkg/new.py
+index 1111111..2222222 100644
+--- old.py
++++ pkg/new.py
+@@ -1 +1,2 @@
+-import os
++import os
++import sys
+"""
+
+RENAMED_ONLY = """diff --git old.py new.py
+similarity index 100%
+rename from old.py
+rename to new.py
+"""
+
+NO_NEWLINE = """diff --git mod.py mod.py
+index 1111111..2222222 100644
+--- mod.py
++++ mod.py
+@@ -3 +3 @@
+-value = 1
+\\ No newline at end of file
++value = 2
+\\ No newline at end of file
+@@ -8,0 +9 @@
++other = 3
+"""
+
+
+class ParseChangedLinesTests(TestCase):
+    @parameterized.expand(
+        [
+            ("added", ADDED, {"new.py": [(1, 3)]}),
+            ("modified", MODIFIED, {"mod.py": [(2, 2), (11, 12)]}),
+            ("deleted_lines", DELETED_LINES, {}),
+            ("renamed", RENAMED, {"pkg/new.py": [(1, 2)]}),
+            ("renamed_only", RENAMED_ONLY, {}),
+            ("no_newline", NO_NEWLINE, {"mod.py": [(3, 3), (9, 9)]}),
+            (
+                "several_files",
+                ADDED + MODIFIED,
+                {
+                    "new.py": [(1, 3)],
+                    "mod.py": [(2, 2), (11, 12)],
+                },
+            ),
+        ]
+    )
+    def test_parse(self, _, diff, expected):
+        self.assertEqual(expected, parse_changed_lines(diff))
+
+
+class ChangedLinesTests(TestCase):
+    @parameterized.expand(
+        [
+            ("changed_line", "pkg/mod.py", 3, True),
+            ("last_changed_line", "./pkg/mod.py", 5, True),
+            ("other_line", "pkg/mod.py", 6, False),
+            ("file_level", "pkg/mod.py", 0, True),
+            ("other_file", "pkg/other.py", 3, False),
+        ]
+    )
+    def test_filter(self, _, path, lnum, expected):
+        changed = ChangedLines({"pkg/mod.py": [(3, 5)]}, rootdir="/project")
+
+        self.assertEqual(
+            expected,
+            changed(ReporterError(path=path, message="found", lnum=lnum)),
+        )
+
+
+class StagedLinesTests(TestCase):
+    def setUp(self):
+        self._tempdir = tempfile.TemporaryDirectory()
+        self._cwd = os.getcwd()
+        os.chdir(self._tempdir.name)
+        self._git("init", "-q")
+        self._write("mod.py", "a = 1\nb = 2\n")
+        self._write("other.py", "c = 3\n")
+        self._git("add", ".")
+        self._git(
+            "-c",
+            "user.name=cqa",
+            "-c",
+            "user.email=cqa@example.org",
+            "commit",
+            "-q",
+            "-m",
+            "initial",
+        )
+
+    def tearDown(self):
+        os.chdir(self._cwd)
+        self._tempdir.cleanup()
+
+    @staticmethod
+    def _git(*args):
+        subprocess.run(["git", *args], check=True)
+
+    @staticmethod
+    def _write(path, text):
+        with open(path, "w") as file:
+            file.write(text)
+
+    def test_lines_of_the_working_tree(self):
+        self._write("mod.py", "a = 1\nb = 20\n")
+        self._git("add", "mod.py")
+        # lines inserted after staging shift the staged change
+        self._write("mod.py", "import os\nimport sys\na = 1\nb = 20\n")
+        self._write("other.py", "c = 30\n")
+
+        self.assertEqual(
+            {"mod.py": [(1, 2), (4, 4)]},
+            get_changed_lines(staged=True, paths=["mod.py"]),
+        )
+        self.assertEqual(["mod.py"], get_unstaged_files(["mod.py"]))
+        self.assertEqual([], get_unstaged_files([]))